@@ -5,10 +5,12 @@ from typing import Any, Callable
 from unittest.mock import patch
 
 import morecantile
-from cogeo_mosaic.backends import FileBackend
+import pytest
 from cogeo_mosaic.mosaic import MosaicJSON
 
 from titiler.core.models.mapbox import TileJSON
+from titiler.mosaic.backends import IndexedFileBackend
+from titiler.mosaic.cache import mosaic_cache
 
 from ..conftest import DATA_DIR, parse_img, read_json_fixture
 
@@ -30,6 +32,14 @@ def mosaic_read_factory(fname: str) -> Callable:
     return _read
 
 
+@pytest.fixture(autouse=True)
+def clear_mosaic_cache():
+    """Don't re-use (patched) MosaicJSON documents between tests."""
+    mosaic_cache.clear()
+    yield
+    mosaic_cache.clear()
+
+
 def test_read_mosaic(app):
     """test GET /mosaicjson endpoint"""
     # TODO: Remove
@@ -88,7 +98,9 @@ def test_point(app):
     """test GET /mosaicjson/point endpoint"""
     mosaicjson = read_json_fixture(MOSAICJSON_FILE)
     center = mosaicjson["center"]
-    with patch.object(FileBackend, "_read", mosaic_read_factory(MOSAICJSON_FILE)):
+    with patch.object(
+        IndexedFileBackend, "_read", mosaic_read_factory(MOSAICJSON_FILE)
+    ):
         response = app.get(
             f"/mosaicjson/point/{center[0]},{center[1]}",
             params={"url": MOSAICJSON_FILE},
@@ -108,7 +120,9 @@ def test_tile(app):
     tile = tms.tile(*mosaicjson["center"])
     partial_tile = tms.tile(bounds[0], bounds[1], mosaicjson["minzoom"])
 
-    with patch.object(FileBackend, "_read", mosaic_read_factory(MOSAICJSON_FILE)):
+    with patch.object(
+        IndexedFileBackend, "_read", mosaic_read_factory(MOSAICJSON_FILE)
+    ):
         # full tile
         response = app.get(
             f"/mosaicjson/tiles/WebMercatorQuad/{tile.z}/{tile.x}/{tile.y}",
@@ -180,7 +194,9 @@ def test_tile(app):
 
 def test_wmts(app):
     """test GET /mosaicjson/WebMercatorQuad/WMTSCapabilities.xml endpoint"""
-    with patch.object(FileBackend, "_read", mosaic_read_factory(MOSAICJSON_FILE)):
+    with patch.object(
+        IndexedFileBackend, "_read", mosaic_read_factory(MOSAICJSON_FILE)
+    ):
         response = app.get(
             "/mosaicjson/WebMercatorQuad/WMTSCapabilities.xml",
             params={"url": MOSAICJSON_FILE},
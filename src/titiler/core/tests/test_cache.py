@@ -0,0 +1,136 @@
+"""test titiler in-memory caches."""
+
+import time
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from rio_tiler.io import Reader
+from starlette.testclient import TestClient
+
+from titiler.core.cache import LRUCache
+from titiler.core.factory import TilerFactory
+
+from .conftest import DATA_DIR
+
+
+def test_lru_cache():
+    """test LRUCache."""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert "b" not in cache
+    assert "a" in cache
+    assert cache.pop("a") == 1
+    assert cache.get("a", "default") == "default"
+
+    cache.clear()
+    assert not len(cache)
+
+    cache = LRUCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+    cache = LRUCache(maxsize=0)
+    cache.set("a", 1)
+    assert "a" not in cache
+
+    cache = LRUCache(maxsize=10, maxbytes=10, sizeof=len)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.nbytes == 8
+    cache.set("c", "cccc")
+    assert "a" not in cache
+    assert cache.nbytes == 8
+
+    # values larger than the budget are not cached
+    cache.set("d", "d" * 11)
+    assert "d" not in cache
+    assert cache.nbytes == 8
+
+    cache.pop("b")
+    assert cache.nbytes == 4
+    cache.clear()
+    assert cache.nbytes == 0
+
+
+def test_preview_cache():
+    """Decimated arrays are shared between /statistics and /preview."""
+    cache = LRUCache(maxsize=4)
+    app = FastAPI()
+    app.include_router(TilerFactory(preview_cache=cache).router)
+    client = TestClient(app)
+
+    with patch.object(
+        Reader, "preview", autospec=True, side_effect=Reader.preview
+    ) as mock:
+        response = client.get(f"/statistics?url={DATA_DIR}/cog.tif&max_size=128")
+        assert response.status_code == 200
+        stats = response.json()
+        assert mock.call_count == 1
+
+        response = client.get(f"/statistics?url={DATA_DIR}/cog.tif&max_size=128")
+        assert response.json() == stats
+        assert mock.call_count == 1
+
+        # rescaling the cached image must not change the cached array
+        response = client.get(
+            f"/preview.npy?url={DATA_DIR}/cog.tif&max_size=128&rescale=0,1"
+        )
+        assert response.status_code == 200
+        assert mock.call_count == 1
+
+        response = client.get(f"/statistics?url={DATA_DIR}/cog.tif&max_size=128")
+        assert response.json() == stats
+        assert mock.call_count == 1
+
+        # different parameters
+        response = client.get(
+            f"/statistics?url={DATA_DIR}/cog.tif&max_size=128&bidx=1&bidx=1"
+        )
+        assert response.status_code == 200
+        assert mock.call_count == 2
+
+        response = client.get(f"/preview.npy?url={DATA_DIR}/cog.tif&width=64")
+        assert response.status_code == 200
+        assert mock.call_count == 3
+
+    assert len(cache) == 3
+
+
+def test_preview_cache_env():
+    """Previews are not shared between GDAL environments or when too large."""
+
+    def environment(user: str = "a"):
+        return {"GDAL_HTTP_USERPWD": f"{user}:secret"}
+
+    cache = LRUCache(maxsize=4)
+    app = FastAPI()
+    app.include_router(
+        TilerFactory(preview_cache=cache, environment_dependency=environment).router
+    )
+    client = TestClient(app)
+
+    with patch.object(
+        Reader, "preview", autospec=True, side_effect=Reader.preview
+    ) as mock:
+        url = f"/statistics?url={DATA_DIR}/cog.tif&max_size=128"
+        assert client.get(f"{url}&user=a").status_code == 200
+        assert client.get(f"{url}&user=a").status_code == 200
+        assert mock.call_count == 1
+
+        assert client.get(f"{url}&user=b").status_code == 200
+        assert mock.call_count == 2
+
+    cache = LRUCache(maxsize=4, maxbytes=1024, sizeof=lambda image: image.array.nbytes)
+    app = FastAPI()
+    app.include_router(TilerFactory(preview_cache=cache).router)
+    client = TestClient(app)
+
+    response = client.get(f"/statistics?url={DATA_DIR}/cog.tif&max_size=128")
+    assert response.status_code == 200
+    assert not len(cache)
@@ -0,0 +1,94 @@
+"""test titiler colormap compilation."""
+
+import numpy
+import pytest
+from rio_tiler.colormap import apply_cmap
+from rio_tiler.colormap import cmap as default_cmap
+from rio_tiler.errors import InvalidFormat
+
+from titiler.core.colormap import (
+    CompiledColorMap,
+    apply_colormap,
+    compile_colormap,
+    compiled_colormaps,
+)
+
+
+@pytest.mark.parametrize(
+    "colormap,dtype",
+    [
+        (default_cmap.get("viridis"), "uint8"),
+        ({0: (0, 0, 0, 0), 1: (255, 255, 255, 255), 3: (255, 0, 0, 255)}, "uint8"),
+        ({-1: (10, 10, 10, 255), 1000: (255, 0, 0, 255)}, "int16"),
+        ({0: (0, 0, 0, 0), 1: (255, 255, 255, 255), 3: (255, 0, 0, 255)}, "float32"),
+        ({0.5: (0, 0, 0, 255), 2.5: (255, 255, 255, 255)}, "float32"),
+        ({0: (1, 2, 3, 255), 100000: (4, 5, 6, 255)}, "int32"),
+        (
+            [
+                ((0, 1), (0, 0, 0, 0)),
+                ((1, 2), (255, 255, 255, 255)),
+                ((2, 3), (255, 0, 0, 255)),
+                ((3, 4), (255, 255, 0, 255)),
+            ],
+            "uint8",
+        ),
+        (
+            [
+                ((2.5, 10), (255, 0, 0, 255)),
+                ((0.0, 0.5), (0, 0, 255, 255)),
+                ((0.5, 1.5), (0, 255, 0, 255)),
+            ],
+            "float32",
+        ),
+        (
+            # overlapping intervals fallback to rio-tiler
+            [
+                ((0, 3), (255, 0, 0, 255)),
+                ((1, 2), (0, 0, 255, 255)),
+            ],
+            "uint8",
+        ),
+    ],
+)
+def test_apply_colormap(colormap, dtype):
+    """Compiled colormaps should match rio-tiler's apply_cmap."""
+    data = numpy.random.randint(-2, 8, size=(1, 64, 64)).astype(dtype)
+    if numpy.issubdtype(data.dtype, numpy.floating):
+        data[0, :4] += 0.5
+        data[0, 4:8] = numpy.nan
+
+    if dtype == "int32":
+        data[0, 0, 0] = 100000
+
+    expected_data, expected_mask = apply_cmap(data, colormap)
+    arr, mask = apply_colormap(data, colormap)
+    numpy.testing.assert_array_equal(arr, expected_data)
+    numpy.testing.assert_array_equal(mask, expected_mask)
+    assert arr.dtype == expected_data.dtype
+
+
+def test_compiled_colormaps():
+    """Compiled colormaps are cached by colormap identity."""
+    compiled_colormaps.clear()
+
+    cm = default_cmap.get("viridis")
+    compiled = compile_colormap(cm)
+    assert compiled.kind == "lut"
+    assert compile_colormap(cm) is compiled
+
+    # same values but different object
+    assert compile_colormap(dict(cm)) is not compiled
+
+    cm = {-5: (0, 0, 0, 255), 5: (255, 255, 255, 255)}
+    compiled = CompiledColorMap.from_colormap(cm)
+    assert compiled.kind == "discrete"
+    assert compiled.offset == -5
+    assert compiled.dense.shape == (11, 4)
+
+    assert (
+        CompiledColorMap.from_colormap([((0, 3), (0, 0, 0, 0)), ((1, 2), (0, 0, 0, 0))])
+        is None
+    )
+
+    with pytest.raises(InvalidFormat):
+        apply_colormap(numpy.zeros((2, 4, 4), dtype="uint8"), cm)
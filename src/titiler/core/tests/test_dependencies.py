@@ -506,6 +506,43 @@ def test_algo():
     assert response.json()["buffer"] == 4
     assert response.json()["input_nbands"] == 1
 
+    response = client.get(
+        "/",
+        params={
+            "algorithm": "hillshade",
+            "algorithm_params": json.dumps({"azimuth": "north"}),
+        },
+    )
+    assert response.status_code == 400
+
+
+def test_algo_cache():
+    """test algorithm instances are re-used between requests."""
+    from titiler.core.algorithm import algorithms as default_algorithms
+
+    instances = []
+
+    app = FastAPI()
+
+    @app.get("/")
+    def _endpoint(algorithm=Depends(default_algorithms.dependency)):
+        """return params."""
+        instances.append(algorithm)
+        return algorithm.model_dump()
+
+    client = TestClient(app)
+    params = {
+        "algorithm": "hillshade",
+        "algorithm_params": json.dumps({"azimuth": 30}),
+    }
+    assert client.get("/", params=params).json()["azimuth"] == 30
+    assert client.get("/", params=params).json()["azimuth"] == 30
+    assert instances[0] is instances[1]
+
+    params["algorithm_params"] = json.dumps({"azimuth": 60})
+    assert client.get("/", params=params).json()["azimuth"] == 60
+    assert instances[2] is not instances[0]
+
 
 def test_rescale_params():
     """test RescalingParams dependency."""
@@ -23,6 +23,7 @@ from morecantile.defaults import TileMatrixSets
 from rasterio.crs import CRS
 from rasterio.io import MemoryFile
 from rio_tiler.colormap import cmap as default_cmap
+from rio_tiler.constants import WGS84_CRS
 from rio_tiler.errors import InvalidDatatypeWarning, NoOverviewWarning
 from rio_tiler.io import BaseReader, MultiBandReader, Reader, STACReader
 from starlette.requests import Request
@@ -2238,3 +2239,85 @@ def test_ogc_maps_cog():
         assert headers["Content-Crs"] == "<http://www.opengis.net/def/crs/EPSG/0/4326>"
         assert headers["Content-Bbox"] == "-56.228,72.715,-54.54699999999999,73.188"
         assert headers["content-type"] == "image/png"
+
+
+def test_geojson_statistics_parallel(monkeypatch):
+    """Test parallel and streamed statistics for FeatureCollection."""
+    from titiler.core import factory as factory_module
+
+    with Reader(f"{DATA_DIR}/cog.tif") as src_dst:
+        minx, miny, maxx, maxy = src_dst.get_geographic_bounds(WGS84_CRS)
+
+    dx, dy = (maxx - minx) / 10, (maxy - miny) / 10
+    features = []
+    for i in range(8):
+        for j in range(5):
+            x, y = minx + (i + 1) * dx, miny + (j + 1) * dy
+            features.append(
+                {
+                    "type": "Feature",
+                    "id": f"{i}-{j}",
+                    "properties": {"name": f"{i}-{j}"},
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [
+                            [
+                                [x, y],
+                                [x + dx / 2, y],
+                                [x + dx / 2, y + dy / 2],
+                                [x, y + dy / 2],
+                                [x, y],
+                            ]
+                        ],
+                    },
+                }
+            )
+
+    fc = {"type": "FeatureCollection", "features": features}
+
+    app = FastAPI()
+    app.include_router(TilerFactory().router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(factory_module, "STATISTICS_THREADS", 1)
+    response = client.post(f"/statistics?url={DATA_DIR}/cog.tif", json=fc)
+    assert response.status_code == 200
+    sequential = response.json()
+
+    monkeypatch.setattr(factory_module, "STATISTICS_THREADS", 4)
+    monkeypatch.setattr(factory_module, "STATISTICS_BATCH_SIZE", 3)
+    response = client.post(f"/statistics?url={DATA_DIR}/cog.tif", json=fc)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/geo+json"
+    parallel = response.json()
+
+    # input order is preserved
+    assert [f["id"] for f in parallel["features"]] == [f["id"] for f in features]
+    assert parallel == sequential
+
+    # GeoJSON Text Sequence
+    response = client.post(
+        f"/statistics?url={DATA_DIR}/cog.tif",
+        json=fc,
+        headers={"Accept": "application/geo+json-seq"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/geo+json-seq"
+    records = [
+        json.loads(r) for r in response.content.decode().split("\x1e") if r.strip()
+    ]
+    assert len(records) == 40
+    stats = {f["id"]: f["properties"]["statistics"] for f in sequential["features"]}
+    for record in records:
+        assert record["properties"]["statistics"] == stats[record["id"]]
+
+    # Newline Delimited JSON
+    response = client.post(
+        f"/statistics?url={DATA_DIR}/cog.tif",
+        json=fc,
+        headers={"Accept": "application/ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/ndjson"
+    records = [json.loads(r) for r in response.text.splitlines()]
+    assert len(records) == 40
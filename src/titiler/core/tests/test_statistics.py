@@ -0,0 +1,284 @@
+"""test titiler block-wise statistics."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy
+import pytest
+import rasterio
+from fastapi import FastAPI
+from rasterio.transform import from_origin
+from starlette.testclient import TestClient
+
+from titiler.core.dependencies import BlockStatisticsParams, DefaultDependency
+from titiler.core.errors import (
+    DEFAULT_STATUS_CODES,
+    BadRequestError,
+    add_exception_handlers,
+)
+from titiler.core.factory import TilerFactory
+from titiler.core.statistics import (
+    STATISTICS_FINE_BINS,
+    BandMoments,
+    StatisticsIndex,
+    dataset_statistics,
+    dataset_version,
+    rescale_from_statistics,
+)
+
+from .conftest import DATA_DIR
+
+
+def test_band_moments():
+    """Merged moments match numpy."""
+    values = numpy.random.rand(10000) * 100
+    acc = BandMoments()
+    for chunk in numpy.array_split(values, 7):
+        part = BandMoments()
+        part.update(chunk)
+        acc.merge(part)
+
+    assert acc.count == values.size
+    assert acc.mean == pytest.approx(values.mean())
+    assert acc.std == pytest.approx(values.std())
+    assert acc.min == values.min()
+    assert acc.max == values.max()
+
+
+def test_dataset_statistics_exact():
+    """Integer data statistics are exact."""
+    src_path = os.path.join(DATA_DIR, "cog.tif")
+    with rasterio.open(src_path) as src_dst:
+        values = src_dst.read(1, masked=True).compressed()
+
+    stats = dataset_statistics(src_path, percentiles=[2, 50, 98], threads=3)["b1"]
+    assert stats["count"] == values.size
+    assert stats["min"] == values.min()
+    assert stats["max"] == values.max()
+    assert stats["mean"] == pytest.approx(values.mean())
+    assert stats["std"] == pytest.approx(values.std())
+    assert stats["percentile_error"] == 0
+    assert [stats["percentile_2"], stats["median"], stats["percentile_98"]] == (
+        numpy.percentile(values, [2, 50, 98]).tolist()
+    )
+    assert stats["unique"] == len(numpy.unique(values))
+    assert stats["histogram"][0] == numpy.histogram(values, bins=10)[0].tolist()
+
+    stats = dataset_statistics(src_path, categorical=True, categories=[1, 2])["b1"]
+    assert stats["histogram"] == [[int((values == 1).sum()), 0], [1, 2]]
+
+    # Overview
+    stats = dataset_statistics(src_path, overview_level=0)["b1"]
+    assert stats["count"] < values.size
+
+
+def test_dataset_statistics_approximate(tmp_path):
+    """Float data percentiles are within the error bound."""
+    src_path = str(tmp_path / "float.tif")
+    data = numpy.random.default_rng(0).normal(0, 10, (1, 512, 512)).astype("float32")
+    data[0, 0:10, 0:10] = -9999
+    with rasterio.open(
+        src_path,
+        "w",
+        driver="GTiff",
+        width=512,
+        height=512,
+        count=1,
+        dtype="float32",
+        nodata=-9999,
+        tiled=True,
+        blockxsize=128,
+        blockysize=128,
+        transform=from_origin(0, 0, 1, 1),
+    ) as dst:
+        dst.write(data)
+
+    values = data[0][data[0] != -9999].astype("float64")
+    stats = dataset_statistics(src_path, percentiles=[2, 98], threads=2)["b1"]
+    assert stats["masked_pixels"] == 100
+    assert stats["count"] == values.size
+    assert stats["mean"] == pytest.approx(values.mean())
+    error = stats["percentile_error"]
+    assert error == pytest.approx(
+        (values.max() - values.min()) / STATISTICS_FINE_BINS / 2
+    )
+    for p in [2, 50, 98]:
+        key = "median" if p == 50 else f"percentile_{p}"
+        assert abs(stats[key] - numpy.percentile(values, p)) <= error
+
+
+def test_statistics_endpoint():
+    """Test /statistics?blocks=true."""
+    app = FastAPI()
+    app.include_router(TilerFactory().router)
+    add_exception_handlers(app, DEFAULT_STATUS_CODES)
+    client = TestClient(app)
+
+    response = client.get(f"/statistics?url={DATA_DIR}/cog.tif&blocks=true")
+    assert response.status_code == 200
+    stats = response.json()["b1"]
+    assert stats["percentile_error"] == 0
+    assert stats["count"] == 7088886
+
+    response = client.get(
+        f"/statistics?url={DATA_DIR}/cog.tif&blocks=true&expression=b1*2"
+    )
+    assert response.status_code == 400
+
+    @dataclass
+    class AlwaysBlocks(BlockStatisticsParams):
+        """Block statistics by default."""
+
+        blocks: Optional[bool] = True
+
+    app = FastAPI()
+    app.include_router(TilerFactory(block_stats_dependency=AlwaysBlocks).router)
+    client = TestClient(app)
+
+    response = client.get(f"/statistics?url={DATA_DIR}/cog.tif")
+    assert response.status_code == 200
+    assert response.json()["b1"]["count"] == 7088886
+
+
+def test_statistics_endpoint_options(tmp_path):
+    """Block statistics should match the preview statistics options."""
+    app = FastAPI()
+    app.include_router(TilerFactory().router)
+    add_exception_handlers(app, DEFAULT_STATUS_CODES)
+    client = TestClient(app)
+
+    # alpha band is excluded by default
+    src_path = str(tmp_path / "rgba.tif")
+    data = numpy.full((4, 256, 256), 10, dtype="uint8")
+    data[3] = 255
+    data[3, :128] = 0
+    with rasterio.open(
+        src_path,
+        "w",
+        driver="GTiff",
+        width=256,
+        height=256,
+        count=4,
+        dtype="uint8",
+        photometric="RGB",
+        alpha="YES",
+    ) as dst:
+        dst.write(data)
+
+    stats = client.get(f"/statistics?url={src_path}&blocks=true").json()
+    assert stats.keys() == client.get(f"/statistics?url={src_path}").json().keys()
+    assert list(stats) == ["b1", "b2", "b3"]
+    assert stats["b1"]["count"] == 128 * 256
+
+    # unscale
+    src_path = os.path.join(DATA_DIR, "cog_scale.tif")
+    with rasterio.open(src_path) as src_dst:
+        scale, offset = src_dst.scales[0], src_dst.offsets[0]
+
+    raw = client.get(f"/statistics?url={src_path}&blocks=true").json()["b1"]
+    stats = client.get(f"/statistics?url={src_path}&blocks=true&unscale=true").json()
+    assert stats["b1"]["mean"] == pytest.approx(raw["mean"] * scale + offset)
+    assert stats["b1"]["max"] == pytest.approx(raw["max"] * scale + offset)
+
+    # reader options
+    @dataclass
+    class UnscaleReaderParams(DefaultDependency):
+        """Reader options."""
+
+        def __post_init__(self):
+            """Set reader options."""
+            self.options = {"unscale": True}
+
+    app = FastAPI()
+    app.include_router(TilerFactory(reader_dependency=UnscaleReaderParams).router)
+    client = TestClient(app)
+    assert (
+        client.get(f"/statistics?url={src_path}&blocks=true").json()["b1"]
+        == stats["b1"]
+    )
+
+
+def test_statistics_index(tmp_path):
+    """Statistics are computed once and persisted."""
+    src_path = os.path.join(DATA_DIR, "cog.tif")
+    calls = []
+
+    def _compute():
+        calls.append(1)
+        return {"b1": {"percentile_2": 1.0, "percentile_98": 6896.0}}
+
+    index = StatisticsIndex(directory=str(tmp_path))
+    stats = index.get(src_path, _compute, indexes=[1])
+    assert rescale_from_statistics(stats) == [(1.0, 6896.0)]
+    assert index.get(src_path, _compute, indexes=[1]) == stats
+    assert len(calls) == 1
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    # New process (empty in-memory cache) re-uses the JSON sidecar
+    index = StatisticsIndex(directory=str(tmp_path))
+    assert index.get(src_path, _compute, indexes=[1]) == stats
+    assert len(calls) == 1
+
+    # Different options
+    index.get(src_path, _compute, indexes=[2])
+    assert len(calls) == 2
+
+    assert dataset_version(src_path)
+    assert not dataset_version("s3://bucket/key.tif")
+
+    # Concurrent requests compute the statistics once
+    def _slow_compute():
+        time.sleep(0.1)
+        return _compute()
+
+    index = StatisticsIndex()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda _: index.get(src_path, _slow_compute, indexes=[3]), range(4)
+            )
+        )
+    assert len(calls) == 3
+    assert all(r == stats for r in results)
+
+    # Fully masked band
+    with pytest.raises(BadRequestError):
+        rescale_from_statistics(
+            {"b1": {"percentile_2": float("nan"), "percentile_98": float("nan")}}
+        )
+
+
+def test_rescale_auto(tmp_path):
+    """Test rescale=auto."""
+    index = StatisticsIndex(directory=str(tmp_path))
+    app = FastAPI()
+    app.include_router(TilerFactory(statistics_index=index).router)
+    add_exception_handlers(app, DEFAULT_STATUS_CODES)
+    client = TestClient(app)
+
+    stats = client.get(f"/statistics?url={DATA_DIR}/cog.tif").json()
+    rescale = f"{stats['b1']['percentile_2']},{stats['b1']['percentile_98']}"
+
+    response = client.get(
+        f"/tiles/WebMercatorQuad/8/87/48.npy?url={DATA_DIR}/cog.tif&rescale=auto"
+    )
+    assert response.status_code == 200
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    expected = client.get(
+        f"/tiles/WebMercatorQuad/8/87/48.npy?url={DATA_DIR}/cog.tif&rescale={rescale}"
+    )
+    assert response.content == expected.content
+
+    # No statistics index
+    app = FastAPI()
+    app.include_router(TilerFactory(statistics_index=None).router)
+    add_exception_handlers(app, DEFAULT_STATUS_CODES)
+    client = TestClient(app)
+    response = client.get(
+        f"/tiles/WebMercatorQuad/8/87/48.png?url={DATA_DIR}/cog.tif&rescale=auto"
+    )
+    assert response.status_code == 400
@@ -1,6 +1,11 @@
 """Test utils."""
 
+import os
+
+import morecantile
+import numpy
 import pytest
+from rio_tiler.io import Reader
 
 from titiler.core.dependencies import AssetsBidxExprParams, BidxParams
 from titiler.core.resources.enums import MediaType
@@ -10,8 +15,12 @@ from titiler.core.utils import (
     deserialize_query_params,
     extract_query_params,
     get_dependency_query_params,
+    metatile_parent,
+    split_metatile,
 )
 
+PREFIX = os.path.join(os.path.dirname(__file__), "fixtures")
+
 
 def test_get_dependency_params():
     """Test dependency filtering from query params."""
@@ -178,3 +187,40 @@ def test_check_query_params():
 def test_accept_media_type(media, accept, expected):
     """test MetadataOutputType dependency."""
     assert accept_media_type(accept, media) == expected
+
+
+def test_metatile():
+    """test metatile_parent and split_metatile."""
+    tms = morecantile.tms.get("WebMercatorQuad")
+
+    assert metatile_parent(tms, morecantile.Tile(5, 6, 4), 1) == morecantile.Tile(
+        5, 6, 4
+    )
+    assert metatile_parent(tms, morecantile.Tile(5, 6, 4), 4) == morecantile.Tile(
+        1, 1, 2
+    )
+
+    with pytest.raises(ValueError):
+        metatile_parent(tms, morecantile.Tile(5, 6, 4), 3)
+
+    with pytest.raises(ValueError):
+        metatile_parent(tms, morecantile.Tile(0, 0, 1), 4)
+
+    with Reader(os.path.join(PREFIX, "cog.tif")) as src_dst:
+        bounds = src_dst.get_geographic_bounds(tms.rasterio_geographic_crs)
+        tile = tms.tile((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2, 9)
+        parent = metatile_parent(tms, tile, 2)
+        meta = src_dst.tile(parent.x, parent.y, parent.z, tilesize=512)
+
+        tiles = dict(split_metatile(meta, tms, parent, 2))
+        assert len(tiles) == 4
+        assert set(tiles) == set(tms.children(parent, zoom=parent.z + 1))
+
+        img = src_dst.tile(tile.x, tile.y, tile.z)
+        assert tiles[tile].array.shape == img.array.shape
+        assert tiles[tile].bounds == img.bounds
+        numpy.testing.assert_array_equal(tiles[tile].mask, img.mask)
+        numpy.testing.assert_array_equal(tiles[tile].data, img.data)
+
+        with pytest.raises(ValueError):
+            list(split_metatile(meta, tms, parent, 3))
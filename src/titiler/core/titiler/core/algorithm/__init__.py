@@ -2,6 +2,7 @@
 
 import json
 from copy import copy
+from functools import lru_cache
 from typing import Annotated, Dict, List, Literal, Optional, Type
 
 import attr
@@ -72,7 +73,18 @@ class Algorithms:
 
     @property
     def dependency(self):
-        """FastAPI PostProcess dependency."""
+        """FastAPI PostProcess dependency.
+
+        Algorithm instances are cached by their raw `(algorithm, algorithm_params)`
+        query values so repeated tile requests skip JSON decoding and pydantic
+        validation. Instances are shared and must be treated as immutable.
+
+        """
+
+        @lru_cache(maxsize=128)
+        def _create(name: str, params: Optional[str]) -> BaseAlgorithm:
+            kwargs = json.loads(params) if params else {}
+            return self.get(name)(**kwargs)
 
         def post_process(
             algorithm: Annotated[
@@ -85,10 +97,9 @@ class Algorithms:
             ] = None,
         ) -> Optional[BaseAlgorithm]:
             """Data Post-Processing options."""
-            kwargs = json.loads(algorithm_params) if algorithm_params else {}
             if algorithm:
                 try:
-                    return self.get(algorithm)(**kwargs)
+                    return _create(algorithm, algorithm_params)
 
                 except ValidationError as e:
                     raise HTTPException(status_code=400, detail=str(e)) from e
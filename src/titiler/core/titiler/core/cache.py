@@ -0,0 +1,222 @@
+"""titiler.core in-memory caches."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+
+import attr
+import rasterio
+from rio_tiler.io import BaseReader
+from rio_tiler.models import ImageData
+
+PREVIEW_CACHE_SIZE = int(os.getenv("TITILER_PREVIEW_CACHE_SIZE", 16))
+PREVIEW_CACHE_MAXBYTES = int(
+    os.getenv("TITILER_PREVIEW_CACHE_MAXBYTES", 256 * 1024 * 1024)
+)
+PREVIEW_CACHE_TTL = int(os.getenv("TITILER_PREVIEW_CACHE_TTL", 300))
+
+_missing = object()
+
+
+class LRUCache:
+    """Thread-safe Least Recently Used cache with optional time-to-live.
+
+    Args:
+        maxsize (int): Maximum number of entries. A `maxsize` of 0 disables the cache.
+        ttl (int, optional): Time (in seconds) after which an entry expires.
+        maxbytes (int, optional): Memory budget, values larger than `maxbytes` are not cached.
+        sizeof (callable, optional): Size (in bytes) of a value. Required with `maxbytes`.
+
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: Optional[float] = None,
+        maxbytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        """Create the cache."""
+        assert maxbytes is None or sizeof is not None, "`maxbytes` requires `sizeof`"
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of entries."""
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check if a (non expired) key is in the cache."""
+        return self.get(key, _missing) is not _missing
+
+    def _remove(self, key: Hashable) -> Optional[Tuple[float, Any, int]]:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[2]
+
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            expires, value, _ = entry
+            if expires and expires < time.monotonic():
+                self._remove(key)
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Add a value, evicting the least recently used entries."""
+        if self.maxsize <= 0:
+            return
+
+        nbytes = self.sizeof(value) if self.sizeof else 0
+        expires = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._remove(key)
+            if self.maxbytes is not None and nbytes > self.maxbytes:
+                return
+
+            self._data[key] = (expires, value, nbytes)
+            self.nbytes += nbytes
+            while len(self._data) > self.maxsize or (
+                self.maxbytes is not None and self.nbytes > self.maxbytes
+            ):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.nbytes -= evicted
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key."""
+        with self._lock:
+            entry = self._remove(key)
+
+        return entry[1] if entry else default
+
+    def clear(self):
+        """Empty the cache."""
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+
+preview_cache = LRUCache(
+    maxsize=PREVIEW_CACHE_SIZE,
+    ttl=PREVIEW_CACHE_TTL,
+    maxbytes=PREVIEW_CACHE_MAXBYTES,
+    sizeof=lambda image: image.array.nbytes,
+)
+
+# options set by rasterio itself (e.g while a dataset is open)
+_RASTERIO_OPTIONS = {
+    *rasterio.Env.default_options(),
+    "GDAL_DATA",
+    "PROJ_DATA",
+    "PROJ_LIB",
+}
+
+
+def gdal_env_key() -> Hashable:
+    """Hashable snapshot of the current thread's rasterio environment (credentials, GDAL config).
+
+    rasterio environments are thread-local: the key must be taken in the
+    thread which entered the environment (e.g the request thread).
+
+    """
+    try:
+        options = rasterio.env.getenv()
+    except rasterio.errors.EnvError:
+        return ()
+
+    return tuple(
+        sorted((k, repr(v)) for k, v in options.items() if k not in _RASTERIO_OPTIONS)
+    )
+
+
+def dataset_version(src_dst: BaseReader) -> Hashable:
+    """Token identifying the content of an opened dataset.
+
+    Uses the modification time and size of local files and the dataset
+    metadata (bounds, CRS, size, data type and nodata) otherwise.
+
+    """
+    version: Tuple[Any, ...] = (repr(src_dst.bounds), str(src_dst.crs))
+
+    dataset = getattr(src_dst, "dataset", None)
+    if dataset is not None and hasattr(dataset, "profile"):
+        version += (
+            dataset.width,
+            dataset.height,
+            dataset.count,
+            dataset.dtypes,
+            dataset.nodata,
+        )
+
+        try:
+            stat = os.stat(dataset.name)
+            version += (stat.st_mtime_ns, stat.st_size)
+        except (OSError, TypeError, ValueError):
+            pass
+
+    return version
+
+
+def preview_cache_key(
+    reader: Type[BaseReader],
+    src_path: Any,
+    reader_options: Dict,
+    **kwargs: Any,
+) -> Hashable:
+    """Create a hashable key for a dataset preview.
+
+    `None` options are the same as missing ones (reader defaults), except for
+    `max_size` where `None` disables the default size limit. The key includes
+    the current rasterio environment (see `gdal_env_key`) so previews read with
+    other credentials are not shared.
+
+    """
+    options = {k: v for k, v in kwargs.items() if v is not None or k == "max_size"}
+    return (
+        f"{reader.__module__}.{reader.__qualname__}",
+        repr(src_path),
+        repr(sorted(reader_options.items())),
+        repr(sorted(options.items())),
+        gdal_env_key(),
+    )
+
+
+def cached_preview(
+    src_dst: BaseReader,
+    key: Hashable,
+    cache: Optional[LRUCache] = None,
+    **kwargs: Any,
+) -> ImageData:
+    """Read a dataset preview, re-using a previously decimated array.
+
+    Cached previews are only re-used for the same dataset version (see
+    `dataset_version`). Returns a copy of the cached image so callers can
+    safely rescale or post-process it in place.
+
+    """
+    if cache is None:
+        return src_dst.preview(**kwargs)
+
+    key = (key, dataset_version(src_dst))
+    image = cache.get(key)
+    if image is None:
+        image = src_dst.preview(**kwargs)
+        cache.set(key, image)
+
+    return attr.evolve(image, array=image.array.copy())
@@ -0,0 +1,172 @@
+"""titiler.core colormap compilation."""
+
+import warnings
+from typing import Optional, Sequence, Tuple
+
+import attr
+import numpy
+from rio_tiler.colormap import apply_cmap, make_lut
+from rio_tiler.errors import InvalidFormat
+from rio_tiler.types import ColorMapType
+
+from titiler.core.cache import LRUCache
+
+# Maximum span of integer keys for which a discrete colormap is compiled to a dense LUT
+MAX_DENSE_LUT_SIZE = 65536
+
+
+@attr.s(frozen=True)
+class CompiledColorMap:
+    """Colormap pre-computed into NumPy lookup structures.
+
+    Attributes:
+        kind (str): `lut` (256 entries GDAL colormap), `discrete` or `intervals`.
+        colors (numpy.ndarray): RGBA colors (N x 4, uint8).
+        keys (numpy.ndarray, optional): sorted discrete values or interval lower bounds.
+        upper (numpy.ndarray, optional): interval upper bounds (matching `keys`).
+        offset (int): value of the first entry of `dense` lookup table.
+        dense (numpy.ndarray, optional): dense RGBA lookup table for integer discrete values.
+        defined (numpy.ndarray, optional): mask of `dense` entries defined in the colormap.
+
+    """
+
+    kind: str = attr.ib()
+    colors: numpy.ndarray = attr.ib()
+    keys: Optional[numpy.ndarray] = attr.ib(default=None)
+    upper: Optional[numpy.ndarray] = attr.ib(default=None)
+    offset: int = attr.ib(default=0)
+    dense: Optional[numpy.ndarray] = attr.ib(default=None)
+    defined: Optional[numpy.ndarray] = attr.ib(default=None)
+
+    @classmethod
+    def from_colormap(cls, colormap: ColorMapType) -> Optional["CompiledColorMap"]:
+        """Compile a colormap.
+
+        Returns `None` when the colormap can't be represented by sorted lookup
+        tables (e.g overlapping intervals), in which case rio-tiler's
+        `apply_cmap` should be used.
+
+        """
+        if isinstance(colormap, Sequence):
+            if not colormap:
+                return None
+
+            intervals = sorted(colormap, key=lambda x: x[0][0])
+            lower = numpy.array([k[0] for k, _ in intervals], dtype="float64")
+            upper = numpy.array([k[1] for k, _ in intervals], dtype="float64")
+            # overlapping intervals depend on the user defined order
+            if (lower[1:] < upper[:-1]).any():
+                return None
+
+            colors = numpy.array([v for _, v in intervals]).astype("uint8")
+            return cls("intervals", colors, keys=lower, upper=upper)
+
+        if not colormap:
+            return None
+
+        if (
+            len(colormap) == 256
+            and max(colormap) < 256
+            and min(colormap) >= 0
+            and not any(isinstance(k, float) for k in colormap)
+        ):
+            return cls("lut", make_lut(colormap))  # type: ignore
+
+        keys = numpy.array(sorted(colormap), dtype="float64")
+        colors = numpy.array([colormap[k] for k in sorted(colormap)]).astype("uint8")
+
+        dense = None
+        defined = None
+        offset = 0
+        if not any(isinstance(k, float) for k in colormap):
+            offset = int(keys[0])
+            size = int(keys[-1]) - offset + 1
+            if size <= MAX_DENSE_LUT_SIZE:
+                index = keys.astype("int64") - offset
+                dense = numpy.zeros((size, 4), dtype="uint8")
+                dense[index] = colors
+                defined = numpy.zeros(size, dtype="bool")
+                defined[index] = True
+
+        return cls(
+            "discrete",
+            colors,
+            keys=keys,
+            offset=offset,
+            dense=dense,
+            defined=defined,
+        )
+
+    def apply(self, data: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Apply colormap on a 1 band array, returning RGB data and Alpha band."""
+        if data.shape[0] > 1:
+            raise InvalidFormat("Source data must be 1 band")
+
+        arr = data[0]
+
+        if self.kind == "lut":
+            # For now we assume ColorMap are in uint8
+            if arr.dtype != numpy.uint8:
+                warnings.warn(
+                    f"Input array is of type {arr.dtype} and `will be converted to Int in order to apply the ColorMap.",
+                    UserWarning,
+                    stacklevel=2,
+                )
+                arr = arr.astype(numpy.uint8)
+
+            res = self.colors[arr]
+
+        elif self.kind == "intervals":
+            idx = numpy.searchsorted(self.keys, arr, side="right") - 1
+            valid = idx >= 0
+            idx = numpy.clip(idx, 0, None)
+            valid &= arr < self.upper[idx]
+            res = numpy.where(valid[..., None], self.colors[idx], 0).astype("uint8")
+
+        elif self.dense is not None and numpy.issubdtype(arr.dtype, numpy.integer):
+            idx = arr.astype("int64") - self.offset
+            valid = (idx >= 0) & (idx < len(self.dense))
+            idx = numpy.where(valid, idx, 0)
+            valid &= self.defined[idx]
+            res = numpy.where(valid[..., None], self.dense[idx], 0).astype("uint8")
+
+        else:
+            idx = numpy.clip(numpy.searchsorted(self.keys, arr), 0, len(self.keys) - 1)
+            valid = self.keys[idx] == arr
+            res = numpy.where(valid[..., None], self.colors[idx], 0).astype("uint8")
+
+        res = numpy.transpose(res, [2, 0, 1])
+        return res[:-1], res[-1]
+
+
+# Compiled colormaps, keyed by colormap object identity. Colormaps returned by
+# `ColorMaps.get` and `dependencies.parse_colormap` are shared objects so identity
+# is a cheap and stable key. Entries keep a reference to their colormap so its
+# `id` can't be re-used while cached.
+compiled_colormaps = LRUCache(maxsize=128)
+
+
+def compile_colormap(colormap: ColorMapType) -> Optional[CompiledColorMap]:
+    """Get or compile a colormap."""
+    entry = compiled_colormaps.get(id(colormap))
+    if entry is not None and entry[0] is colormap:
+        return entry[1]
+
+    compiled = CompiledColorMap.from_colormap(colormap)
+    compiled_colormaps.set(id(colormap), (colormap, compiled))
+    return compiled
+
+
+def apply_colormap(
+    data: numpy.ndarray, colormap: ColorMapType
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Apply colormap on data using cached lookup tables.
+
+    Drop-in replacement for `rio_tiler.colormap.apply_cmap`.
+
+    """
+    compiled = compile_colormap(colormap)
+    if compiled is None:
+        return apply_cmap(data, colormap)
+
+    return compiled.apply(data)
@@ -3,6 +3,7 @@
 import json
 import warnings
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import (
     Annotated,
     Callable,
@@ -23,13 +24,34 @@ from rio_tiler.colormap import ColorMaps
 from rio_tiler.colormap import cmap as default_cmap
 from rio_tiler.colormap import parse_color
 from rio_tiler.errors import MissingAssets, MissingBands
-from rio_tiler.types import RIOResampling, WarpResampling
+from rio_tiler.types import ColorMapType, RIOResampling, WarpResampling
 from starlette.requests import Request
 
 from titiler.core.resources.enums import ImageType, MediaType
 from titiler.core.utils import accept_media_type
 
 
+@lru_cache(maxsize=512)
+def parse_colormap(colormap: str) -> ColorMapType:
+    """Parse a JSON encoded custom colormap.
+
+    The result is cached by the raw query value because map clients send the
+    exact same colormap with every tile request. The returned colormap is
+    shared between requests and must not be modified in place.
+
+    """
+    c = json.loads(
+        colormap,
+        object_hook=lambda x: {int(k): parse_color(v) for k, v in x.items()},
+    )
+
+    # Make sure to match colormap type
+    if isinstance(c, Sequence):
+        c = [(tuple(inter), parse_color(v)) for (inter, v) in c]
+
+    return c
+
+
 def create_colormap_dependency(cmap: ColorMaps) -> Callable:
     """Create Colormap Dependency."""
 
@@ -47,18 +69,7 @@ def create_colormap_dependency(cmap: ColorMaps) -> Callable:
 
         if colormap:
             try:
-                c = json.loads(
-                    colormap,
-                    object_hook=lambda x: {
-                        int(k): parse_color(v) for k, v in x.items()
-                    },
-                )
-
-                # Make sure to match colormap type
-                if isinstance(c, Sequence):
-                    c = [(tuple(inter), parse_color(v)) for (inter, v) in c]
-
-                return c
+                return parse_colormap(colormap)
             except json.JSONDecodeError as e:
                 raise HTTPException(
                     status_code=400, detail="Could not parse the colormap value."
@@ -448,7 +459,7 @@ class DatasetParams(DefaultDependency):
             self.unscale = bool(self.unscale)
 
 
-RescaleType = List[Tuple[float, float]]
+RescaleType = Union[List[Tuple[float, float]], Literal["auto"]]
 
 
 @dataclass
@@ -459,7 +470,7 @@ class RenderingParams(DefaultDependency):
         Optional[List[str]],
         Query(
             title="Min/Max data Rescaling",
-            description="comma (',') delimited Min,Max range. Can set multiple time for multiple bands.",
+            description="comma (',') delimited Min,Max range. Can set multiple time for multiple bands. Use `auto` to rescale using the dataset statistics (2nd and 98th percentiles).",
             examples=["0,2000", "0,1000", "0,10000"],  # band 1  # band 2  # band 3
         ),
     ] = None
@@ -474,7 +485,10 @@ class RenderingParams(DefaultDependency):
 
     def __post_init__(self) -> None:
         """Post Init."""
-        if self.rescale:
+        if self.rescale == ["auto"]:
+            self.rescale = "auto"  # type: ignore
+
+        elif self.rescale:
             rescale_array = []
             for r in self.rescale:
                 parsed = tuple(
@@ -539,6 +553,24 @@ class StatisticsParams(DefaultDependency):
             self.percentiles = [2, 98]
 
 
+@dataclass
+class BlockStatisticsParams(DefaultDependency):
+    """Block-wise statistics options."""
+
+    blocks: Annotated[
+        Optional[bool],
+        Query(
+            description="Compute statistics by reading the whole dataset block by block instead of a decimated preview (single rasterio dataset, indexes only). Blocks are read at the dataset (or overview) resolution so resampling options are not used. Defaults to `False`",
+        ),
+    ] = None
+    overview_level: Annotated[
+        Optional[int],
+        Query(
+            description="Overview level to read blocks from (0 is the first overview). Defaults to full resolution.",
+        ),
+    ] = None
+
+
 @dataclass
 class HistogramParams(DefaultDependency):
     """Numpy Histogram options."""
@@ -5,11 +5,13 @@ import base64
 import logging
 import os
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import (
     Annotated,
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Literal,
     Optional,
@@ -36,13 +38,13 @@ from morecantile.models import crs_axis_inverted
 from pydantic import Field
 from rio_tiler.colormap import ColorMaps
 from rio_tiler.colormap import cmap as default_cmap
-from rio_tiler.constants import WGS84_CRS
+from rio_tiler.constants import MAX_THREADS, WGS84_CRS
 from rio_tiler.io import BaseReader, MultiBandReader, MultiBaseReader, Reader
 from rio_tiler.models import ImageData, Info
 from rio_tiler.types import ColorMapType
-from rio_tiler.utils import CRS_to_uri, CRS_to_urn
+from rio_tiler.utils import CRS_to_uri, CRS_to_urn, non_alpha_indexes
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, Response
+from starlette.responses import HTMLResponse, Response, StreamingResponse
 from starlette.routing import Match, NoMatchFound
 from starlette.routing import Route as APIRoute
 from starlette.routing import compile_path, replace_params
@@ -55,6 +57,9 @@ from titiler.core.algorithm import (
     BaseAlgorithm,
 )
 from titiler.core.algorithm import algorithms as available_algorithms
+from titiler.core.cache import LRUCache, cached_preview
+from titiler.core.cache import preview_cache as default_preview_cache
+from titiler.core.cache import preview_cache_key
 from titiler.core.dependencies import (
     AssetsBidxExprParams,
     AssetsBidxExprParamsOptional,
@@ -64,6 +69,7 @@ from titiler.core.dependencies import (
     BandsExprParamsOptional,
     BandsParams,
     BidxExprParams,
+    BlockStatisticsParams,
     ColorMapParams,
     CoordCRSParams,
     CRSParams,
@@ -79,6 +85,7 @@ from titiler.core.dependencies import (
     StatisticsParams,
     TileParams,
 )
+from titiler.core.errors import BadRequestError
 from titiler.core.models.mapbox import TileJSON
 from titiler.core.models.OGC import TileMatrixSetList, TileSet, TileSetList
 from titiler.core.models.responses import (
@@ -95,12 +102,20 @@ from titiler.core.models.responses import (
 from titiler.core.resources.enums import ImageType, MediaType
 from titiler.core.resources.responses import GeoJSONResponse, JSONResponse, XMLResponse
 from titiler.core.routing import EndpointScope
+from titiler.core.statistics import (
+    StatisticsIndex,
+    dataset_statistics,
+    rescale_from_statistics,
+)
+from titiler.core.statistics import statistics_index as default_statistics_index
 from titiler.core.telemetry import factory_trace
 from titiler.core.utils import (
     accept_media_type,
     bounds_to_geometry,
     create_html_response,
+    features_to_sequence,
     render_image,
+    sort_features,
 )
 
 jinja2_env = jinja2.Environment(
@@ -109,6 +124,20 @@ jinja2_env = jinja2.Environment(
 )
 DEFAULT_TEMPLATES = Jinja2Templates(env=jinja2_env)
 
+STATISTICS_THREADS = int(os.getenv("TITILER_STATISTICS_THREADS", MAX_THREADS))
+STATISTICS_BATCH_SIZE = int(os.getenv("TITILER_STATISTICS_BATCH_SIZE", 16))
+
+geojson_statistics_responses: Dict[int, Dict[str, Any]] = {
+    200: {
+        "content": {
+            "application/geo+json": {},
+            "application/geo+json-seq": {},
+            "application/ndjson": {},
+        },
+        "description": "Return dataset's statistics from feature or featureCollection.",
+    }
+}
+
 img_endpoint_params: Dict[str, Any] = {
     "responses": {
         200: {
@@ -286,6 +315,7 @@ class TilerFactory(BaseFactory):
         tile_dependency (titiler.core.dependencies.DefaultDependency): Endpoint dependency defining tile options (e.g buffer, padding).
         stats_dependency (titiler.core.dependencies.DefaultDependency): Endpoint dependency defining options for rio-tiler's statistics method.
         histogram_dependency (titiler.core.dependencies.DefaultDependency): Endpoint dependency defining options for numpy's histogram method.
+        block_stats_dependency (titiler.core.dependencies.DefaultDependency): Endpoint dependency defining block-wise statistics options for `/statistics`.
         img_preview_dependency (titiler.core.dependencies.DefaultDependency): Endpoint dependency defining options for rio-tiler's preview method.
         img_part_dependency (titiler.core.dependencies.DefaultDependency): Endpoint dependency defining options for rio-tiler's part/feature methods.
         process_dependency (titiler.core.dependencies.DefaultDependency): Endpoint dependency defining image post-processing options (e.g rescaling, color-formula).
@@ -299,6 +329,8 @@ class TilerFactory(BaseFactory):
         add_preview (bool): add `/preview` endpoints. Defaults to True.
         add_part (bool): add `/bbox` and `/feature` endpoints. Defaults to True.
         add_viewer (bool): add `/map.html` endpoints. Defaults to True.
+        preview_cache (titiler.core.cache.LRUCache): In-memory cache for decimated preview arrays shared by `/statistics` and `/preview`. Set to `None` to disable.
+        statistics_index (titiler.core.statistics.StatisticsIndex): Persistent dataset statistics used to resolve `rescale=auto`. Set to `None` to disable.
 
     """
 
@@ -323,6 +355,7 @@ class TilerFactory(BaseFactory):
     # Statistics/Histogram Dependencies
     stats_dependency: Type[DefaultDependency] = StatisticsParams
     histogram_dependency: Type[DefaultDependency] = HistogramParams
+    block_stats_dependency: Type[DefaultDependency] = BlockStatisticsParams
 
     # Crop/Preview endpoints Dependencies
     img_preview_dependency: Type[DefaultDependency] = PreviewParams
@@ -345,6 +378,12 @@ class TilerFactory(BaseFactory):
 
     render_func: Callable[..., Tuple[bytes, str]] = render_image
 
+    # Decimated preview arrays cache
+    preview_cache: Optional[LRUCache] = default_preview_cache
+
+    # Per-dataset statistics index (`rescale=auto`)
+    statistics_index: Optional[StatisticsIndex] = default_statistics_index
+
     # Add/Remove some endpoints
     add_preview: bool = True
     add_part: bool = True
@@ -396,6 +435,135 @@ class TilerFactory(BaseFactory):
         if self.add_ogc_maps:
             self.ogc_maps()
 
+    def read_preview(
+        self,
+        src_dst: BaseReader,
+        src_path: Any,
+        reader_params: DefaultDependency,
+        **kwargs: Any,
+    ) -> ImageData:
+        """Read dataset preview, using the `preview_cache` when available."""
+        key = preview_cache_key(
+            self.reader, src_path, reader_params.as_dict(), **kwargs
+        )
+        return cached_preview(src_dst, key, cache=self.preview_cache, **kwargs)
+
+    @property
+    def render_params_dependency(self) -> Callable:
+        """Rendering options dependency resolving `rescale=auto` from the statistics index.
+
+        Statistics are computed once per dataset and layer/dataset options (from
+        the dataset preview, before post-processing) and ranges are set to the 2nd
+        and 98th percentiles.
+
+        """
+
+        def deps(
+            src_path=Depends(self.path_dependency),
+            reader_params=Depends(self.reader_dependency),
+            layer_params=Depends(self.layer_dependency),
+            dataset_params=Depends(self.dataset_dependency),
+            render_params=Depends(self.render_dependency),
+            env=Depends(self.environment_dependency),
+        ):
+            if render_params.rescale != "auto" or self.statistics_index is None:
+                return render_params
+
+            def _compute() -> Dict[str, Dict[str, Any]]:
+                with rasterio.Env(**env):
+                    with self.reader(src_path, **reader_params.as_dict()) as src_dst:
+                        image = self.read_preview(
+                            src_dst,
+                            src_path,
+                            reader_params,
+                            **layer_params.as_dict(),
+                            **dataset_params.as_dict(),
+                        )
+
+                return {
+                    band: stats.model_dump()
+                    for band, stats in image.statistics().items()
+                }
+
+            stats = self.statistics_index.get(
+                str(src_path),
+                _compute,
+                reader=reader_params.as_dict(),
+                layer=layer_params.as_dict(),
+                dataset=dataset_params.as_dict(),
+            )
+            render_params.rescale = rescale_from_statistics(stats)
+
+            return render_params
+
+        return deps
+
+    def features_statistics(
+        self,
+        features: Sequence[Feature],
+        statistics: Callable[[BaseReader, Feature], Dict],
+        src_path: Any,
+        reader_params: DefaultDependency,
+        env: Dict,
+    ) -> Iterator[Feature]:
+        """Add statistics to features, yielding them as they are processed.
+
+        Features are sorted spatially and split in batches of `STATISTICS_BATCH_SIZE`,
+        each batch being processed by a worker thread with its own reader.
+
+        """
+        features = sort_features(features)
+        batches = [
+            features[i : i + STATISTICS_BATCH_SIZE]
+            for i in range(0, len(features), STATISTICS_BATCH_SIZE)
+        ]
+
+        def _process(batch: List[Feature]) -> List[Feature]:
+            with rasterio.Env(**env):
+                with self.reader(src_path, **reader_params.as_dict()) as src_dst:
+                    for feature in batch:
+                        stats = statistics(src_dst, feature)
+                        feature.properties = feature.properties or {}
+                        feature.properties.update({"statistics": stats})
+
+            return batch
+
+        if STATISTICS_THREADS <= 1 or len(batches) <= 1:
+            for batch in batches:
+                yield from _process(batch)
+
+            return
+
+        executor = ThreadPoolExecutor(max_workers=STATISTICS_THREADS)
+        try:
+            futures = [executor.submit(_process, batch) for batch in batches]
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def geojson_statistics_response(
+        self,
+        request: Request,
+        geojson: Union[FeatureCollection, Feature],
+        features: Iterator[Feature],
+    ):
+        """Return features as a streamed GeoJSON sequence or a Feature(Collection)."""
+        output_type = accept_media_type(
+            request.headers.get("accept", ""),
+            [MediaType.geojson, MediaType.geojsonseq, MediaType.ndjson],
+        )
+        if output_type in [MediaType.geojsonseq, MediaType.ndjson]:
+            return StreamingResponse(
+                features_to_sequence(features, output_type),
+                media_type=output_type.value,
+            )
+
+        # features are updated in place
+        list(features)
+
+        return geojson
+
     ############################################################################
     # /info
     ############################################################################
@@ -480,12 +648,48 @@ class TilerFactory(BaseFactory):
             post_process=Depends(self.process_dependency),
             stats_params=Depends(self.stats_dependency),
             histogram_params=Depends(self.histogram_dependency),
+            block_params=Depends(self.block_stats_dependency),
             env=Depends(self.environment_dependency),
         ):
             """Get Dataset statistics."""
             with rasterio.Env(**env):
                 with self.reader(src_path, **reader_params.as_dict()) as src_dst:
-                    image = src_dst.preview(
+                    if block_params.blocks:
+                        if not isinstance(src_dst, Reader):
+                            raise BadRequestError(
+                                "Block statistics are only available for rasterio datasets."
+                            )
+
+                        if getattr(layer_params, "expression", None) or post_process:
+                            raise BadRequestError(
+                                "Expression and algorithm are not supported with block statistics."
+                            )
+
+                        # blocks are read at the dataset (or overview) resolution,
+                        # resampling options don't apply
+                        options = {**src_dst.options, **dataset_params.as_dict()}
+                        if options.get("vrt_options") or options.get("post_process"):
+                            raise BadRequestError(
+                                "VRT options and post-processing are not supported with block statistics."
+                            )
+
+                        return dataset_statistics(
+                            src_dst.input,
+                            indexes=getattr(layer_params, "indexes", None)
+                            or non_alpha_indexes(src_dst.dataset),
+                            nodata=options.get("nodata"),
+                            unscale=bool(options.get("unscale")),
+                            overview_level=block_params.overview_level,
+                            **stats_params.as_dict(),
+                            hist_options=histogram_params.as_dict(),
+                            env=env,
+                            threads=STATISTICS_THREADS,
+                        )
+
+                    image = self.read_preview(
+                        src_dst,
+                        src_path,
+                        reader_params,
                         **layer_params.as_dict(),
                         **image_params.as_dict(),
                         **dataset_params.as_dict(),
@@ -505,15 +709,11 @@ class TilerFactory(BaseFactory):
             response_model=StatisticsGeoJSON,
             response_model_exclude_none=True,
             response_class=GeoJSONResponse,
-            responses={
-                200: {
-                    "content": {"application/geo+json": {}},
-                    "description": "Return dataset's statistics from feature or featureCollection.",
-                }
-            },
+            responses=geojson_statistics_responses,
             operation_id=f"{self.operation_prefix}postStatisticsForGeoJSON",
         )
         def geojson_statistics(
+            request: Request,
             geojson: Annotated[
                 Union[FeatureCollection, Feature],
                 Body(description="GeoJSON Feature or FeatureCollection."),
@@ -531,43 +731,42 @@ class TilerFactory(BaseFactory):
             env=Depends(self.environment_dependency),
         ):
             """Get Statistics from a geojson feature or featureCollection."""
-            fc = geojson
-            if isinstance(fc, Feature):
-                fc = FeatureCollection(type="FeatureCollection", features=[geojson])
-
-            with rasterio.Env(**env):
-                with self.reader(src_path, **reader_params.as_dict()) as src_dst:
-                    for feature in fc.features:
-                        shape = feature.model_dump(exclude_none=True)
-                        image = src_dst.feature(
-                            shape,
-                            shape_crs=coord_crs or WGS84_CRS,
-                            dst_crs=dst_crs,
-                            align_bounds_with_dataset=True,
-                            **layer_params.as_dict(),
-                            **image_params.as_dict(),
-                            **dataset_params.as_dict(),
-                        )
-
-                        # Get the coverage % array
-                        coverage_array = image.get_coverage_array(
-                            shape,
-                            shape_crs=coord_crs or WGS84_CRS,
-                        )
+            features = [geojson] if isinstance(geojson, Feature) else geojson.features
+
+            def _statistics(src_dst: BaseReader, feature: Feature) -> Dict:
+                shape = feature.model_dump(exclude_none=True)
+                image = src_dst.feature(
+                    shape,
+                    shape_crs=coord_crs or WGS84_CRS,
+                    dst_crs=dst_crs,
+                    align_bounds_with_dataset=True,
+                    **layer_params.as_dict(),
+                    **image_params.as_dict(),
+                    **dataset_params.as_dict(),
+                )
 
-                        if post_process:
-                            image = post_process(image)
+                # Get the coverage % array
+                coverage_array = image.get_coverage_array(
+                    shape,
+                    shape_crs=coord_crs or WGS84_CRS,
+                )
 
-                        stats = image.statistics(
-                            **stats_params.as_dict(),
-                            hist_options=histogram_params.as_dict(),
-                            coverage=coverage_array,
-                        )
+                if post_process:
+                    image = post_process(image)
 
-                        feature.properties = feature.properties or {}
-                        feature.properties.update({"statistics": stats})
+                return image.statistics(
+                    **stats_params.as_dict(),
+                    hist_options=histogram_params.as_dict(),
+                    coverage=coverage_array,
+                )
 
-            return fc.features[0] if isinstance(geojson, Feature) else fc
+            return self.geojson_statistics_response(
+                request,
+                geojson,
+                self.features_statistics(
+                    features, _statistics, src_path, reader_params, env
+                ),
+            )
 
     ############################################################################
     # /tileset
@@ -921,7 +1120,7 @@ class TilerFactory(BaseFactory):
             dataset_params=Depends(self.dataset_dependency),
             post_process=Depends(self.process_dependency),
             colormap=Depends(self.colormap_dependency),
-            render_params=Depends(self.render_dependency),
+            render_params=Depends(self.render_params_dependency),
             env=Depends(self.environment_dependency),
         ):
             """Create map tile from a dataset."""
@@ -1339,14 +1538,17 @@ class TilerFactory(BaseFactory):
             dst_crs=Depends(DstCRSParams),
             post_process=Depends(self.process_dependency),
             colormap=Depends(self.colormap_dependency),
-            render_params=Depends(self.render_dependency),
+            render_params=Depends(self.render_params_dependency),
             env=Depends(self.environment_dependency),
         ):
             """Create preview of a dataset."""
             with rasterio.Env(**env):
                 logger.info(f"opening data with reader: {self.reader}")
                 with self.reader(src_path, **reader_params.as_dict()) as src_dst:
-                    image = src_dst.preview(
+                    image = self.read_preview(
+                        src_dst,
+                        src_path,
+                        reader_params,
                         **layer_params.as_dict(),
                         **image_params.as_dict(exclude_none=False),
                         **dataset_params.as_dict(),
@@ -1409,7 +1611,7 @@ class TilerFactory(BaseFactory):
             coord_crs=Depends(CoordCRSParams),
             post_process=Depends(self.process_dependency),
             colormap=Depends(self.colormap_dependency),
-            render_params=Depends(self.render_dependency),
+            render_params=Depends(self.render_params_dependency),
             env=Depends(self.environment_dependency),
         ):
             """Create image from a bbox."""
@@ -1477,7 +1679,7 @@ class TilerFactory(BaseFactory):
             dst_crs=Depends(DstCRSParams),
             post_process=Depends(self.process_dependency),
             colormap=Depends(self.colormap_dependency),
-            render_params=Depends(self.render_dependency),
+            render_params=Depends(self.render_params_dependency),
             env=Depends(self.environment_dependency),
         ):
             """Create image from a geojson feature."""
@@ -1549,7 +1751,7 @@ class TilerFactory(BaseFactory):
             dataset_params=Depends(self.dataset_dependency),
             post_process=Depends(self.process_dependency),
             colormap=Depends(self.colormap_dependency),
-            render_params=Depends(self.render_dependency),
+            render_params=Depends(self.render_params_dependency),
             env=Depends(self.environment_dependency),
         ):
             """OGC Maps API."""
@@ -1775,7 +1977,10 @@ class MultiBaseTilerFactory(TilerFactory):
                     if not layer_params.assets and not layer_params.expression:
                         layer_params.assets = src_dst.assets
 
-                    image = src_dst.preview(
+                    image = self.read_preview(
+                        src_dst,
+                        src_path,
+                        reader_params,
                         **layer_params.as_dict(),
                         **image_params.as_dict(),
                         **dataset_params.as_dict(),
@@ -1795,15 +2000,11 @@ class MultiBaseTilerFactory(TilerFactory):
             response_model=MultiBaseStatisticsGeoJSON,
             response_model_exclude_none=True,
             response_class=GeoJSONResponse,
-            responses={
-                200: {
-                    "content": {"application/geo+json": {}},
-                    "description": "Return dataset's statistics from feature or featureCollection.",
-                }
-            },
+            responses=geojson_statistics_responses,
             operation_id=f"{self.operation_prefix}postStatisticsForGeoJSON",
         )
         def geojson_statistics(
+            request: Request,
             geojson: Annotated[
                 Union[FeatureCollection, Feature],
                 Body(description="GeoJSON Feature or FeatureCollection."),
@@ -1821,42 +2022,42 @@ class MultiBaseTilerFactory(TilerFactory):
             env=Depends(self.environment_dependency),
         ):
             """Get Statistics from a geojson feature or featureCollection."""
-            fc = geojson
-            if isinstance(fc, Feature):
-                fc = FeatureCollection(type="FeatureCollection", features=[geojson])
-
-            with rasterio.Env(**env):
-                logger.info(f"opening data with reader: {self.reader}")
-                with self.reader(src_path, **reader_params.as_dict()) as src_dst:
-                    # Default to all available assets
-                    if not layer_params.assets and not layer_params.expression:
-                        layer_params.assets = src_dst.assets
-
-                    for feature in fc.features:
-                        image = src_dst.feature(
-                            feature.model_dump(exclude_none=True),
-                            shape_crs=coord_crs or WGS84_CRS,
-                            dst_crs=dst_crs,
-                            align_bounds_with_dataset=True,
-                            **layer_params.as_dict(),
-                            **image_params.as_dict(),
-                            **dataset_params.as_dict(),
-                        )
+            features = [geojson] if isinstance(geojson, Feature) else geojson.features
+
+            def _statistics(src_dst: BaseReader, feature: Feature) -> Dict:
+                layer_options = layer_params.as_dict()
+                # Default to all available assets
+                if not layer_params.assets and not layer_params.expression:
+                    layer_options["assets"] = src_dst.assets
+
+                image = src_dst.feature(
+                    feature.model_dump(exclude_none=True),
+                    shape_crs=coord_crs or WGS84_CRS,
+                    dst_crs=dst_crs,
+                    align_bounds_with_dataset=True,
+                    **layer_options,
+                    **image_params.as_dict(),
+                    **dataset_params.as_dict(),
+                )
 
-                        if post_process:
-                            image = post_process(image)
+                if post_process:
+                    image = post_process(image)
 
-                        stats = image.statistics(
-                            **stats_params.as_dict(),
-                            hist_options=histogram_params.as_dict(),
-                        )
-
-                        feature.properties = feature.properties or {}
-                        # NOTE: because we use `src_dst.feature` the statistics will be in form of
-                        # `Dict[str, BandStatistics]` and not `Dict[str, Dict[str, BandStatistics]]`
-                        feature.properties.update({"statistics": stats})
+                # NOTE: because we use `src_dst.feature` the statistics will be in form of
+                # `Dict[str, BandStatistics]` and not `Dict[str, Dict[str, BandStatistics]]`
+                return image.statistics(
+                    **stats_params.as_dict(),
+                    hist_options=histogram_params.as_dict(),
+                )
 
-            return fc.features[0] if isinstance(geojson, Feature) else fc
+            logger.info(f"opening data with reader: {self.reader}")
+            return self.geojson_statistics_response(
+                request,
+                geojson,
+                self.features_statistics(
+                    features, _statistics, src_path, reader_params, env
+                ),
+            )
 
 
 @define(kw_only=True)
@@ -1994,7 +2195,10 @@ class MultiBandTilerFactory(TilerFactory):
                     if not bands_params.bands and not bands_params.expression:
                         bands_params.bands = src_dst.bands
 
-                    image = src_dst.preview(
+                    image = self.read_preview(
+                        src_dst,
+                        src_path,
+                        reader_params,
                         **bands_params.as_dict(),
                         **image_params.as_dict(),
                         **dataset_params.as_dict(),
@@ -2014,15 +2218,11 @@ class MultiBandTilerFactory(TilerFactory):
             response_model=StatisticsGeoJSON,
             response_model_exclude_none=True,
             response_class=GeoJSONResponse,
-            responses={
-                200: {
-                    "content": {"application/geo+json": {}},
-                    "description": "Return dataset's statistics from feature or featureCollection.",
-                }
-            },
+            responses=geojson_statistics_responses,
             operation_id=f"{self.operation_prefix}postStatisticsForGeoJSON",
         )
         def geojson_statistics(
+            request: Request,
             geojson: Annotated[
                 Union[FeatureCollection, Feature],
                 Body(description="GeoJSON Feature or FeatureCollection."),
@@ -2040,40 +2240,40 @@ class MultiBandTilerFactory(TilerFactory):
             env=Depends(self.environment_dependency),
         ):
             """Get Statistics from a geojson feature or featureCollection."""
-            fc = geojson
-            if isinstance(fc, Feature):
-                fc = FeatureCollection(type="FeatureCollection", features=[geojson])
-
-            with rasterio.Env(**env):
-                logger.info(f"opening data with reader: {self.reader}")
-                with self.reader(src_path, **reader_params.as_dict()) as src_dst:
-                    # Default to all available bands
-                    if not bands_params.bands and not bands_params.expression:
-                        bands_params.bands = src_dst.bands
-
-                    for feature in fc.features:
-                        image = src_dst.feature(
-                            feature.model_dump(exclude_none=True),
-                            shape_crs=coord_crs or WGS84_CRS,
-                            dst_crs=dst_crs,
-                            align_bounds_with_dataset=True,
-                            **bands_params.as_dict(),
-                            **image_params.as_dict(),
-                            **dataset_params.as_dict(),
-                        )
-
-                        if post_process:
-                            image = post_process(image)
+            features = [geojson] if isinstance(geojson, Feature) else geojson.features
+
+            def _statistics(src_dst: BaseReader, feature: Feature) -> Dict:
+                bands_options = bands_params.as_dict()
+                # Default to all available bands
+                if not bands_params.bands and not bands_params.expression:
+                    bands_options["bands"] = src_dst.bands
+
+                image = src_dst.feature(
+                    feature.model_dump(exclude_none=True),
+                    shape_crs=coord_crs or WGS84_CRS,
+                    dst_crs=dst_crs,
+                    align_bounds_with_dataset=True,
+                    **bands_options,
+                    **image_params.as_dict(),
+                    **dataset_params.as_dict(),
+                )
 
-                        stats = image.statistics(
-                            **stats_params.as_dict(),
-                            hist_options=histogram_params.as_dict(),
-                        )
+                if post_process:
+                    image = post_process(image)
 
-                        feature.properties = feature.properties or {}
-                        feature.properties.update({"statistics": stats})
+                return image.statistics(
+                    **stats_params.as_dict(),
+                    hist_options=histogram_params.as_dict(),
+                )
 
-            return fc.features[0] if isinstance(geojson, Feature) else fc
+            logger.info(f"opening data with reader: {self.reader}")
+            return self.geojson_statistics_response(
+                request,
+                geojson,
+                self.features_statistics(
+                    features, _statistics, src_path, reader_params, env
+                ),
+            )
 
 
 @define(kw_only=True)
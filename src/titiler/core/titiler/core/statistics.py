@@ -0,0 +1,558 @@
+"""titiler.core block-wise dataset statistics.
+
+Statistics are computed by walking the dataset (or one of its overviews) block by
+block, keeping only mergeable accumulators in memory:
+
+- `count`, `sum`, `mean`, `std`, `min` and `max` are exact (parallel Welford/Chan
+  moments).
+- `histogram` is exact (fixed bin edges, summed across blocks).
+- `median`, `percentile_*`, `majority`, `minority` and `unique` come from a fine
+  histogram. For integer data spanning at most `STATISTICS_FINE_BINS` values the
+  fine histogram has one bin per value and results are exact. Otherwise the
+  `[min, max]` range is split in `STATISTICS_FINE_BINS` bins and values are
+  approximated by bin centers: `percentile_error` reports the maximum absolute
+  error (half a bin width) and `unique` is a lower bound.
+
+`StatisticsIndex` persists per-dataset statistics so rendering defaults (e.g
+`rescale=auto`) don't need a statistics pass at request time.
+
+"""
+
+import hashlib
+import json
+import math
+import os
+import pathlib
+import tempfile
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import attr
+import numpy
+import rasterio
+from rasterio.windows import Window
+from rio_tiler.constants import MAX_THREADS
+from rio_tiler.utils import non_alpha_indexes
+
+from titiler.core.cache import LRUCache
+from titiler.core.errors import BadRequestError
+
+STATISTICS_FINE_BINS = 65536
+
+STATISTICS_INDEX_DIR = os.getenv("TITILER_STATISTICS_INDEX_DIR")
+STATISTICS_INDEX_TTL = int(os.getenv("TITILER_STATISTICS_INDEX_TTL", 300))
+
+
+class BandMoments:
+    """Mergeable count/min/max/mean/variance accumulator."""
+
+    def __init__(self):
+        """Empty accumulator."""
+        self.count = 0
+        self.masked = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: numpy.ndarray, masked: int = 0):
+        """Add valid values."""
+        self.masked += masked
+        if not values.size:
+            return
+
+        other = BandMoments()
+        values = values.astype("float64")
+        other.count = values.size
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.sum = float(values.sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other: "BandMoments"):
+        """Merge another accumulator (Chan et al. parallel algorithm)."""
+        self.masked += other.masked
+        if not other.count:
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation."""
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+
+def _read_block(
+    src_dst: Any,
+    window: Window,
+    indexes: Sequence[int],
+    nodata: Optional[float],
+    unscale: bool = False,
+) -> numpy.ma.MaskedArray:
+    """Read a block as a masked array."""
+    if nodata is None:
+        data = src_dst.read(indexes, window=window, masked=True)
+    else:
+        data = src_dst.read(indexes, window=window)
+        mask = numpy.isnan(data) if numpy.isnan(nodata) else data == nodata
+        data = numpy.ma.MaskedArray(data, mask=mask)
+
+    if unscale:
+        scales = numpy.array([src_dst.scales[i - 1] for i in indexes])
+        offsets = numpy.array([src_dst.offsets[i - 1] for i in indexes])
+        data = data.astype("float64") * scales[:, None, None] + offsets[:, None, None]
+
+    # Avoid non masked nan/inf values
+    numpy.ma.fix_invalid(data, copy=False)
+
+    return data
+
+
+def _map_blocks(
+    src_path: str,
+    windows: List[Window],
+    func: Callable[[numpy.ma.MaskedArray], Any],
+    merge: Callable[[Any, Any], Any],
+    indexes: Sequence[int],
+    nodata: Optional[float],
+    unscale: bool,
+    overview_level: Optional[int],
+    env: Dict,
+    threads: int,
+) -> Any:
+    """Apply `func` on every block in parallel and merge the results."""
+    options = {"overview_level": overview_level} if overview_level is not None else {}
+
+    def _worker(group: List[Window]) -> Any:
+        result = None
+        with rasterio.Env(**env):
+            with rasterio.open(src_path, **options) as src_dst:
+                for window in group:
+                    value = func(_read_block(src_dst, window, indexes, nodata, unscale))
+                    result = value if result is None else merge(result, value)
+
+        return result
+
+    threads = max(min(threads, len(windows)), 1)
+    groups = [windows[i::threads] for i in range(threads)]
+
+    result = None
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for value in executor.map(_worker, groups):
+            if value is not None:
+                result = value if result is None else merge(result, value)
+
+    return result
+
+
+def _merge_moments(a: List[BandMoments], b: List[BandMoments]) -> List[BandMoments]:
+    for acc, other in zip(a, b):
+        acc.merge(other)
+    return a
+
+
+def _merge_histograms(
+    a: List[Tuple[numpy.ndarray, numpy.ndarray]],
+    b: List[Tuple[numpy.ndarray, numpy.ndarray]],
+) -> List[Tuple[numpy.ndarray, numpy.ndarray]]:
+    return [(fa + fb, ha + hb) for (fa, ha), (fb, hb) in zip(a, b)]
+
+
+class FineHistogram:
+    """Percentiles and value counts from a fine histogram.
+
+    Bin `i` holds values in `[lo + i * width, lo + (i + 1) * width)`. When `exact`
+    is True each bin is a single integer value (`width == 1`).
+
+    """
+
+    def __init__(self, counts: numpy.ndarray, lo: float, width: float, exact: bool):
+        """Create from fine histogram counts."""
+        self.counts = counts
+        self.lo = lo
+        self.width = width
+        self.exact = exact
+        self.cumulative = numpy.cumsum(counts)
+        self.nonzero = numpy.flatnonzero(counts)
+
+    @property
+    def error(self) -> float:
+        """Maximum absolute error of values returned by the sketch."""
+        return 0.0 if self.exact else self.width / 2
+
+    def value(self, bin_idx: int) -> float:
+        """Value represented by a bin (bin center for approximate histograms)."""
+        offset = 0.0 if self.exact else self.width / 2
+        return self.lo + bin_idx * self.width + offset
+
+    def order_statistic(self, rank: int) -> float:
+        """Value of rank `rank` (0-based)."""
+        return self.value(int(numpy.searchsorted(self.cumulative, rank, side="right")))
+
+    def percentile(self, q: float, moments: BandMoments) -> float:
+        """Percentile with linear interpolation between order statistics (numpy's default)."""
+        if not moments.count:
+            return numpy.nan
+
+        rank = (moments.count - 1) * q / 100
+        lower = self.order_statistic(math.floor(rank))
+        upper = self.order_statistic(math.ceil(rank))
+        value = lower + (upper - lower) * (rank - math.floor(rank))
+
+        # bin centers can't be outside the real data range
+        return min(max(value, moments.min), moments.max)
+
+    def majority(self) -> float:
+        """Most frequent value."""
+        if not self.nonzero.size:
+            return numpy.nan
+
+        return self.value(int(numpy.argmax(self.counts)))
+
+    def minority(self) -> float:
+        """Least frequent value."""
+        if not self.nonzero.size:
+            return numpy.nan
+
+        return self.value(int(self.nonzero[numpy.argmin(self.counts[self.nonzero])]))
+
+    def unique(self) -> float:
+        """Number of unique values (lower bound for approximate histograms)."""
+        return float(self.nonzero.size)
+
+
+def dataset_statistics(  # noqa: C901
+    src_path: str,
+    indexes: Optional[Sequence[int]] = None,
+    nodata: Optional[float] = None,
+    unscale: bool = False,
+    overview_level: Optional[int] = None,
+    categorical: bool = False,
+    categories: Optional[List[float]] = None,
+    percentiles: Optional[List[int]] = None,
+    hist_options: Optional[Dict] = None,
+    env: Optional[Dict] = None,
+    threads: int = MAX_THREADS,
+) -> Dict[str, Dict[str, Any]]:
+    """Compute per band statistics by reading the dataset block by block.
+
+    Args:
+        src_path (str): rasterio dataset path.
+        indexes (sequence of int, optional): band indexes. Defaults to all non-alpha bands.
+        nodata (float, optional): overwrite dataset nodata value.
+        unscale (bool): apply the bands scale and offset.
+        overview_level (int, optional): overview level to read (0 is the first overview). Defaults to full resolution.
+        categorical (bool): return counts for each value (integer data only).
+        categories (list of numbers, optional): values for which to report counts.
+        percentiles (list of int, optional): percentiles to compute. Defaults to `[2, 98]`.
+        hist_options (dict, optional): `bins` and `range` options for the output histogram.
+        env (dict, optional): GDAL environment set in each worker thread.
+        threads (int): number of worker threads.
+
+    Returns:
+        dict: statistics per band (same keys as rio-tiler `BandStatistics` plus `percentile_error`).
+
+    """
+    percentiles = percentiles or [2, 98]
+    hist_options = hist_options or {}
+    env = env or {}
+
+    options = {"overview_level": overview_level} if overview_level is not None else {}
+    with rasterio.Env(**env):
+        with rasterio.open(src_path, **options) as src_dst:
+            indexes = list(indexes or non_alpha_indexes(src_dst))
+            windows = [w for _, w in src_dst.block_windows(1)]
+            dtypes = [
+                numpy.dtype("float64" if unscale else src_dst.dtypes[idx - 1])
+                for idx in indexes
+            ]
+
+    run = {
+        "src_path": src_path,
+        "windows": windows,
+        "indexes": indexes,
+        "nodata": nodata,
+        "unscale": unscale,
+        "overview_level": overview_level,
+        "env": env,
+        "threads": threads,
+    }
+
+    # 1st pass: moments and data range
+    def _moments(data: numpy.ma.MaskedArray) -> List[BandMoments]:
+        accs = []
+        for band in data:
+            acc = BandMoments()
+            values = band.compressed()
+            acc.update(values, masked=band.size - values.size)
+            accs.append(acc)
+        return accs
+
+    moments: List[BandMoments] = _map_blocks(
+        func=_moments, merge=_merge_moments, **run
+    ) or [BandMoments() for _ in indexes]
+
+    # 2nd pass: fine histograms (percentiles) and output histograms
+    bins = hist_options.get("bins", 10)
+    fine: List[Tuple[float, float, bool]] = []
+    edges: List[numpy.ndarray] = []
+    for acc, dtype in zip(moments, dtypes):
+        lo = acc.min if acc.count else 0.0
+        hi = acc.max if acc.count else 0.0
+        exact = numpy.issubdtype(dtype, numpy.integer) and (
+            hi - lo + 1 <= STATISTICS_FINE_BINS
+        )
+        if exact:
+            fine.append((lo, 1.0, True))
+        else:
+            fine.append((lo, (hi - lo) / STATISTICS_FINE_BINS or 1.0, False))
+
+        edges.append(
+            numpy.histogram_bin_edges(
+                numpy.array([lo, hi]),
+                bins=bins,
+                range=hist_options.get("range"),
+            )
+        )
+
+    nfine = [
+        int(acc.max - acc.min + 1) if f[2] and acc.count else STATISTICS_FINE_BINS
+        for acc, f in zip(moments, fine)
+    ]
+
+    def _histograms(
+        data: numpy.ma.MaskedArray,
+    ) -> List[Tuple[numpy.ndarray, numpy.ndarray]]:
+        out = []
+        for b, band in enumerate(data):
+            values = band.compressed().astype("float64")
+            lo, width, _ = fine[b]
+            idx = numpy.clip(((values - lo) / width).astype("int64"), 0, nfine[b] - 1)
+            out.append(
+                (
+                    numpy.bincount(idx, minlength=nfine[b]),
+                    numpy.histogram(values, bins=edges[b])[0],
+                )
+            )
+        return out
+
+    histograms = _map_blocks(func=_histograms, merge=_merge_histograms, **run) or [
+        (numpy.zeros(n, dtype="int64"), numpy.zeros(len(e) - 1, dtype="int64"))
+        for n, e in zip(nfine, edges)
+    ]
+
+    output: Dict[str, Dict[str, Any]] = {}
+    for b, (idx, acc) in enumerate(zip(indexes, moments)):
+        fine_counts, hist_counts = histograms[b]
+        lo, width, exact = fine[b]
+        sketch = FineHistogram(fine_counts, lo, width, exact)
+
+        total = acc.count + acc.masked
+        stats: Dict[str, Any] = {
+            "min": acc.min if acc.count else numpy.nan,
+            "max": acc.max if acc.count else numpy.nan,
+            "mean": acc.mean if acc.count else numpy.nan,
+            "count": float(acc.count),
+            "sum": acc.sum,
+            "std": acc.std if acc.count else numpy.nan,
+            "median": sketch.percentile(50, acc),
+            "majority": sketch.majority(),
+            "minority": sketch.minority(),
+            "unique": sketch.unique(),
+            **{f"percentile_{int(p)}": sketch.percentile(p, acc) for p in percentiles},
+            "valid_pixels": float(acc.count),
+            "masked_pixels": float(acc.masked),
+            "valid_percent": round(acc.count / total * 100, 2) if total else 0.0,
+            "percentile_error": sketch.error,
+        }
+
+        if categorical:
+            if not exact:
+                raise BadRequestError(
+                    "Categorical block statistics are only available for integer data."
+                )
+
+            if categories:
+                keys = list(categories)
+                counts = [
+                    int(fine_counts[int(k - lo)])
+                    if 0 <= k - lo < len(fine_counts)
+                    else 0
+                    for k in keys
+                ]
+            else:
+                keys = (sketch.nonzero + lo).astype(dtypes[b]).tolist()
+                counts = fine_counts[sketch.nonzero].tolist()
+
+            stats["histogram"] = [counts, keys]
+        else:
+            stats["histogram"] = [hist_counts.tolist(), edges[b].tolist()]
+
+        output[f"b{idx}"] = stats
+
+    return output
+
+
+def dataset_version(src_path: str, timeout: float = 5.0) -> str:
+    """Get a version identifier for a dataset.
+
+    Uses `mtime` and size for local files and `ETag` (or `Last-Modified`) for
+    HTTP(S) URLs. Other URLs (e.g `s3://`) are not versioned.
+
+    """
+    parsed = urlparse(src_path)
+    if parsed.scheme in ["", "file"]:
+        try:
+            stat = os.stat(parsed.path if parsed.scheme else src_path)
+        except OSError:
+            return ""
+
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    if parsed.scheme in ["http", "https"]:
+        request = urllib.request.Request(src_path, method="HEAD")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.headers.get("ETag") or response.headers.get(
+                    "Last-Modified", ""
+                )
+        except OSError:
+            return ""
+
+    return ""
+
+
+@attr.s
+class StatisticsIndex:
+    """Persistent per-dataset statistics index.
+
+    Statistics are stored as JSON sidecars named after a hash of the dataset URL,
+    its version (see `dataset_version`) and the reading options. A TTL bounded
+    in-memory cache sits in front of the sidecars so hot datasets are not
+    re-validated on every request. Concurrent requests for the same statistics
+    wait for a single computation.
+
+    Attributes:
+        directory (str, optional): Directory for the JSON sidecars. In-memory only when not set.
+        cache (titiler.core.cache.LRUCache): In-memory cache.
+
+    """
+
+    directory: Optional[str] = attr.ib(default=None)
+    cache: LRUCache = attr.ib(
+        factory=lambda: LRUCache(maxsize=512, ttl=STATISTICS_INDEX_TTL)
+    )
+    _locks: Dict[Tuple[str, str], threading.Lock] = attr.ib(
+        factory=dict, init=False, repr=False
+    )
+    _locks_lock: threading.Lock = attr.ib(
+        factory=threading.Lock, init=False, repr=False
+    )
+
+    def _path(self, src_path: str, version: str, options: Dict) -> pathlib.Path:
+        key = json.dumps([src_path, version, options], sort_keys=True, default=str)
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return pathlib.Path(self.directory, f"{name}.json")  # type: ignore
+
+    def get(
+        self,
+        src_path: str,
+        compute: Callable[[], Dict[str, Dict[str, Any]]],
+        **options: Any,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get dataset statistics from the index or compute and store them.
+
+        Args:
+            src_path (str): dataset URL.
+            compute (callable): function returning the statistics (per band dictionaries).
+            options (any): reading options the statistics depend on (e.g indexes, nodata).
+
+        """
+        cache_key = (src_path, json.dumps(options, sort_keys=True, default=str))
+        stats = self.cache.get(cache_key)
+        if stats is not None:
+            return stats
+
+        with self._locks_lock:
+            lock = self._locks.setdefault(cache_key, threading.Lock())
+
+        with lock:
+            try:
+                return self._get(cache_key, src_path, compute, options)
+            finally:
+                with self._locks_lock:
+                    self._locks.pop(cache_key, None)
+
+    def _get(
+        self,
+        cache_key: Tuple[str, str],
+        src_path: str,
+        compute: Callable[[], Dict[str, Dict[str, Any]]],
+        options: Dict,
+    ) -> Dict[str, Dict[str, Any]]:
+        # another request may have computed the statistics while we were waiting
+        stats = self.cache.get(cache_key)
+        if stats is not None:
+            return stats
+
+        path = None
+        if self.directory:
+            path = self._path(src_path, dataset_version(src_path), options)
+            try:
+                stats = json.loads(path.read_text())
+            except (OSError, ValueError):
+                stats = None
+
+        if stats is None:
+            stats = compute()
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with tempfile.NamedTemporaryFile(
+                    "w", dir=path.parent, suffix=".tmp", delete=False
+                ) as f:
+                    json.dump(stats, f)
+
+                os.replace(f.name, path)
+
+        self.cache.set(cache_key, stats)
+        return stats
+
+
+statistics_index = StatisticsIndex(directory=STATISTICS_INDEX_DIR)
+
+
+def rescale_from_statistics(
+    stats: Dict[str, Dict[str, Any]],
+    low: str = "percentile_2",
+    high: str = "percentile_98",
+) -> List[Tuple[float, float]]:
+    """Get per band rescaling ranges from statistics.
+
+    Raises `BadRequestError` when a band has no valid pixels (undefined percentiles).
+
+    """
+    ranges = []
+    for name, band in stats.items():
+        vmin, vmax = band.get(low), band.get(high)
+        if vmin is None or vmax is None or math.isnan(vmin) or math.isnan(vmax):
+            raise BadRequestError(
+                f"Could not compute `rescale=auto` for band {name} (no valid pixels), use explicit `rescale` values."
+            )
+
+        ranges.append((vmin, vmax))
+
+    return ranges
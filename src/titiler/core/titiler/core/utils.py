@@ -4,16 +4,32 @@ from __future__ import annotations
 
 import re
 import warnings
-from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from urllib.parse import urlencode
 
+import attr
 import numpy
+import simplejson as json
 from fastapi import FastAPI
 from fastapi.datastructures import QueryParams
 from fastapi.dependencies.utils import get_dependant, request_params_to_args
+from geojson_pydantic.features import Feature
 from geojson_pydantic.geometries import MultiPolygon, Polygon
+from morecantile import Tile, TileMatrixSet
 from rasterio.dtypes import dtype_ranges
-from rio_tiler.colormap import apply_cmap
+from rasterio.features import bounds as feature_bounds
 from rio_tiler.errors import InvalidDatatypeWarning
 from rio_tiler.models import ImageData
 from rio_tiler.types import BBox, ColorMapType, IntervalTuple
@@ -23,7 +39,10 @@ from starlette.responses import Response
 from starlette.routing import Route, request_response
 from starlette.templating import Jinja2Templates, _TemplateResponse
 
+from titiler.core.colormap import apply_colormap
+from titiler.core.errors import BadRequestError
 from titiler.core.resources.enums import ImageType, MediaType
+from titiler.core.resources.responses import NumpyEncoder
 
 
 def rescale_array(
@@ -61,7 +80,7 @@ def render_image(  # noqa: C901
     colormap: Optional[ColorMapType] = None,
     output_format: Optional[ImageType] = None,
     add_mask: bool = True,
-    rescale: Optional[Sequence[IntervalTuple]] = None,
+    rescale: Optional[Union[Sequence[IntervalTuple], Literal["auto"]]] = None,
     color_formula: Optional[str] = None,
     **kwargs: Any,
 ) -> Tuple[bytes, str]:
@@ -69,6 +88,12 @@ def render_image(  # noqa: C901
 
     This is adapted from https://github.com/cogeotiff/rio-tiler/blob/066878704f841a332a53027b74f7e0a97f10f4b2/rio_tiler/models.py#L698-L764
     """
+    if rescale == "auto":
+        if not image.dataset_statistics:
+            raise BadRequestError("No dataset statistics available for `rescale=auto`.")
+
+        rescale = image.dataset_statistics
+
     if rescale:
         image.rescale(rescale)
 
@@ -79,7 +104,7 @@ def render_image(  # noqa: C901
     datatype_range = image.dataset_statistics or (dtype_ranges[str(data.dtype)],)
 
     if colormap:
-        data, alpha_from_cmap = apply_cmap(data, colormap)
+        data, alpha_from_cmap = apply_colormap(data, colormap)
         # Combine both Mask from dataset and Alpha band from Colormap
         mask = numpy.bitwise_and(alpha_from_cmap, mask)
         datatype_range = (dtype_ranges[str(data.dtype)],)
@@ -128,6 +153,134 @@ def render_image(  # noqa: C901
     )
 
 
+def metatile_parent(tms: TileMatrixSet, tile: Tile, metatile: int) -> Tile:
+    """Return the tile covering a `metatile x metatile` block of tiles which contains `tile`.
+
+    Note: only quadtree TileMatrixSets are supported and `metatile` must be a power of 2.
+
+    """
+    if not tms.is_quadtree:
+        raise ValueError(f"Metatiles require a quadtree TileMatrixSet ({tms.id})")
+
+    if metatile < 1 or metatile & (metatile - 1):
+        raise ValueError(f"Invalid metatile size: {metatile}, should be a power of 2")
+
+    levels = metatile.bit_length() - 1
+    if levels > tile.z:
+        raise ValueError(f"Metatile of size {metatile} is too large for zoom {tile.z}")
+
+    return Tile(x=tile.x >> levels, y=tile.y >> levels, z=tile.z - levels)
+
+
+def split_metatile(
+    image: ImageData,
+    tms: TileMatrixSet,
+    tile: Tile,
+    metatile: int,
+) -> Iterator[Tuple[Tile, ImageData]]:
+    """Split an image covering a metatile into its `metatile x metatile` children tiles.
+
+    Args:
+        image (rio_tiler.models.ImageData): Image read for the metatile (e.g `tilesize=256 * metatile`).
+        tms (morecantile.TileMatrixSet): TileMatrixSet used to read the image.
+        tile (morecantile.Tile): Metatile index (see `metatile_parent`).
+        metatile (int): Number of tiles per metatile side.
+
+    Yields:
+        tuple: children tile index and ImageData.
+
+    """
+    height, width = image.height // metatile, image.width // metatile
+    if height * metatile != image.height or width * metatile != image.width:
+        raise ValueError(
+            f"Image size ({image.width}x{image.height}) is not a multiple of the metatile size ({metatile})"
+        )
+
+    levels = metatile.bit_length() - 1
+    for row in range(metatile):
+        for col in range(metatile):
+            child = Tile(
+                x=(tile.x << levels) + col,
+                y=(tile.y << levels) + row,
+                z=tile.z + levels,
+            )
+            window = (
+                slice(row * height, (row + 1) * height),
+                slice(col * width, (col + 1) * width),
+            )
+            yield (
+                child,
+                attr.evolve(
+                    image,
+                    array=image.array[(slice(None), *window)],
+                    bounds=tms.xy_bounds(child),
+                    cutline_mask=(
+                        image.cutline_mask[window]
+                        if image.cutline_mask is not None
+                        else None
+                    ),
+                ),
+            )
+
+
+def sort_features(features: Sequence[Feature]) -> List[Feature]:
+    """Sort features along a Z-order curve of their bounding box centers.
+
+    Spatially close features end up next to each other, which lets consecutive
+    reads re-use the same dataset blocks.
+
+    """
+    centers = []
+    for feature in features:
+        if feature.geometry is None:
+            centers.append((numpy.nan, numpy.nan))
+            continue
+
+        minx, miny, maxx, maxy = feature_bounds(feature.geometry)
+        centers.append(((minx + maxx) / 2, (miny + maxy) / 2))
+
+    xy = numpy.array(centers, dtype="float64").reshape(-1, 2)
+    valid = ~numpy.isnan(xy).any(axis=1)
+    if not valid.any():
+        return list(features)
+
+    # Scale centers to a 16 bits grid and interleave x/y bits
+    mins = xy[valid].min(axis=0)
+    span = numpy.maximum(xy[valid].max(axis=0) - mins, 1e-12)
+    grid = numpy.zeros(xy.shape, dtype="uint64")
+    grid[valid] = ((xy[valid] - mins) / span * 0xFFFF).astype("uint64")
+
+    codes = numpy.zeros(len(features), dtype="uint64")
+    for bit in range(16):
+        codes |= ((grid[:, 0] >> numpy.uint64(bit)) & numpy.uint64(1)) << numpy.uint64(
+            2 * bit
+        )
+        codes |= ((grid[:, 1] >> numpy.uint64(bit)) & numpy.uint64(1)) << numpy.uint64(
+            2 * bit + 1
+        )
+
+    # Features without geometry go last
+    codes[~valid] = numpy.iinfo("uint64").max
+
+    return [features[i] for i in numpy.argsort(codes, kind="stable")]
+
+
+def features_to_sequence(
+    features: Iterator[Feature], media_type: MediaType = MediaType.geojsonseq
+) -> Iterator[bytes]:
+    """Encode features as GeoJSON Text Sequence (RFC 8142) or Newline Delimited JSON."""
+    prefix = b"\x1e" if media_type == MediaType.geojsonseq else b""
+    for feature in features:
+        content = json.dumps(
+            feature.model_dump(exclude_none=True),
+            ensure_ascii=False,
+            ignore_nan=True,
+            separators=(",", ":"),
+            cls=NumpyEncoder,
+        )
+        yield prefix + content.encode("utf-8") + b"\n"
+
+
 def bounds_to_geometry(bounds: BBox) -> Union[Polygon, MultiPolygon]:
     """Convert bounds to geometry.
 
@@ -1,8 +1,8 @@
 """rio-cogeo Extension."""
 
 from dataclasses import dataclass
-from typing import List, Optional, Type
-from .soar_util import APP_HOSTNAME, APP_DEST_PATH, bbox_to_tiles, exists_in_cache, fetch_tile_and_forward_to_cf_cog, save_or_post_data, to_json, fetch_preview, save_or_post_bytes, encode_url_path_segments
+from typing import List, Literal, Optional, Type
+from .soar_util import APP_HOSTNAME, APP_DEST_PATH, bbox_to_tiles, exists_in_cache, fetch_tile_and_forward_to_cf_cog, generate_metatiles, save_or_post_data, to_json, fetch_preview, save_or_post_bytes, encode_url_path_segments
 
 from typing_extensions import TypedDict
 import rasterio
@@ -12,6 +12,7 @@ import time
 from pathlib import Path
 
 from fastapi import Depends, Query, Response
+from rio_tiler.errors import TileOutsideBounds
 from titiler.extensions.soar_models import COGMetadata
 from typing_extensions import Annotated
 
@@ -145,6 +146,7 @@ class soarCogExtension(FactoryExtension):
             env=Depends(factory.environment_dependency),
             offset: Annotated[int, Query(description="Offset")] = -1,
             limit: Annotated[int, Query(description="Limit")] = -1,
+            metatile: Annotated[Literal[1, 2, 4, 8], Query(description="Read tiles by blocks of `metatile x metatile` tiles.")] = 1,
         ):
             """Read a COG and pre-tile requested zoom level"""
             with rasterio.Env(**env):
@@ -155,7 +157,17 @@ class soarCogExtension(FactoryExtension):
                         tiles = tiles[offset:]
                     if(limit > 0):
                         tiles = tiles[:limit]
-                    generate_tiles(tiles, cache_key, src_path)
+                    if(metatile > 1):
+                        def read_metatile(tile, tilesize):
+                            try:
+                                image = src_dst.tile(tile.x, tile.y, tile.z, tilesize=tilesize)
+                            except TileOutsideBounds:
+                                return None
+                            return image, getattr(src_dst, "colormap", None)
+
+                        generate_metatiles(tiles, cache_key, metatile, read_metatile)
+                    else:
+                        generate_tiles(tiles, cache_key, src_path)
                     return F"Total of {len(tiles)} tiles were send to CF cache."
 
         @factory.router.get(
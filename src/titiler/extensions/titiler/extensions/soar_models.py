@@ -104,4 +104,13 @@ class MosaicJSONMetadata(TypedDict):
     max_zoom: Optional[int]
     tile_url: Optional[str]
     tilematrixset: Optional[str]
-    center: Optional[Tuple[float, float, int]]
\ No newline at end of file
+    center: Optional[Tuple[float, float, int]]
+
+class MosaicJob(TypedDict):
+    """Background MosaicJSON creation job."""
+    id: str
+    status: Literal["pending", "running", "done", "failed"]
+    processed: int
+    total: int
+    mosaic_path: Optional[str]
+    messages: List[str]
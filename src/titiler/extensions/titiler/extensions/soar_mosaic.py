@@ -3,18 +3,27 @@ import pystac
 import json
 import rasterio
 import logging
+import os
 import time
+import uuid
 
 from dataclasses import dataclass
-from typing import List, Optional, cast
+from pathlib import Path
+from typing import List, Literal, Optional, Union, cast
 from typing_extensions import Annotated, TypedDict
 
-from fastapi import Depends, Query, Body, Depends, Query
+from fastapi import BackgroundTasks, Depends, HTTPException, Query, Body, Depends, Query
 from .soar_util import *
-from .soar_models import StacAsset, StacCatalogMetadata, StacItem, MosaicJSONMetadata
+from .soar_util import APP_DEST_PATH, generate_metatiles, save_or_post_data
+from .soar_models import StacAsset, StacCatalogMetadata, StacItem, MosaicJSONMetadata, MosaicJob
+from titiler.core.cache import LRUCache
 from titiler.core.factory import BaseFactory, FactoryExtension
 
+from cogeo_mosaic.errors import NoAssetFoundError
 from cogeo_mosaic.mosaic import MosaicJSON
+from rio_tiler.errors import EmptyMosaicError
+from titiler.mosaic.factory import MOSAIC_THREADS
+from titiler.mosaic.footprints import FootprintMosaicJSON
 from cogeo_mosaic.utils import get_dataset_info
 from pystac import Collection, Item, Catalog, Link
 from pystac.utils import datetime_to_str
@@ -23,6 +32,12 @@ from datetime import datetime, timezone
 
 logger = logging.getLogger('uvicorn.error')
 
+MOSAIC_CREATE_THREADS = int(os.getenv("MOSAIC_CREATE_THREADS", 20))
+
+# Background `/soar/createFromList` jobs, by id. Job status is also written to
+# `{APP_DEST_PATH}/jobs/{id}.json` so any worker can report it.
+mosaic_jobs = LRUCache(maxsize=1000, ttl=24 * 3600)
+
 class CreateBody(TypedDict):
     """POST Body for /create endpoint."""
     links: List[str]
@@ -45,28 +60,49 @@ class soarMosaicExtension(FactoryExtension):
         assert pystac is not None, "'pystac' must be installed to use stacExtension"
 
         @factory.router.post(
-            "/soar/createFromList", 
-            response_model=MosaicJSON, 
+            "/soar/createFromList",
+            response_model=Union[FootprintMosaicJSON, List[str]],
             responses={200: {"description": "Return created MosaicJSON"}},
         )
         def create_mosaic_json_from_list(
             data: Annotated[CreateBody, Body(description="COGs details.")],
+            background_tasks: BackgroundTasks,
             mosaic_path: Annotated[Optional[str], Query(description="Destination path to save the MosaicJSON.")] = None,
             return_result: Annotated[bool, Query(description="Return metadata as response too")] = False,
         ):
-            """Create MosaicJSON from given list of COGs links."""
-            data = MosaicJSON.from_urls(data["links"])
-            messages = []
-            output_file_mosaic = f"{mosaic_path}/mosaic.json"
-            
-            # if (metadata_path is not None):
-            #     messages.append(save_or_send_file(output_file_metadata, json.dumps(metadata)))
-            if(data is not None and mosaic_path is not None):
-                messages.append(save_or_post_data(output_file_mosaic, data.model_dump_json()))
-            
+            """Create MosaicJSON from given list of COGs links.
+
+            When the MosaicJSON is only saved to `mosaic_path`, it is created by a background job
+            (see `/soar/createFromList/jobs/{job_id}`). Job status is shared between workers through
+            `APP_DEST_PATH`: without it, status is only kept in the memory of the worker running the
+            job and polls must reach that worker (single worker deployments).
+            """
+            links = data["links"]
+            job = create_mosaic_job(len(links), mosaic_path)
+            if(mosaic_path is not None and not return_result):
+                save_mosaic_job(job)
+                background_tasks.add_task(run_mosaic_job, job, links, save_status=True)
+                return [F"MosaicJSON job {job['id']} started for {len(links)} COGs."]
+
+            data = run_mosaic_job(job, links, raise_errors=True)
             if(return_result):
                 return data
-            return messages
+            return job["messages"]
+
+        @factory.router.get(
+            "/soar/createFromList/jobs/{job_id}",
+            response_model=MosaicJob,
+            responses={200: {"description": "Return MosaicJSON creation job status"}},
+        )
+        def create_mosaic_json_from_list_job(job_id: str):
+            """Return background MosaicJSON creation job status.
+
+            Jobs are looked up in the worker memory, then in `{APP_DEST_PATH}/jobs`.
+            """
+            job = mosaic_jobs.get(job_id) or load_mosaic_job(job_id)
+            if(job is None):
+                raise HTTPException(404, F"Job {job_id} not found")
+            return job
 
         @factory.router.get(
             "/soar/createFromStacCatalog", 
@@ -132,6 +168,8 @@ class soarMosaicExtension(FactoryExtension):
                     if(k.lower() == "visual"):
                         url = asset.get_absolute_href()
                         geojson_feature = create_geojson_feature(bounds, url)
+                        if(item.geometry is not None):
+                            geojson_feature["properties"]["footprint"] = item.geometry
                         assets_features.append(geojson_feature)
                         current_count = len(assets_features)
                         if(current_count == 1 or current_count % 25 == 24 or (index + 1) == len(items_links)):
@@ -158,7 +196,7 @@ class soarMosaicExtension(FactoryExtension):
 
             data: MosaicJSON | None = None
             if(len(assets_features) > 0):
-                data = MosaicJSON.from_features(assets_features, min_zoom, max_zoom)
+                data = FootprintMosaicJSON.from_features(assets_features, min_zoom, max_zoom)
                 logger.info(F"MosaicJSON created for {collection.title}.")
 
             metadata : StacCatalogMetadata = {
@@ -259,18 +297,29 @@ class soarMosaicExtension(FactoryExtension):
             backend_params=Depends(factory.backend_dependency),
             reader_params=Depends(factory.reader_dependency),
             env=Depends(factory.environment_dependency),
+            metatile: Annotated[Literal[1, 2, 4, 8], Query(description="Read tiles by blocks of `metatile x metatile` tiles.")] = 1,
         ):
             """Read a MosaicJSON"""
             with rasterio.Env(**env):
-                with factory.reader(
+                with factory.backend(
                     src_path,
                     reader=factory.dataset_reader,
-                    reader_options={**reader_params},
-                    **backend_params,
+                    reader_options=reader_params.as_dict(),
+                    **backend_params.as_dict(),
                 ) as src_dst:
                     mosaic : MosaicJSON = src_dst.mosaic_def
                     tiles = bbox_to_tiles(mosaic.bounds, zoom)
-                    generate_tiles(tiles, cache_key, src_path)
+                    if(metatile > 1):
+                        def read_metatile(tile, tilesize):
+                            try:
+                                image, _ = src_dst.tile(tile.x, tile.y, tile.z, tilesize=tilesize, threads=MOSAIC_THREADS)
+                            except (NoAssetFoundError, EmptyMosaicError):
+                                return None
+                            return image, None
+
+                        generate_metatiles(tiles, cache_key, metatile, read_metatile)
+                    else:
+                        generate_tiles(tiles, cache_key, src_path)
                     return F"Total of {len(tiles)} tiles were send to CF cache."
         
         @factory.router.get(
@@ -319,6 +368,87 @@ class soarMosaicExtension(FactoryExtension):
                         response["data"] = None
                     return response
 
+def mosaic_job_path(job_id: str) -> Optional[Path]:
+    """Path of a job status file, `None` without `APP_DEST_PATH` or for invalid ids."""
+    try:
+        job_id = str(uuid.UUID(job_id))
+    except ValueError:
+        return None
+    if(APP_DEST_PATH is None):
+        return None
+    return Path(APP_DEST_PATH, "jobs", f"{job_id}.json")
+
+def save_mosaic_job(job: MosaicJob):
+    """Keep job status in memory and write it to `{APP_DEST_PATH}/jobs` (atomically)."""
+    mosaic_jobs.set(job["id"], job)
+    path = mosaic_job_path(job["id"])
+    if(path is None):
+        return
+    try:
+        path.parent.mkdir(exist_ok=True, parents=True)
+        tmp = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(job))
+        os.replace(tmp, path)
+    except OSError:
+        logger.exception(F"Could not save job {job['id']} status")
+
+def load_mosaic_job(job_id: str) -> Optional[MosaicJob]:
+    """Read job status written by any worker."""
+    path = mosaic_job_path(job_id)
+    if(path is None):
+        return None
+    try:
+        return cast(MosaicJob, json.loads(path.read_text()))
+    except (OSError, ValueError):
+        return None
+
+def create_mosaic_job(total: int, mosaic_path: Optional[str]) -> MosaicJob:
+    """Create a pending MosaicJSON creation job."""
+    job : MosaicJob = {
+        "id": str(uuid.uuid4()),
+        "status": "pending",
+        "processed": 0,
+        "total": total,
+        "mosaic_path": mosaic_path,
+        "messages": [],
+    }
+    return job
+
+def run_mosaic_job(job: MosaicJob, links: List[str], raise_errors: bool = False, save_status: bool = False) -> Optional[FootprintMosaicJSON]:
+    """Create MosaicJSON from COGs links (opened concurrently) and save it to the job `mosaic_path`.
+
+    With `save_status`, job status is saved (see `save_mosaic_job`) when it changes and every 100 COGs.
+    """
+    def progress(processed: int, total: int):
+        job["processed"] = processed
+        if(processed % 100 == 0 or processed == total):
+            logger.info(f"Job {job['id']} progress: {processed / total * 100:.2f}% - {processed} of {total} COGs processed.")
+            if(save_status):
+                save_mosaic_job(job)
+
+    job["status"] = "running"
+    if(save_status):
+        save_mosaic_job(job)
+    try:
+        data = FootprintMosaicJSON.from_urls(links, max_threads=MOSAIC_CREATE_THREADS, progress=progress)
+        mosaic_path = job["mosaic_path"]
+        if(mosaic_path is not None):
+            output_file_mosaic = f"{mosaic_path.strip('/')}/mosaic.json"
+            job["messages"].append(save_or_post_data(mosaic_path, output_file_mosaic, data.model_dump_json(exclude_none=True)))
+        job["status"] = "done"
+        if(save_status):
+            save_mosaic_job(job)
+        return data
+    except Exception as e:
+        logger.exception(F"Job {job['id']} failed")
+        job["messages"].append(F"MosaicJSON creation failed: {e}")
+        job["status"] = "failed"
+        if(save_status):
+            save_mosaic_job(job)
+        if(raise_errors):
+            raise
+        return None
+
 def generate_tiles(tiles, cache_key, src_path):
     total = len(tiles)
     skip_cache_check = False
@@ -1,8 +1,17 @@
 import shutil
 import morecantile
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from morecantile import Tile
+from rio_tiler.constants import MAX_THREADS
+from rio_tiler.models import ImageData
+from rio_tiler.types import ColorMapType
 from titiler.application.settings import ApiSettings
 from titiler.core.dependencies import PreviewParams
+from titiler.core.resources.enums import ImageType
+from titiler.core.utils import metatile_parent, render_image, split_metatile
 from titiler.extensions.soar_models import GeojsonFeature, StacChild, StacExtent
 from pystac import Catalog, Collection, Extent, Link
 from pystac.utils import datetime_to_str
@@ -181,6 +190,79 @@ def forward_to_cf(cache_key, response, zoom, x, y):
         logger.info(response.text)
 
 
+def send_to_cf(cache_key, content, zoom, x, y):
+    """Send an encoded tile (empty for tiles without data) to the CF cache."""
+    headers = {
+        'soar-secret-key': CF_SECRET,
+        'Content-Type': 'image/png'
+    }
+    cf_url = F"https://{CF_HOSTNAME}/tile-cache?cacheKey={cache_key}&z={zoom}&x={x}&y={y}"
+    forward_response = requests.post(cf_url, headers=headers, data=content)
+    if forward_response.status_code != 200:
+        logger.info(f'Failed to forward data. Status code: {forward_response.status_code}')
+        logger.info(forward_response.text)
+
+
+def group_tiles_by_metatile(tiles, metatile, tms: morecantile.TileMatrixSet = WEB_MERCATOR_TMS) -> Dict[Tile, List[Tile]]:
+    """Group (z, x, y) tiles by the `metatile x metatile` block they belong to.
+
+    The block size is clamped to `2 ** z` (the number of tiles per side at zoom `z`).
+    """
+    groups: Dict[Tile, List[Tile]] = {}
+    for z, x, y in tiles:
+        tile = Tile(x=x, y=y, z=z)
+        groups.setdefault(metatile_parent(tms, tile, min(metatile, 2**z)), []).append(tile)
+    return groups
+
+
+def generate_metatiles(
+    tiles,
+    cache_key: str,
+    metatile: int,
+    read_metatile: Callable[[Tile, int], Optional[Tuple[ImageData, Optional[ColorMapType]]]],
+    tms: morecantile.TileMatrixSet = WEB_MERCATOR_TMS,
+):
+    """Seed the CF cache by reading `metatile x metatile` blocks of tiles at once.
+
+    Each block is read (and warped) once with `read_metatile(metatile_index, tilesize)`,
+    cut into tiles which are then encoded and sent to the CF cache in parallel. Tiles
+    of blocks without data (`read_metatile` returning `None`) are sent empty, like the
+    tile endpoints' `204` responses.
+    """
+    groups = group_tiles_by_metatile(tiles, metatile, tms)
+    total = len(groups)
+    skip_cache_check = False
+
+    def _encode_and_send(child: Tile, image: Optional[ImageData], colormap: Optional[ColorMapType]):
+        content = b""
+        if image is not None:
+            content, _ = render_image(image, colormap=colormap, output_format=ImageType.png)
+        send_to_cf(cache_key, content, child.z, child.x, child.y)
+
+    with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
+        for idx, (parent, children) in enumerate(groups.items()):
+            start_time = time.time()
+
+            todo = []
+            for child in children:
+                if(skip_cache_check or not exists_in_cache(cache_key, child.z, child.x, child.y)):
+                    todo.append(child)
+                    skip_cache_check = True
+
+            if todo:
+                size = 2 ** (children[0].z - parent.z)
+                images: Dict[Tile, Optional[ImageData]] = dict.fromkeys(todo)
+                colormap = None
+                result = read_metatile(parent, 256 * size)
+                if result is not None:
+                    image, colormap = result
+                    images.update(split_metatile(image, tms, parent, size))
+                list(executor.map(_encode_and_send, todo, [images[child] for child in todo], [colormap] * len(todo)))
+
+            elapsed_time = time.time() - start_time
+            logger.info(f"Processed metatile {idx} of {total}. [{cache_key},{parent.z},{parent.x},{parent.y}] ({len(todo)} tiles) took {elapsed_time:.2f} seconds")
+
+
 def fetch_preview(src_path,preview_params: PreviewParams) -> bytes:
     url = encode_url_path_segments(src_path)
     logger.info(F"Fetching preview from URL: {url}")
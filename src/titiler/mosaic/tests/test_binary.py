@@ -0,0 +1,83 @@
+"""Test titiler.mosaic binary mosaic format."""
+
+import os
+
+import pytest
+from cogeo_mosaic.backends import FileBackend
+from cogeo_mosaic.errors import MosaicExistsError
+
+from titiler.mosaic.backends import (
+    BinaryMosaicBackend,
+    IndexedMosaicBackend,
+    convert_mosaic,
+)
+from titiler.mosaic.binary import decode_mosaic, encode_mosaic, zstandard
+from titiler.mosaic.cache import mosaic_cache
+
+from .conftest import DATA_DIR
+from .test_index import random_mosaic
+
+mosaic_path = os.path.join(DATA_DIR, "mosaic.json")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Empty the process-wide cache between tests."""
+    mosaic_cache.clear()
+    yield
+    mosaic_cache.clear()
+
+
+def test_encode_decode():
+    """Binary mosaics should resolve the same assets as MosaicJSON."""
+    mosaic_def = random_mosaic()
+    decoded = decode_mosaic(encode_mosaic(mosaic_def))
+    assert decoded.tiles == {}
+    assert decoded.asset_prefix == mosaic_def.asset_prefix
+    assert decoded.to_mosaicjson().tiles == mosaic_def.tiles
+
+    with pytest.raises(ValueError):
+        decode_mosaic(b"NOTAMOSAIC" + bytes(16))
+
+
+def test_binary_backend(tmp_path):
+    """Read binary mosaic with the indexed backends."""
+    output = str(tmp_path / "mosaic.mosaic")
+    convert_mosaic(mosaic_path, output)
+
+    with pytest.raises(MosaicExistsError):
+        convert_mosaic(mosaic_path, output)
+
+    with FileBackend(mosaic_path) as ref, IndexedMosaicBackend(output) as src:
+        assert isinstance(src, BinaryMosaicBackend)
+        assert src.mosaic_def.tiles == {}
+        assert sorted(src._quadkeys) == sorted(ref._quadkeys)
+        assert sorted(src.info(quadkeys=True).quadkeys) == sorted(
+            ref.info(quadkeys=True).quadkeys
+        )
+        assert src.assets_for_tile(150, 182, 9) == ref.assets_for_tile(150, 182, 9)
+        assert src.assets_for_point(-73, 45) == ref.assets_for_point(-73, 45)
+        bbox = (-76, 44, -70, 47)
+        assert src.assets_for_bbox(*bbox) == ref.assets_for_bbox(*bbox)
+        # cache entries are sized from the index arrays and string table
+        assert mosaic_cache._data[output].size == src.mosaic_index.nbytes
+
+    with IndexedMosaicBackend(f"file://{output}") as src:
+        assert isinstance(src, BinaryMosaicBackend)
+
+    # binary to MosaicJSON
+    json_output = str(tmp_path / "mosaic.json")
+    convert_mosaic(output, json_output)
+    with FileBackend(mosaic_path) as ref, FileBackend(json_output) as src:
+        assert src.mosaic_def.tiles == ref.mosaic_def.tiles
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+def test_binary_backend_zstd(tmp_path):
+    """Read zstd compressed binary mosaic."""
+    output = str(tmp_path / "mosaic.mosaic.zst")
+    convert_mosaic(mosaic_path, output)
+
+    with FileBackend(mosaic_path) as ref, IndexedMosaicBackend(output) as src:
+        assert isinstance(src, BinaryMosaicBackend)
+        assert src.assets_for_tile(150, 182, 9) == ref.assets_for_tile(150, 182, 9)
@@ -0,0 +1,150 @@
+"""Test titiler.mosaic MosaicJSON cache."""
+
+import os
+import shutil
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from cogeo_mosaic.errors import MosaicError, MosaicNotFoundError
+from cogeo_mosaic.mosaic import MosaicJSON
+
+from titiler.mosaic.backends import IndexedFileBackend, IndexedHttpBackend
+from titiler.mosaic.cache import (
+    CachedMosaic,
+    MosaicDefinitionCache,
+    mosaic_cache,
+    mosaic_nbytes,
+)
+
+from .conftest import DATA_DIR
+
+mosaic_path = os.path.join(DATA_DIR, "mosaic.json")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Empty the process-wide cache between tests."""
+    mosaic_cache.clear()
+    yield
+    mosaic_cache.clear()
+
+
+def test_file_cache(tmp_path):
+    """MosaicJSON should be re-used until the file changes."""
+    path = str(tmp_path / "mosaic.json")
+    shutil.copy(mosaic_path, path)
+
+    with IndexedFileBackend(path) as src:
+        mosaic_def = src.mosaic_def
+        assert path in mosaic_cache
+
+    with IndexedFileBackend(path) as src:
+        assert src.mosaic_def is mosaic_def
+
+    # expired entries are revalidated using the file mtime and size
+    with patch.object(mosaic_cache, "ttl", 0):
+        with IndexedFileBackend(path) as src:
+            assert src.mosaic_def is mosaic_def
+
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        with IndexedFileBackend(path) as src:
+            assert src.mosaic_def is not mosaic_def
+            assert src.mosaic_def.tiles == mosaic_def.tiles
+
+    with pytest.raises(MosaicError):
+        IndexedFileBackend(str(tmp_path / "missing.json"))
+
+
+def test_compact_assets():
+    """Identical assets should share the same string."""
+    with IndexedFileBackend(mosaic_path) as src:
+        assets = {}
+        for quadkey_assets in src.mosaic_def.tiles.values():
+            for asset in quadkey_assets:
+                assert assets.setdefault(asset, asset) is asset
+
+
+def test_mosaic_nbytes():
+    """Cache entries should be sized from the parsed MosaicJSON."""
+    with IndexedFileBackend(mosaic_path) as src:
+        mosaic_def = src.mosaic_def
+
+    nbytes = mosaic_nbytes(mosaic_def)
+    assert mosaic_cache.nbytes == nbytes
+
+    # shared asset strings are only counted once
+    copy = mosaic_def.model_copy()
+    copy.tiles = {
+        quadkey: ["".join(list(asset)) for asset in assets]
+        for quadkey, assets in mosaic_def.tiles.items()
+    }
+    assert mosaic_nbytes(copy) > nbytes
+
+
+def test_http_cache():
+    """HTTP MosaicJSON should be revalidated with its ETag."""
+    with open(mosaic_path, "rb") as f:
+        body = f.read()
+
+    ok = MagicMock(status_code=200, content=body, headers={"ETag": '"abc"'})
+    not_modified = MagicMock(status_code=304)
+
+    url = "https://example.com/mosaic.json"
+    with patch("titiler.mosaic.backends.httpx.get", return_value=ok) as get:
+        with IndexedHttpBackend(url) as src:
+            mosaic_def = src.mosaic_def
+        get.assert_called_once_with(url, headers={})
+
+    with patch.object(mosaic_cache, "ttl", 0):
+        with patch(
+            "titiler.mosaic.backends.httpx.get", return_value=not_modified
+        ) as get:
+            with IndexedHttpBackend(url) as src:
+                assert src.mosaic_def is mosaic_def
+            get.assert_called_once_with(url, headers={"If-None-Match": '"abc"'})
+
+        with patch("titiler.mosaic.backends.httpx.get", return_value=ok):
+            with IndexedHttpBackend(url) as src:
+                assert src.mosaic_def is not mosaic_def
+
+    response = httpx.Response(404, request=httpx.Request("GET", url))
+    with patch("titiler.mosaic.backends.httpx.get", return_value=response):
+        with pytest.raises(MosaicNotFoundError):
+            IndexedHttpBackend("https://example.com/missing.json")
+
+
+def test_memory_budget():
+    """Least recently used entries should be evicted to fit the budget."""
+    cache = MosaicDefinitionCache(ttl=300, maxbytes=100)
+    mosaic_def = MosaicJSON(
+        mosaicjson="0.0.3",
+        minzoom=0,
+        maxzoom=1,
+        bounds=(-180, -85, 180, 85),
+        tiles={},
+    )
+
+    cache.set("a", CachedMosaic(mosaic_def, "", 40, 0))
+    cache.set("b", CachedMosaic(mosaic_def, "", 40, 0))
+    assert cache.nbytes == 80
+
+    cache.set("c", CachedMosaic(mosaic_def, "", 40, 0))
+    assert "a" not in cache
+    assert len(cache) == 2
+    assert cache.nbytes == 80
+
+    # entries larger than the budget are not cached
+    cache.set("d", CachedMosaic(mosaic_def, "", 200, 0))
+    assert "d" not in cache
+
+    loads = []
+
+    def load(etag):
+        loads.append(etag)
+        return mosaic_def, "1"
+
+    assert cache.get("e", load) is mosaic_def
+    assert cache.get("e", load) is mosaic_def
+    assert loads == [None]
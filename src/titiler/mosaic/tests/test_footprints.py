@@ -0,0 +1,173 @@
+"""Test titiler.mosaic assets footprints."""
+
+import json
+import os
+from unittest.mock import patch
+
+import morecantile
+import numpy
+import pytest
+import rasterio
+import shapely
+from cogeo_mosaic.errors import NoAssetFoundError
+from cogeo_mosaic.mosaic import MosaicJSON
+from rasterio.enums import Resampling
+from rasterio.transform import from_origin
+from rasterio.warp import transform
+from rio_tiler.io import Reader
+from shapely.geometry import box, mapping, shape
+
+from titiler.mosaic.backends import IndexedMemoryBackend, IndexedMosaicBackend
+from titiler.mosaic.footprints import (
+    FootprintMosaicJSON,
+    dataset_features,
+    dataset_footprint,
+    get_datasets_footprints,
+)
+
+from .conftest import DATA_DIR
+
+assets = [os.path.join(DATA_DIR, asset) for asset in ["cog1.tif", "cog2.tif"]]
+tms = morecantile.tms.get("WebMercatorQuad")
+
+
+def test_dataset_footprint():
+    """Footprint should only cover valid data."""
+    with Reader(assets[0]) as src:
+        footprint = shape(dataset_footprint(src))
+        bbox = box(*src.get_geographic_bounds("epsg:4326"))
+
+    assert footprint.is_valid
+    assert bbox.buffer(1e-6).contains(footprint)
+    assert footprint.area < bbox.area
+
+
+@pytest.mark.parametrize("overviews", [False, True])
+def test_dataset_footprint_contains_data(tmp_path, overviews):
+    """Footprint should contain every valid pixel, even thin or ragged areas."""
+    path = str(tmp_path / "sparse.tif")
+    data = numpy.zeros((1024, 1024), dtype="uint8")
+    data[100:400, 200:450] = 1
+    data[150:160, 460:463] = 1
+    data[600:603, 50:1000] = 1
+    data[650:1000, 900:903] = 1
+    data[800:803, 700:703] = 1
+    data[1020:1023, 3:6] = 1
+
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        width=1024,
+        height=1024,
+        count=1,
+        dtype="uint8",
+        nodata=0,
+        crs="epsg:32620",
+        transform=from_origin(500000, 2000000, 30, 30),
+        tiled=True,
+    ) as dst:
+        dst.write(data, 1)
+        if overviews:
+            dst.build_overviews([2, 4, 8], Resampling.nearest)
+
+    with Reader(path) as src:
+        footprint = shape(dataset_footprint(src, max_size=128))
+        bbox = box(*src.get_geographic_bounds("epsg:4326"))
+        rows, cols = numpy.nonzero(data)
+        xs, ys = rasterio.transform.xy(src.dataset.transform, rows, cols)
+        lons, lats = transform(src.crs, "epsg:4326", xs, ys)
+
+    assert footprint.is_valid
+    assert footprint.area < bbox.area
+    assert all(shapely.contains_xy(footprint, lons, lats))
+
+
+def test_datasets_footprints():
+    """Datasets footprints should be read concurrently and cached."""
+    dataset_features.clear()
+
+    calls = []
+    features = get_datasets_footprints(
+        assets, max_threads=2, progress=lambda *args: calls.append(args)
+    )
+    assert [feat["properties"]["path"] for feat in features] == assets
+    assert calls == [(1, 2), (2, 2)]
+
+    with patch("titiler.mosaic.footprints.Reader") as reader:
+        assert get_datasets_footprints(assets) == features
+        reader.assert_not_called()
+
+
+def test_from_urls():
+    """Quadkeys should only list assets intersecting them."""
+    ref = MosaicJSON.from_urls(assets, quiet=True)
+    mosaic_def = FootprintMosaicJSON.from_urls(assets, max_threads=2)
+    assert set(mosaic_def.footprints) == set(assets)
+    assert set(mosaic_def.tiles) <= set(ref.tiles)
+
+    skipped = 0
+    for quadkey, quadkey_assets in ref.tiles.items():
+        tile_geom = box(*tms.bounds(tms.quadkey_to_tile(quadkey)))
+        for asset in quadkey_assets:
+            footprint = shape(mosaic_def.footprints[asset])
+            if asset in mosaic_def.tiles.get(quadkey, []):
+                assert footprint.intersects(tile_geom)
+            else:
+                assert not footprint.intersects(tile_geom) or footprint.touches(
+                    tile_geom
+                )
+                skipped += 1
+
+    assert skipped
+
+    # footprints keys match the tiles assets
+    mosaic_def = FootprintMosaicJSON.from_urls(
+        assets, max_threads=2, asset_prefix=DATA_DIR
+    )
+    assert set(mosaic_def.footprints) == {"/cog1.tif", "/cog2.tif"}
+
+
+@pytest.mark.parametrize("ext", ["mosaic.json", "mosaic.json.gz", "mosaic"])
+def test_roundtrip(tmp_path, ext):
+    """Backends should keep the footprints."""
+    mosaic_def = FootprintMosaicJSON.from_urls(assets, max_threads=2)
+    path = str(tmp_path / f"footprints.{ext}")
+    with IndexedMosaicBackend(path, mosaic_def=mosaic_def) as dst:
+        dst.write()
+
+    with IndexedMosaicBackend(path) as src:
+        footprints = json.loads(json.dumps(mosaic_def.footprints))
+        assert src.mosaic_def.footprints == footprints
+        assert set(src.mosaic_index.footprints) == set(assets)
+
+
+def test_tile_footprints():
+    """Assets whose footprint doesn't intersect the tile shouldn't be read."""
+    tile = (152, 183, 9)
+    mosaic_def = MosaicJSON.from_urls(assets, quiet=True)
+    with IndexedMemoryBackend(mosaic_def=mosaic_def) as src:
+        _, assets_used = src.tile(*tile)
+        assert assets_used == assets
+
+    # cog1 footprint is moved away from the tile
+    tile_bounds = tms.bounds(*tile)
+    elsewhere = mapping(box(0, 0, 1, 1))
+    with IndexedMemoryBackend(
+        mosaic_def=FootprintMosaicJSON(
+            **mosaic_def.model_dump(), footprints={assets[0]: elsewhere}
+        )
+    ) as src:
+        _, assets_used = src.tile(*tile)
+        assert assets_used == [assets[1]]
+
+    # footprints only touching the tile are skipped
+    touching = mapping(box(tile_bounds.right, 0, tile_bounds.right + 1, 60))
+    with IndexedMemoryBackend(
+        mosaic_def=FootprintMosaicJSON(
+            **mosaic_def.model_dump(),
+            footprints={assets[0]: elsewhere, assets[1]: touching},
+        )
+    ) as src:
+        with pytest.raises(NoAssetFoundError):
+            src.tile(*tile)
@@ -0,0 +1,105 @@
+"""Test titiler.mosaic compiled index."""
+
+import os
+
+import morecantile
+import numpy
+import pytest
+from cogeo_mosaic.backends import FileBackend, MemoryBackend
+from cogeo_mosaic.mosaic import MosaicJSON
+
+from titiler.mosaic.backends import (
+    IndexedFileBackend,
+    IndexedMemoryBackend,
+    IndexedMosaicBackend,
+)
+from titiler.mosaic.index import get_mosaic_index, tile_to_int
+
+from .conftest import DATA_DIR
+
+mosaic_path = os.path.join(DATA_DIR, "mosaic.json")
+WEB_MERCATOR_TMS = morecantile.tms.get("WebMercatorQuad")
+
+
+def random_mosaic(quadkey_zoom: int = 8, size: int = 500) -> MosaicJSON:
+    """Create a MosaicJSON with random quadkeys and assets."""
+    rng = numpy.random.default_rng(42)
+    xs = rng.integers(100, 140, size)
+    ys = rng.integers(80, 120, size)
+    tiles = {
+        WEB_MERCATOR_TMS.quadkey(int(x), int(y), quadkey_zoom): [
+            f"asset_{a}.tif" for a in rng.integers(0, 200, rng.integers(1, 4))
+        ]
+        for x, y in zip(xs, ys)
+    }
+    return MosaicJSON(
+        mosaicjson="0.0.3",
+        minzoom=6,
+        maxzoom=12,
+        quadkey_zoom=quadkey_zoom,
+        bounds=(-180, -85, 180, 85),
+        tiles=tiles,
+        asset_prefix="s3://bucket/",
+    )
+
+
+def test_tile_to_int():
+    """Tile indices should match quadkey integers."""
+    for tile in [(0, 0, 0), (1, 0, 1), (486, 332, 10), (3, 5, 3)]:
+        qk = WEB_MERCATOR_TMS.quadkey(*tile)
+        assert tile_to_int(*tile) == (int(qk, 4) if qk else 0)
+
+
+def test_index_file():
+    """Compare indexed and default backends with a MosaicJSON file."""
+    with FileBackend(mosaic_path) as ref, IndexedFileBackend(mosaic_path) as src:
+        for tile in [(150, 182, 9), (75, 91, 8), (9, 11, 5), (1200, 1456, 12)]:
+            assert src.assets_for_tile(*tile) == ref.assets_for_tile(*tile)
+
+        assert src.assets_for_point(-73, 45) == ref.assets_for_point(-73, 45)
+        bbox = (-76, 44, -70, 47)
+        assert src.assets_for_bbox(*bbox) == ref.assets_for_bbox(*bbox)
+
+
+@pytest.mark.parametrize("quadkey_zoom", [7, 8, 10])
+def test_index_random(quadkey_zoom):
+    """Compare indexed and default backends on random mosaics."""
+    mosaic_def = random_mosaic(quadkey_zoom)
+    ref = MemoryBackend(mosaic_def=mosaic_def)
+    src = IndexedMemoryBackend(mosaic_def=mosaic_def)
+
+    rng = numpy.random.default_rng(0)
+    for z in range(quadkey_zoom - 3, quadkey_zoom + 3):
+        scale = 2 ** (z - 8)
+        for _ in range(20):
+            x = int(rng.integers(100, 140) * scale)
+            y = int(rng.integers(80, 120) * scale)
+            assert src.get_assets(x, y, z) == ref.get_assets(x, y, z)
+
+    for bbox in [(-3, 20, 3, 25), (5, 10, 8, 12), (-20, 30, -15, 40)]:
+        assert src.assets_for_bbox(*bbox) == ref.assets_for_bbox(*bbox)
+
+    for lon, lat in [(0, 30), (10, 1), (20.5, 40.2)]:
+        assert src.assets_for_point(lon, lat) == ref.assets_for_point(lon, lat)
+
+
+def test_index_cache():
+    """Index should be cached and rebuilt when the mosaic changes."""
+    mosaic_def = random_mosaic()
+    index = get_mosaic_index(mosaic_def)
+    assert get_mosaic_index(mosaic_def) is index
+
+    mosaic_def._increase_version()
+    assert get_mosaic_index(mosaic_def) is not index
+
+
+def test_backend_selection():
+    """Should use indexed backends when the tiles are in memory."""
+    with IndexedMosaicBackend(mosaic_path) as src:
+        assert isinstance(src, IndexedFileBackend)
+
+    with IndexedMosaicBackend(f"file://{mosaic_path}") as src:
+        assert isinstance(src, IndexedFileBackend)
+
+    with IndexedMosaicBackend(":memory:", mosaic_def=random_mosaic()) as src:
+        assert isinstance(src, IndexedMemoryBackend)
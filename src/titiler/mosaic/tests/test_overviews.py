@@ -0,0 +1,74 @@
+"""Test titiler.mosaic low zoom overviews."""
+
+import os
+
+import numpy
+import pytest
+from cogeo_mosaic.mosaic import MosaicJSON
+from rio_tiler.io import Reader
+
+from titiler.mosaic.backends import (
+    IndexedMemoryBackend,
+    IndexedMosaicBackend,
+    convert_mosaic,
+    create_mosaic_overview,
+)
+from titiler.mosaic.overviews import MosaicOverview, OverviewMosaicJSON
+
+from .conftest import DATA_DIR
+
+assets = [os.path.join(DATA_DIR, asset) for asset in ["cog1.tif", "cog2.tif"]]
+
+
+@pytest.mark.parametrize("ext", ["mosaic.json", "mosaic"])
+def test_mosaic_overview(tmp_path, ext):
+    """Low zoom tiles should be read from the overview COG."""
+    mosaic_def = MosaicJSON.from_urls(assets, quiet=True)
+    json_path = str(tmp_path / "mosaic.json")
+    with IndexedMosaicBackend(json_path, mosaic_def=mosaic_def) as dst:
+        dst.write()
+
+    mosaic_path = str(tmp_path / f"overview.{ext}")
+    if ext != "mosaic.json":
+        convert_mosaic(json_path, mosaic_path)
+    else:
+        mosaic_path = json_path
+
+    overview_path = str(tmp_path / "overview.tif")
+    overview = create_mosaic_overview(mosaic_path, overview_path, threads=2)
+    assert overview == MosaicOverview(
+        path=overview_path, minzoom=0, maxzoom=mosaic_def.minzoom - 1
+    )
+
+    with Reader(overview_path) as src:
+        assert src.dataset.overviews(1)
+        assert src.dataset.crs == "epsg:3857"
+
+    with IndexedMosaicBackend(mosaic_path) as src:
+        assert isinstance(src.mosaic_def, OverviewMosaicJSON)
+        assert src.mosaic_def.overviews == [overview]
+        assert src.minzoom == 0
+        assert src.maxzoom == mosaic_def.maxzoom
+
+        tile = src.tms.tile(-73, 45, overview.maxzoom)
+        img, assets_used = src.tile(*tile, threads=2)
+        assert assets_used == [overview_path]
+
+        # zoom levels above the overview still read the assets
+        tile = src.tms.tile(-73, 45, mosaic_def.minzoom)
+        _, assets_used = src.tile(*tile)
+        assert assets_used != [overview_path]
+
+    # same data as reading the assets
+    with IndexedMemoryBackend(mosaic_def=mosaic_def) as src:
+        tile = src.tms.tile(-73, 45, overview.maxzoom)
+        ref, _ = src.tile(*tile)
+
+    numpy.testing.assert_array_equal(img.array.mask, ref.array.mask)
+    numpy.testing.assert_array_equal(img.array, ref.array)
+
+    # overviews with the same path are replaced
+    overview = create_mosaic_overview(mosaic_path, overview_path, zoom=5, threads=2)
+    with IndexedMosaicBackend(mosaic_path) as src:
+        assert src.mosaic_def.overviews == [overview]
+        assert overview.maxzoom == 5
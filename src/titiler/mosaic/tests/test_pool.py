@@ -0,0 +1,145 @@
+"""Test titiler.mosaic readers pool."""
+
+import os
+from unittest.mock import patch
+
+import attr
+import morecantile
+import pytest
+import rasterio
+from cogeo_mosaic.mosaic import MosaicJSON
+from rio_tiler.errors import TileOutsideBounds
+from rio_tiler.io import Reader
+
+from titiler.mosaic.backends import IndexedMemoryBackend
+from titiler.mosaic.pool import ReaderPool
+
+from .conftest import DATA_DIR
+
+assets = [os.path.join(DATA_DIR, asset) for asset in ["cog1.tif", "cog2.tif"]]
+tms = morecantile.tms.get("WebMercatorQuad")
+
+
+@attr.s
+class CountingReader(Reader):
+    """Reader counting opened datasets."""
+
+    opened = 0
+
+    def __attrs_post_init__(self):
+        """Count opened datasets."""
+        CountingReader.opened += 1
+        super().__attrs_post_init__()
+
+
+def test_reader_pool():
+    """Readers should be re-used."""
+    pool = ReaderPool(maxsize=2, ttl=300)
+
+    with pool.reader(Reader, assets[0], tms=tms) as src:
+        first = src
+        assert not src.dataset.closed
+
+    assert len(pool) == 1
+    with pool.reader(Reader, assets[0], tms=tms) as src:
+        assert src is first
+        assert len(pool) == 0
+
+    # readers in use are not shared
+    with pool.reader(Reader, assets[0], tms=tms) as src1:
+        with pool.reader(Reader, assets[0], tms=tms) as src2:
+            assert src1 is first
+            assert src2 is not first
+
+    assert len(pool) == 2
+
+    # options are part of the key
+    with pool.reader(Reader, assets[0], tms=tms, options={"nodata": 0}) as src:
+        assert src is not first
+
+    # least recently used readers are closed
+    assert len(pool) == 2
+    assert src2.dataset.closed
+    assert not first.dataset.closed
+
+    pool.clear()
+    assert len(pool) == 0
+
+
+def test_reader_pool_errors():
+    """Readers should only be closed on unexpected errors."""
+    pool = ReaderPool(maxsize=2, ttl=300)
+
+    with pytest.raises(TileOutsideBounds):
+        with pool.reader(Reader, assets[0], tms=tms) as src:
+            src.tile(0, 0, 10)
+
+    assert len(pool) == 1
+    assert not src.dataset.closed
+
+    with pytest.raises(ValueError):
+        with pool.reader(Reader, assets[0], tms=tms) as src:
+            raise ValueError("something went wrong")
+
+    assert len(pool) == 0
+    assert src.dataset.closed
+
+    # expired readers are closed
+    with pool.reader(Reader, assets[0], tms=tms) as src:
+        pass
+
+    with patch.object(pool, "ttl", 0):
+        with pool.reader(Reader, assets[0], tms=tms) as src2:
+            assert src2 is not src
+            assert src.dataset.closed
+
+    # disabled pool
+    pool = ReaderPool(maxsize=0)
+    with pool.reader(Reader, assets[0], tms=tms) as src:
+        pass
+
+    assert len(pool) == 0
+    assert src.dataset.closed
+
+
+def test_backend_reader_pool():
+    """Backends should share opened readers across tiles."""
+    mosaic_def = MosaicJSON.from_urls(assets, quiet=True)
+    pool = ReaderPool(maxsize=8, ttl=300)
+    CountingReader.opened = 0
+
+    reads = []
+    with patch.object(IndexedMemoryBackend, "reader_pool", pool):
+        for tile in [(150, 182, 9), (151, 182, 9), (150, 183, 9)]:
+            with IndexedMemoryBackend(
+                mosaic_def=mosaic_def, reader=CountingReader
+            ) as src:
+                _, assets_used = src.tile(*tile, threads=0)
+                reads.extend(assets_used)
+
+    assert len(reads) > len(set(reads))
+    assert CountingReader.opened == len(set(reads))
+    pool.clear()
+
+
+def test_backend_reader_pool_env():
+    """Readers opened under different rasterio environments are not shared."""
+    mosaic_def = MosaicJSON.from_urls(assets, quiet=True)
+    pool = ReaderPool(maxsize=8, ttl=300)
+    CountingReader.opened = 0
+
+    with patch.object(IndexedMemoryBackend, "reader_pool", pool):
+        with IndexedMemoryBackend(mosaic_def=mosaic_def, reader=CountingReader) as src:
+            # assets are read in worker threads (threads > 0)
+            with rasterio.Env(GDAL_HTTP_USERPWD="a:secret"):
+                _, assets_a = src.tile(150, 182, 9, threads=2)
+
+            with rasterio.Env(GDAL_HTTP_USERPWD="b:secret"):
+                _, assets_b = src.tile(150, 182, 9, threads=2)
+
+            with rasterio.Env(GDAL_HTTP_USERPWD="a:secret"):
+                src.tile(150, 182, 9, threads=2)
+
+    assert assets_a == assets_b
+    assert CountingReader.opened == len(assets_a) + len(assets_b)
+    pool.clear()
@@ -0,0 +1,91 @@
+"""Test titiler.mosaic wave reader."""
+
+import os
+import threading
+
+import numpy
+import pytest
+from cogeo_mosaic.backends import MemoryBackend
+from cogeo_mosaic.mosaic import MosaicJSON
+from rio_tiler.models import ImageData
+from rio_tiler.mosaic.methods import PixelSelectionMethod
+
+from titiler.mosaic.backends import IndexedMemoryBackend
+from titiler.mosaic.reader import assets_to_cover, mosaic_wave_reader
+
+from .conftest import DATA_DIR
+
+
+def make_reader(masks):
+    """Create a reader returning partially masked images and recording reads."""
+    reads = []
+    lock = threading.Lock()
+
+    def _reader(asset, *args, **kwargs):
+        with lock:
+            reads.append(asset)
+
+        data = numpy.ma.MaskedArray(
+            numpy.full((1, 4, 4), int(asset[1:]), dtype="uint8"),
+            mask=numpy.broadcast_to(masks[asset], (1, 4, 4)),
+        )
+        return ImageData(data)
+
+    return _reader, reads
+
+
+def test_assets_to_cover():
+    """Count assets needed to cover quadkeys."""
+    coverage = {"a": {0, 1}, "b": {1}, "c": {2, 3}, "d": {0, 1, 2, 3}}
+    assert assets_to_cover(["a", "b", "c", "d"], coverage, 4) == 3
+    assert assets_to_cover(["d", "a"], coverage, 4) == 1
+    assert assets_to_cover(["a", "b"], coverage, 4) == 2
+
+
+def test_wave_reader():
+    """Should stop reading once the tile is filled."""
+    full = numpy.zeros((4, 4), dtype="bool")
+    half = numpy.zeros((4, 4), dtype="bool")
+    half[:2] = True
+    masks = {f"a{i}": half if i < 3 else full for i in range(30)}
+
+    reader, reads = make_reader(masks)
+    img, assets = mosaic_wave_reader(list(masks), reader, threads=8, first_wave=1)
+    assert assets == ["a0", "a1", "a2", "a3"]
+    # waves of 1, 2 and 4 assets, not yet started reads are cancelled
+    assert set(reads) <= {f"a{i}" for i in range(7)}
+    assert img.array[0, 0, 0] == 3
+    assert img.array[0, 3, 3] == 0
+
+    # methods which don't exit early read all assets
+    reader, reads = make_reader(masks)
+    img, assets = mosaic_wave_reader(
+        list(masks),
+        reader,
+        threads=8,
+        first_wave=1,
+        pixel_selection=PixelSelectionMethod.highest.value(),
+    )
+    assert len(reads) == 30
+    assert len(assets) == 30
+
+    # single threaded
+    reader, reads = make_reader(masks)
+    img, assets = mosaic_wave_reader(list(masks), reader, threads=0)
+    assert reads == ["a0", "a1", "a2", "a3"]
+
+
+@pytest.mark.parametrize("tile", [(152, 183, 9), (75, 91, 8), (37, 45, 7)])
+def test_indexed_tile(tile):
+    """Indexed backends should return the same tiles."""
+    assets = [os.path.join(DATA_DIR, asset) for asset in ["cog1.tif", "cog2.tif"]]
+    mosaic_def = MosaicJSON.from_urls(assets, quiet=True)
+
+    with MemoryBackend(mosaic_def=mosaic_def) as ref:
+        ref_img, ref_assets = ref.tile(*tile, threads=4)
+
+    with IndexedMemoryBackend(mosaic_def=mosaic_def) as src:
+        img, assets_used = src.tile(*tile, threads=4)
+
+    assert assets_used == ref_assets
+    numpy.testing.assert_array_equal(img.array, ref_img.array)
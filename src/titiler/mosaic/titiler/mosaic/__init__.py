@@ -2,5 +2,14 @@
 
 __version__ = "0.26.0"
 
-from . import errors, factory  # noqa
+from . import (  # noqa
+    backends,
+    binary,
+    errors,
+    factory,
+    footprints,
+    index,
+    overviews,
+    pool,
+)
 from .factory import MosaicTilerFactory  # noqa
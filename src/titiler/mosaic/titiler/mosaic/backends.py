@@ -0,0 +1,338 @@
+"""titiler.mosaic backends."""
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+import attr
+import httpx
+from cogeo_mosaic.backends import (
+    ABSBackend,
+    BaseBackend,
+    FileBackend,
+    GCSBackend,
+    HttpBackend,
+    MemoryBackend,
+    MosaicBackend,
+    S3Backend,
+)
+from cogeo_mosaic.backends.utils import _decompress_gz
+from cogeo_mosaic.errors import (
+    _FILE_EXCEPTIONS,
+    _HTTP_EXCEPTIONS,
+    MosaicError,
+    MosaicExistsError,
+)
+from cogeo_mosaic.mosaic import MosaicJSON
+
+from titiler.mosaic.binary import (
+    compress,
+    decode_mosaic,
+    decompress,
+    encode_mosaic,
+    is_binary_mosaic,
+    read_mosaic,
+)
+from titiler.mosaic.cache import MosaicCacheMixin, parse_mosaic
+from titiler.mosaic.index import IndexedMosaicJSON, MosaicIndexMixin
+from titiler.mosaic.overviews import MosaicOverview, OverviewMosaicJSON, build_overview
+
+
+def _conditional_get(url: str, etag: Optional[str]) -> Optional[httpx.Response]:
+    """GET a document, returning `None` if it didn't change since `etag`."""
+    headers = {"If-None-Match": etag} if etag else {}
+    try:
+        r = httpx.get(url, headers=headers)
+        if r.status_code == 304:
+            return None
+
+        r.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        # post-flight errors
+        status_code = e.response.status_code
+        exc = _HTTP_EXCEPTIONS.get(status_code, MosaicError)
+        raise exc(e.response.content) from e
+    except httpx.RequestError as e:
+        # pre-flight errors
+        raise MosaicError(e.args[0].reason) from e
+
+    return r
+
+
+def _convert_to_mosaicjson(value: Union[Dict, MosaicJSON, None]):
+    """Convert to MosaicJSON, keeping MosaicJSON subclasses (footprints, overviews, compiled index)."""
+    if value is None or isinstance(value, MosaicJSON):
+        return value
+
+    return OverviewMosaicJSON(**dict(value))
+
+
+def _keep_mosaic_subclasses(cls: type, fields: List[attr.Attribute]):
+    """Use `_convert_to_mosaicjson` for the backends `mosaic_def` attribute."""
+    return [
+        field.evolve(converter=_convert_to_mosaicjson)
+        if field.name == "mosaic_def"
+        else field
+        for field in fields
+    ]
+
+
+def _parse_body(src: BaseBackend, body: bytes) -> MosaicJSON:
+    """Parse a (gzip compressed) mosaicjson document, keeping its footprints."""
+    src._file_byte_size = len(body)
+    if src.input.endswith(".gz"):
+        body = _decompress_gz(body)
+
+    return parse_mosaic(body)
+
+
+@attr.s(field_transformer=_keep_mosaic_subclasses)
+class IndexedFileBackend(MosaicCacheMixin, MosaicIndexMixin, FileBackend):
+    """FileBackend with compiled index and cached MosaicJSON."""
+
+    def _load(self, etag: Optional[str]) -> Optional[Tuple[MosaicJSON, str]]:
+        """Load the mosaicjson document if its mtime or size changed."""
+        try:
+            stat = os.stat(self.input)
+            version = f"{stat.st_mtime_ns}-{stat.st_size}"
+            if version == etag:
+                return None
+
+            with open(self.input, "rb") as f:
+                body = f.read()
+        except Exception as e:
+            exc = _FILE_EXCEPTIONS.get(e, MosaicError)  # type: ignore
+            raise exc(str(e)) from e
+
+        return _parse_body(self, body), version
+
+
+@attr.s(field_transformer=_keep_mosaic_subclasses)
+class IndexedHttpBackend(MosaicCacheMixin, MosaicIndexMixin, HttpBackend):
+    """HttpBackend with compiled index and cached MosaicJSON."""
+
+    def _load(self, etag: Optional[str]) -> Optional[Tuple[MosaicJSON, str]]:
+        """Load the mosaicjson document using a conditional GET request."""
+        r = _conditional_get(self.input, etag)
+        if r is None:
+            return None
+
+        body = r.content
+        return _parse_body(self, body), r.headers.get("ETag", "")
+
+
+@attr.s(field_transformer=_keep_mosaic_subclasses)
+class IndexedS3Backend(MosaicCacheMixin, MosaicIndexMixin, S3Backend):
+    """S3Backend with compiled index and cached MosaicJSON."""
+
+    def _load(self, etag: Optional[str]) -> Optional[Tuple[MosaicJSON, str]]:
+        """Load the mosaicjson document if its ETag changed."""
+        head = self._head_object(self.key, self.bucket)
+        version = head.get("ETag", "") if head else ""
+        if etag and version == etag:
+            return None
+
+        body = self._get_object(self.key, self.bucket)
+        return _parse_body(self, body), version
+
+
+@attr.s(field_transformer=_keep_mosaic_subclasses)
+class IndexedGCSBackend(MosaicCacheMixin, MosaicIndexMixin, GCSBackend):
+    """GCSBackend with compiled index and cached MosaicJSON."""
+
+    def _load(self, etag: Optional[str]) -> Optional[Tuple[MosaicJSON, str]]:
+        """Load the mosaicjson document."""
+        body = self._get_object(self.key, self.bucket)
+        return _parse_body(self, body), ""
+
+
+@attr.s(field_transformer=_keep_mosaic_subclasses)
+class IndexedABSBackend(MosaicCacheMixin, MosaicIndexMixin, ABSBackend):
+    """ABSBackend with compiled index and cached MosaicJSON."""
+
+    def _load(self, etag: Optional[str]) -> Optional[Tuple[MosaicJSON, str]]:
+        """Load the mosaicjson document."""
+        body = self._get_object(self.key, self.container)
+        return _parse_body(self, body), ""
+
+
+@attr.s(field_transformer=_keep_mosaic_subclasses)
+class BinaryMosaicBackend(MosaicCacheMixin, MosaicIndexMixin, BaseBackend):
+    """Binary mosaic Backend Adapter (local files or HTTP).
+
+    Binary mosaics (`.mosaic` or zstandard compressed `.mosaic.zst`) store the
+    compiled quadkey index. Local uncompressed files are memory-mapped.
+
+    """
+
+    _backend_name = "Binary"
+
+    def _load(self, etag: Optional[str]) -> Optional[Tuple[MosaicJSON, str]]:
+        """Load the binary mosaic if it changed since `etag`."""
+        parsed = urlparse(self.input)
+        if parsed.scheme in ["https", "http"]:
+            r = _conditional_get(self.input, etag)
+            if r is None:
+                return None
+
+            body = r.content
+            self._file_byte_size = len(body)
+            if self.input.endswith(".zst"):
+                body = decompress(body)
+
+            return decode_mosaic(body), r.headers.get("ETag", "")
+
+        try:
+            stat = os.stat(self.input)
+        except Exception as e:
+            exc = _FILE_EXCEPTIONS.get(e, MosaicError)  # type: ignore
+            raise exc(str(e)) from e
+
+        version = f"{stat.st_mtime_ns}-{stat.st_size}"
+        if version == etag:
+            return None
+
+        mosaic_def, size = read_mosaic(self.input)
+        self._file_byte_size = size
+        return mosaic_def, version
+
+    def write(self, overwrite: bool = False):
+        """Write binary mosaic to a local file."""
+        if urlparse(self.input).scheme:
+            raise NotImplementedError(
+                "Binary mosaics can only be written to local files"
+            )
+
+        if not overwrite and os.path.exists(self.input):
+            raise MosaicExistsError("Mosaic file already exist, use `overwrite=True`.")
+
+        body = encode_mosaic(self.mosaic_def)
+        if self.input.endswith(".zst"):
+            body = compress(body)
+
+        # replace the file so memory-mapped readers keep the previous version
+        tmp_path = f"{self.input}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+
+        os.replace(tmp_path, self.input)
+        self.mosaic_cache.pop(self.input)
+
+    def update(
+        self,
+        features: Sequence[Dict],
+        add_first: bool = True,
+        quiet: bool = False,
+        **kwargs,
+    ):
+        """Update the mosaic."""
+        raise NotImplementedError
+
+    @property
+    def _quadkeys(self):
+        """Return the list of quadkey tiles."""
+        return self.mosaic_index.quadkeys()
+
+
+@attr.s(field_transformer=_keep_mosaic_subclasses)
+class IndexedMemoryBackend(MosaicIndexMixin, MemoryBackend):
+    """MemoryBackend with compiled index."""
+
+
+def IndexedMosaicBackend(input: str, *args: Any, **kwargs: Any) -> BaseBackend:
+    """Select mosaic backend for input, using compiled indexes when possible.
+
+    MosaicJSON documents are read through the process-wide `mosaic_cache`.
+    Local or HTTP paths ending with `.mosaic` or `.mosaic.zst` are read
+    with `BinaryMosaicBackend`.
+    DynamoDB, SQLite and STAC backends don't hold the full MosaicJSON tiles in
+    memory and fall back to `cogeo_mosaic.backends.MosaicBackend`.
+
+    """
+    parsed = urlparse(input)
+
+    if not input or input == ":memory:":
+        return IndexedMemoryBackend(*args, **kwargs)
+
+    elif is_binary_mosaic(parsed.path) and parsed.scheme in ["", "file"]:
+        return BinaryMosaicBackend(parsed.path, *args, **kwargs)
+
+    elif is_binary_mosaic(parsed.path) and parsed.scheme in ["https", "http"]:
+        return BinaryMosaicBackend(input, *args, **kwargs)
+
+    elif parsed.scheme == "s3":
+        return IndexedS3Backend(input, *args, **kwargs)
+
+    elif parsed.scheme == "gs":
+        return IndexedGCSBackend(input, *args, **kwargs)
+
+    elif parsed.scheme == "az":
+        return IndexedABSBackend(input, *args, **kwargs)
+
+    elif parsed.scheme in ["https", "http"]:
+        return IndexedHttpBackend(input, *args, **kwargs)
+
+    elif parsed.scheme == "file":
+        return IndexedFileBackend(parsed.path, *args, **kwargs)
+
+    elif parsed.scheme:
+        return MosaicBackend(input, *args, **kwargs)
+
+    return IndexedFileBackend(input, *args, **kwargs)
+
+
+def convert_mosaic(input: str, output: str, overwrite: bool = False):
+    """Convert a mosaic, e.g from a MosaicJSON document to a binary mosaic.
+
+    The output format is selected from the `output` extension.
+
+    """
+    with IndexedMosaicBackend(input) as src:
+        mosaic_def = src.mosaic_def
+
+    if isinstance(mosaic_def, IndexedMosaicJSON) and not is_binary_mosaic(output):
+        mosaic_def = mosaic_def.to_mosaicjson()
+
+    with IndexedMosaicBackend(output, mosaic_def=mosaic_def) as dst:
+        dst.write(overwrite=overwrite)
+
+
+def create_mosaic_overview(
+    input: str,
+    path: str,
+    zoom: Optional[int] = None,
+    backend_options: Optional[Dict] = None,
+    **kwargs: Any,
+) -> MosaicOverview:
+    """Render the low zoom levels of a mosaic into a COG and record it in the mosaic.
+
+    An existing overview with the same `path` is replaced.
+
+    Args:
+        input (str): Mosaic path (MosaicJSON document or binary mosaic).
+        path (str): Overview COG path.
+        zoom (int, optional): Zoom level of the COG full resolution. Defaults to the mosaic `minzoom - 1`.
+        backend_options (dict, optional): Backend options (e.g `reader`, `reader_options`).
+        kwargs (optional): Options forwarded to `titiler.mosaic.overviews.build_overview`.
+
+    """
+    backend_options = backend_options or {}
+    with IndexedMosaicBackend(input, **backend_options) as src:
+        mosaic_def = src.mosaic_def
+
+    if not isinstance(mosaic_def, OverviewMosaicJSON):
+        mosaic_def = OverviewMosaicJSON(**dict(mosaic_def))
+
+    # render from the assets, not from existing overviews
+    with IndexedMemoryBackend(
+        mosaic_def=mosaic_def.model_copy(update={"overviews": None}),
+        **backend_options,
+    ) as src:
+        overview = build_overview(src, path, zoom=zoom, **kwargs)
+
+    overviews = [ov for ov in mosaic_def.overviews or [] if ov.path != path]
+    mosaic_def = mosaic_def.model_copy(update={"overviews": [*overviews, overview]})
+    with IndexedMosaicBackend(input, mosaic_def=mosaic_def) as dst:
+        dst.write(overwrite=True)
+
+    return overview
@@ -0,0 +1,174 @@
+"""titiler.mosaic binary mosaic format.
+
+A binary mosaic stores the compiled quadkey index of a MosaicJSON document:
+
+    magic (8 bytes) | version (uint32) | header length (uint32) | header (JSON)
+    keys (uint64 x N) | offsets (uint64 x N + 1) | asset ids (uint32 x M)
+    string offsets (uint64 x K + 1) | strings (utf-8)
+
+The header holds the MosaicJSON metadata (everything but `tiles`) and the
+sections sizes. Sections are 8-bytes aligned so uncompressed files can be
+memory-mapped and used without parsing. Files with a `.zst` extension are
+compressed with zstandard.
+
+"""
+
+import json
+import mmap
+import struct
+from typing import List, Sequence, Tuple, Union
+
+import numpy
+from cogeo_mosaic.mosaic import MosaicJSON
+
+from titiler.mosaic.index import IndexedMosaicJSON, MosaicIndex, get_mosaic_index
+
+try:
+    import zstandard
+except ImportError:  # pragma: nocover
+    zstandard = None  # type: ignore
+
+MAGIC = b"TIMOSAIC"
+FORMAT_VERSION = 1
+BINARY_MOSAIC_EXTENSIONS = (".mosaic", ".mosaic.zst")
+
+_prefix = struct.Struct("<8sII")
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+class StringTable(Sequence[str]):
+    """Sequence of UTF-8 strings stored in a single buffer."""
+
+    def __init__(self, offsets: numpy.ndarray, data: Buffer):
+        """Create the table."""
+        self.offsets = offsets
+        self.data = memoryview(data)  # type: ignore
+
+    def __len__(self) -> int:
+        """Number of strings."""
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the offsets and strings buffers."""
+        return self.offsets.nbytes + self.data.nbytes
+
+    def __getitem__(self, i):  # type: ignore
+        """Decode a string."""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        return str(self.data[self.offsets[i] : self.offsets[i + 1]], "utf-8")
+
+
+def _pad(size: int) -> bytes:
+    return b"\x00" * (-size % 8)
+
+
+def encode_mosaic(mosaic_def: MosaicJSON) -> bytes:
+    """Encode a MosaicJSON document in the binary mosaic format."""
+    index = get_mosaic_index(mosaic_def)
+
+    strings = [s.encode("utf-8") for s in index.strings]
+    string_offsets = numpy.zeros(len(strings) + 1, dtype="uint64")
+    string_offsets[1:] = numpy.cumsum([len(s) for s in strings])
+
+    header = json.dumps(
+        {
+            "mosaic": mosaic_def.model_dump(exclude={"tiles"}, mode="json"),
+            "sizes": [len(index.keys), len(index.asset_ids), len(strings)],
+        }
+    ).encode("utf-8")
+
+    sections: List[bytes] = [
+        _prefix.pack(MAGIC, FORMAT_VERSION, len(header)),
+        header,
+        _pad(_prefix.size + len(header)),
+        index.keys.astype("<u8").tobytes(),
+        index.offsets.astype("<u8").tobytes(),
+        index.asset_ids.astype("<u4").tobytes(),
+        _pad(4 * len(index.asset_ids)),
+        string_offsets.astype("<u8").tobytes(),
+        b"".join(strings),
+    ]
+    return b"".join(sections)
+
+
+def decode_mosaic(buffer: Buffer) -> IndexedMosaicJSON:
+    """Decode a binary mosaic without copying its arrays."""
+    magic, version, header_size = _prefix.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Invalid binary mosaic")
+
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary mosaic version: {version}")
+
+    start = _prefix.size
+    header = json.loads(bytes(buffer[start : start + header_size]))
+    nkeys, nassets, nstrings = header["sizes"]
+
+    offset = start + header_size
+    offset += -offset % 8
+
+    def _array(dtype: str, count: int) -> numpy.ndarray:
+        nonlocal offset
+        arr = numpy.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        offset += arr.nbytes
+        offset += -offset % 8
+        return arr
+
+    keys = _array("<u8", nkeys)
+    offsets = _array("<u8", nkeys + 1)
+    asset_ids = _array("<u4", nassets)
+    string_offsets = _array("<u8", nstrings + 1)
+    strings = StringTable(
+        string_offsets,
+        memoryview(buffer)[offset : offset + int(string_offsets[-1])],  # type: ignore
+    )
+
+    mosaic = header["mosaic"]
+    quadkey_zoom = mosaic.get("quadkey_zoom") or mosaic["minzoom"]
+    index = MosaicIndex.from_arrays(
+        quadkey_zoom,
+        keys,
+        offsets,
+        asset_ids,
+        strings,
+        footprints=mosaic.get("footprints"),
+    )
+    return IndexedMosaicJSON.from_index(index, **mosaic)
+
+
+def compress(body: bytes) -> bytes:
+    """Compress a binary mosaic with zstandard."""
+    assert zstandard is not None, "'zstandard' must be installed to compress mosaics"
+    return zstandard.ZstdCompressor().compress(body)
+
+
+def decompress(body: bytes) -> bytes:
+    """Decompress a zstandard compressed binary mosaic."""
+    assert zstandard is not None, (
+        "'zstandard' must be installed to read compressed mosaics"
+    )
+    return zstandard.ZstdDecompressor().decompress(body)
+
+
+def read_mosaic(path: str) -> Tuple[IndexedMosaicJSON, int]:
+    """Read a local binary mosaic, memory-mapping uncompressed files.
+
+    Returns the mosaic and the file size.
+
+    """
+    with open(path, "rb") as f:
+        if path.endswith(".zst"):
+            body = f.read()
+            return decode_mosaic(decompress(body)), len(body)
+
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return decode_mosaic(buffer), len(buffer)
+
+
+def is_binary_mosaic(path: str) -> bool:
+    """Check if a path uses the binary mosaic extensions."""
+    return path.endswith(BINARY_MOSAIC_EXTENSIONS)
@@ -0,0 +1,208 @@
+"""titiler.mosaic MosaicJSON definitions cache."""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import attr
+from cogeo_mosaic.mosaic import MosaicJSON
+
+from titiler.mosaic.index import IndexedMosaicJSON
+from titiler.mosaic.overviews import OverviewMosaicJSON
+
+MOSAIC_CACHE_TTL = int(os.getenv("TITILER_MOSAIC_CACHE_TTL", 300))
+MOSAIC_CACHE_MAXBYTES = int(
+    os.getenv("TITILER_MOSAIC_CACHE_MAXBYTES", 512 * 1024 * 1024)
+)
+
+# `load(etag)` returns `None` when the document didn't change since `etag`,
+# otherwise the new (mosaic_def, etag) tuple.
+MosaicLoader = Callable[[Optional[str]], Optional[Tuple[MosaicJSON, str]]]
+
+
+@attr.s
+class CachedMosaic:
+    """MosaicJSON cache entry."""
+
+    mosaic_def: MosaicJSON = attr.ib()
+    etag: str = attr.ib()
+    size: int = attr.ib()
+    checked: float = attr.ib()
+
+
+def compact_mosaic(mosaic_def: MosaicJSON) -> MosaicJSON:
+    """Share identical asset strings between quadkeys.
+
+    Assets usually intersect many quadkeys, so de-duplicating the strings
+    divides the memory used by the tiles mapping by about the number of
+    quadkeys per asset.
+
+    """
+    strings: Dict[str, str] = {}
+    mosaic_def.tiles = {
+        quadkey: [strings.setdefault(asset, asset) for asset in assets]
+        for quadkey, assets in mosaic_def.tiles.items()
+    }
+    return mosaic_def
+
+
+def mosaic_nbytes(mosaic_def: MosaicJSON) -> int:
+    """Estimate the memory used by a parsed MosaicJSON.
+
+    Counts the tiles mapping, its quadkeys and assets lists, and each distinct
+    asset string once (see `compact_mosaic`). For large mosaics this is a few
+    times the size of the JSON document. Mosaics backed by a compiled index
+    (e.g binary mosaics) use the size of the index arrays and string table.
+    Assets footprints (GeoJSON geometries) are added when present.
+
+    """
+    footprints = getattr(mosaic_def, "footprints", None)
+    nbytes = _sizeof(footprints) if footprints else 0
+    if isinstance(mosaic_def, IndexedMosaicJSON) and mosaic_def._index is not None:
+        return nbytes + mosaic_def._index.nbytes
+
+    tiles = mosaic_def.tiles
+    nbytes += sys.getsizeof(tiles)
+    assets: Dict[int, int] = {}
+    for quadkey, quadkey_assets in tiles.items():
+        nbytes += sys.getsizeof(quadkey) + sys.getsizeof(quadkey_assets)
+        for asset in quadkey_assets:
+            assets[id(asset)] = sys.getsizeof(asset)
+
+    return nbytes + sum(assets.values())
+
+
+def _sizeof(obj: Any) -> int:
+    """Size of a JSON-like object (dicts, lists and scalars)."""
+    nbytes = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        nbytes += sum(_sizeof(k) + _sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        nbytes += sum(_sizeof(v) for v in obj)
+
+    return nbytes
+
+
+def parse_mosaic(body: Union[bytes, str]) -> MosaicJSON:
+    """Parse and compact a MosaicJSON document (keeping footprints and overviews)."""
+    return compact_mosaic(OverviewMosaicJSON(**json.loads(body)))
+
+
+class MosaicDefinitionCache:
+    """Process-wide MosaicJSON cache with revalidation.
+
+    Entries are returned as-is for `ttl` seconds, then revalidated by the
+    loader (e.g conditional GET with the stored ETag). The least recently used
+    entries are evicted to keep the estimated memory used by the parsed
+    documents under `maxbytes`.
+
+    Args:
+        ttl (int): Time (in seconds) after which an entry is revalidated.
+        maxbytes (int): Memory budget (estimated size of the parsed MosaicJSON, see `mosaic_nbytes`). A `maxbytes` of 0 disables the cache.
+        sizeof (callable): Estimated size (in bytes) of a parsed MosaicJSON.
+
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        maxbytes: int = 512 * 1024 * 1024,
+        sizeof: Callable[[MosaicJSON], int] = mosaic_nbytes,
+    ):
+        """Create the cache."""
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._data: "OrderedDict[str, CachedMosaic]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of entries."""
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        """Check if a key is in the cache."""
+        return key in self._data
+
+    def get(self, key: str, load: MosaicLoader) -> MosaicJSON:
+        """Get a MosaicJSON, loading or revalidating it when needed."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+
+        now = time.monotonic()
+        if entry is not None and now - entry.checked < self.ttl:
+            return entry.mosaic_def
+
+        result = load(entry.etag if entry is not None else None)
+        if result is None and entry is not None:
+            entry.checked = now
+            return entry.mosaic_def
+
+        mosaic_def, etag = result  # type: ignore
+        self.set(key, CachedMosaic(mosaic_def, etag, self.sizeof(mosaic_def), now))
+        return mosaic_def
+
+    def set(self, key: str, entry: CachedMosaic):
+        """Add an entry, evicting the least recently used ones."""
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.size
+
+            if entry.size > self.maxbytes:
+                return
+
+            self._data[key] = entry
+            self.nbytes += entry.size
+            while self.nbytes > self.maxbytes:
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= evicted.size
+
+    def pop(self, key: str):
+        """Remove an entry."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry.size
+
+    def clear(self):
+        """Empty the cache."""
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+
+mosaic_cache = MosaicDefinitionCache(
+    ttl=MOSAIC_CACHE_TTL, maxbytes=MOSAIC_CACHE_MAXBYTES
+)
+
+
+class MosaicCacheMixin:
+    """Read MosaicJSON documents through the process-wide cache.
+
+    Backends must implement `_load(etag)`, returning `None` when the document
+    didn't change since `etag`.
+
+    """
+
+    mosaic_cache: MosaicDefinitionCache = mosaic_cache
+
+    def _read(self) -> MosaicJSON:
+        """Get mosaicjson document."""
+        return self.mosaic_cache.get(self.input, self._load)  # type: ignore
+
+    def _load(self, etag: Optional[str]) -> Optional[Tuple[MosaicJSON, str]]:
+        """Load the mosaicjson document if it changed since `etag`."""
+        raise NotImplementedError
+
+    def write(self, *args: Any, **kwargs: Any):
+        """Write mosaicjson document and drop its cached version."""
+        super().write(*args, **kwargs)  # type: ignore
+        self.mosaic_cache.pop(self.input)  # type: ignore
@@ -19,7 +19,7 @@ from urllib.parse import urlencode
 
 import rasterio
 from attrs import define, field
-from cogeo_mosaic.backends import BaseBackend, MosaicBackend
+from cogeo_mosaic.backends import BaseBackend
 from cogeo_mosaic.models import Info as mosaicInfo
 from fastapi import Depends, HTTPException, Path, Query
 from geojson_pydantic.features import Feature
@@ -56,6 +56,7 @@ from titiler.core.models.OGC import TileSet, TileSetList
 from titiler.core.resources.enums import ImageType, OptionalHeader
 from titiler.core.resources.responses import GeoJSONResponse, JSONResponse, XMLResponse
 from titiler.core.utils import bounds_to_geometry, render_image
+from titiler.mosaic.backends import IndexedMosaicBackend
 from titiler.mosaic.models.responses import Point
 
 MOSAIC_THREADS = int(os.getenv("MOSAIC_CONCURRENCY", MAX_THREADS))
@@ -88,7 +89,7 @@ def DatasetPathParams(url: Annotated[str, Query(description="Mosaic URL")]) -> s
 class MosaicTilerFactory(BaseFactory):
     """MosaicTiler Factory."""
 
-    backend: Type[BaseBackend] = MosaicBackend
+    backend: Type[BaseBackend] = IndexedMosaicBackend
     backend_dependency: Type[DefaultDependency] = DefaultDependency
 
     dataset_reader: Union[
@@ -0,0 +1,307 @@
+"""titiler.mosaic per-asset footprints."""
+
+import math
+import os
+import warnings
+from concurrent import futures
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import morecantile
+from affine import Affine
+from cogeo_mosaic.errors import MultipleDataTypeError
+from cogeo_mosaic.mosaic import MosaicJSON, default_accessor
+from rasterio.enums import Resampling
+from rasterio.features import shapes
+from rasterio.warp import transform_geom
+from rio_tiler.constants import WGS84_CRS
+from rio_tiler.io import Reader
+from shapely import prepare
+from shapely.geometry import box, mapping, shape
+from shapely.geometry.base import BaseGeometry
+from shapely.ops import unary_union
+
+from titiler.core.cache import LRUCache
+
+MOSAIC_FOOTPRINT_CACHE_SIZE = int(
+    os.getenv("TITILER_MOSAIC_FOOTPRINT_CACHE_SIZE", 10000)
+)
+MOSAIC_FOOTPRINT_CACHE_TTL = int(os.getenv("TITILER_MOSAIC_FOOTPRINT_CACHE_TTL", 86400))
+MOSAIC_FOOTPRINT_OVERSAMPLING = int(
+    os.getenv("TITILER_MOSAIC_FOOTPRINT_OVERSAMPLING", 4)
+)
+
+WEB_MERCATOR_TMS = morecantile.tms.get("WebMercatorQuad")
+
+# Datasets features (meta and footprint), keyed by path and TileMatrixSet
+dataset_features = LRUCache(
+    maxsize=MOSAIC_FOOTPRINT_CACHE_SIZE, ttl=MOSAIC_FOOTPRINT_CACHE_TTL
+)
+
+
+def dataset_footprint(src_dst: Reader, max_size: int = 512) -> Optional[Dict]:
+    """Create a simplified footprint of the valid data of a dataset.
+
+    The dataset mask is read at `MOSAIC_FOOTPRINT_OVERSAMPLING` times the
+    footprint resolution and reduced with a max (a low resolution pixel is
+    valid if any of the pixels it covers is valid), polygonized, simplified and
+    buffered so the footprint contains all the valid data.
+
+    Returns:
+        dict: GeoJSON geometry in WGS84, or `None` if the dataset has no valid data.
+
+    """
+    dataset = src_dst.dataset
+    ratio = max(dataset.width / max_size, dataset.height / max_size, 1)
+    width = math.ceil(dataset.width / ratio)
+    height = math.ceil(dataset.height / ratio)
+
+    factor = max(min(MOSAIC_FOOTPRINT_OVERSAMPLING, math.floor(ratio)), 1)
+    mask = dataset.dataset_mask(
+        out_shape=(height * factor, width * factor), resampling=Resampling.average
+    )
+    mask = mask.reshape(height, factor, width, factor).max(axis=(1, 3))
+    if not mask.any():
+        return None
+
+    bounds = box(*dataset.bounds)
+    if mask.all():
+        geom = bounds
+
+    else:
+        transform = dataset.transform * Affine.scale(
+            dataset.width / width, dataset.height / height
+        )
+        res = max(abs(transform.a), abs(transform.e))
+        geom = unary_union(
+            [shape(g) for g, _ in shapes(mask, mask=mask > 0, transform=transform)]
+        )
+        # the buffer covers the simplification (`res`) and one more pixel
+        geom = geom.simplify(res).buffer(2 * res, join_style="mitre")
+        geom = geom.intersection(bounds)
+
+    return transform_geom(dataset.crs, WGS84_CRS, mapping(geom))
+
+
+def get_dataset_footprint(
+    src_path: str,
+    tms: morecantile.TileMatrixSet = WEB_MERCATOR_TMS,
+    max_size: int = 512,
+) -> Dict:
+    """Get dataset meta (like `cogeo_mosaic.utils.get_dataset_info`) and data footprint.
+
+    Results are cached by path and TileMatrixSet (`TITILER_MOSAIC_FOOTPRINT_CACHE_SIZE`
+    and `TITILER_MOSAIC_FOOTPRINT_CACHE_TTL` environment variables), so
+    rebuilding a mosaic doesn't open its datasets again.
+
+    """
+    key = (src_path, tms.id, max_size)
+    feature = dataset_features.get(key)
+    if feature is None:
+        with Reader(src_path, tms=tms) as src:
+            bounds = src.get_geographic_bounds(tms.rasterio_geographic_crs)
+            feature = {
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [
+                        [
+                            tms.truncate_lnglat(bounds[0], bounds[3]),
+                            tms.truncate_lnglat(bounds[0], bounds[1]),
+                            tms.truncate_lnglat(bounds[2], bounds[1]),
+                            tms.truncate_lnglat(bounds[2], bounds[3]),
+                            tms.truncate_lnglat(bounds[0], bounds[3]),
+                        ]
+                    ],
+                },
+                "properties": {
+                    "path": src_path,
+                    "bounds": bounds,
+                    "minzoom": src.minzoom,
+                    "maxzoom": src.maxzoom,
+                    "datatype": src.dataset.meta["dtype"],
+                    "footprint": dataset_footprint(src, max_size=max_size),
+                },
+                "type": "Feature",
+            }
+
+        dataset_features.set(key, feature)
+
+    return {**feature, "properties": {**feature["properties"]}}
+
+
+def get_datasets_footprints(
+    urls: Sequence[str],
+    tms: morecantile.TileMatrixSet = WEB_MERCATOR_TMS,
+    max_threads: int = 20,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict]:
+    """Get datasets footprints concurrently.
+
+    Args:
+        urls (sequence): Datasets paths.
+        tms (TileMatrixSet): TileMatrixSet used for the datasets zoom levels.
+        max_threads (int): Maximum number of datasets opened concurrently.
+        progress (callable, optional): Called with the number of processed and total datasets.
+
+    Returns:
+        list: GeoJSON features (in the `urls` order).
+
+    """
+    with futures.ThreadPoolExecutor(max_workers=max(max_threads, 1)) as executor:
+        tasks = [executor.submit(get_dataset_footprint, url, tms) for url in urls]
+        for done, _ in enumerate(futures.as_completed(tasks), start=1):
+            if progress:
+                progress(done, len(tasks))
+
+    return [task.result() for task in tasks]
+
+
+def footprint_filter(
+    tms: morecantile.TileMatrixSet,
+) -> Callable:
+    """Create a `MosaicJSON._create_mosaic` asset filter using features footprint."""
+    prepared: Dict[int, BaseGeometry] = {}
+
+    def _footprint(feature: Dict) -> Optional[BaseGeometry]:
+        footprint = feature["properties"].get("footprint")
+        if not footprint:
+            return None
+
+        geom = prepared.get(id(feature))
+        if geom is None:
+            geom = prepared[id(feature)] = shape(footprint)
+            prepare(geom)
+
+        return geom
+
+    def _filter(tile, dataset, geoms, **kwargs):
+        tile_geom = box(*tms.bounds(tile))
+        return [
+            feature
+            for feature in dataset
+            if (footprint := _footprint(feature)) is None
+            or intersects(footprint, tile_geom)
+        ]
+
+    return _filter
+
+
+def intersects(geom: BaseGeometry, other: BaseGeometry) -> bool:
+    """Check if geometries share some area (not only a boundary)."""
+    return geom.intersects(other) and not geom.touches(other)
+
+
+def compile_footprints(
+    footprints: Optional[Dict[str, Dict]],
+) -> Optional[Dict[str, BaseGeometry]]:
+    """Create prepared shapely geometries from GeoJSON footprints."""
+    if not footprints:
+        return None
+
+    geoms = {}
+    for asset, footprint in footprints.items():
+        geom = shape(footprint)
+        prepare(geom)
+        geoms[asset] = geom
+
+    return geoms
+
+
+class FootprintMosaicJSON(MosaicJSON):
+    """MosaicJSON document with per-asset footprints.
+
+    `footprints` maps assets (as listed in `tiles`) to their valid data
+    footprint (GeoJSON geometry in WGS84). Readers which don't know about
+    footprints simply ignore the extra key.
+
+    """
+
+    footprints: Optional[Dict[str, Dict]] = None
+
+    @classmethod
+    def from_features(
+        cls, features: Sequence[Dict], minzoom: int, maxzoom: int, **kwargs: Any
+    ):
+        """Create mosaicjson from a set of GeoJSON Features.
+
+        Features's `properties.footprint` geometries are stored in the mosaic
+        and used to only list assets in quadkeys they actually intersect.
+
+        """
+        accessor = kwargs.get("accessor", default_accessor)
+        asset_prefix = kwargs.get("asset_prefix")
+        tms = kwargs.get("tilematrixset") or WEB_MERCATOR_TMS
+        kwargs.setdefault("asset_filter", footprint_filter(tms))
+
+        mosaic_def = super().from_features(features, minzoom, maxzoom, **kwargs)
+
+        footprints = {}
+        for feature in features:
+            if footprint := feature["properties"].get("footprint"):
+                asset = accessor(feature)
+                if asset_prefix and asset.startswith(asset_prefix):
+                    asset = asset[len(asset_prefix) :]
+
+                footprints[asset] = footprint
+
+        mosaic_def.footprints = footprints or None
+        return mosaic_def
+
+    @classmethod
+    def from_urls(
+        cls,
+        urls: Sequence[str],
+        minzoom: Optional[int] = None,
+        maxzoom: Optional[int] = None,
+        max_threads: int = 20,
+        tilematrixset: Optional[morecantile.TileMatrixSet] = None,
+        quiet: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+        **kwargs: Any,
+    ):
+        """Create mosaicjson from COG urls, with their data footprints.
+
+        Datasets are opened concurrently (`max_threads`) and `progress` is
+        called with the number of processed and total datasets.
+
+        """
+        features = get_datasets_footprints(
+            urls,
+            tms=tilematrixset or WEB_MERCATOR_TMS,
+            max_threads=max_threads,
+            progress=progress,
+        )
+
+        if minzoom is None:
+            data_minzoom = {feat["properties"]["minzoom"] for feat in features}
+            if len(data_minzoom) > 1:
+                warnings.warn(
+                    "Multiple MinZoom, Assets different minzoom values",
+                    UserWarning,
+                    stacklevel=2,
+                )
+
+            minzoom = max(data_minzoom)
+
+        if maxzoom is None:
+            data_maxzoom = {feat["properties"]["maxzoom"] for feat in features}
+            if len(data_maxzoom) > 1:
+                warnings.warn(
+                    "Multiple MaxZoom, Assets have multiple resolution values",
+                    UserWarning,
+                    stacklevel=2,
+                )
+
+            maxzoom = max(data_maxzoom)
+
+        datatype = {feat["properties"]["datatype"] for feat in features}
+        if len(datatype) > 1:
+            raise MultipleDataTypeError("Dataset should have the same data type")
+
+        return cls.from_features(
+            features,
+            minzoom=minzoom,
+            maxzoom=maxzoom,
+            tilematrixset=tilematrixset,
+            quiet=quiet,
+            **kwargs,
+        )
@@ -0,0 +1,441 @@
+"""titiler.mosaic compiled MosaicJSON index."""
+
+import itertools
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import attr
+import numpy
+from cogeo_mosaic.errors import NoAssetFoundError
+from cogeo_mosaic.mosaic import MosaicJSON
+from morecantile.defaults import tms as morecantile_tms
+from pydantic import PrivateAttr
+from rasterio.crs import CRS
+from rasterio.warp import transform_bounds
+from rio_tiler.constants import WGS84_CRS
+from rio_tiler.models import ImageData
+from shapely.geometry import box
+from shapely.geometry.base import BaseGeometry
+
+from titiler.core.cache import LRUCache, gdal_env_key
+from titiler.mosaic.footprints import compile_footprints, intersects
+from titiler.mosaic.overviews import OverviewMosaicJSON, overview_tile
+from titiler.mosaic.pool import ReaderPool, reader_pool
+from titiler.mosaic.reader import assets_to_cover, mosaic_wave_reader
+
+MOSAIC_INDEX_CACHE_SIZE = int(os.getenv("TITILER_MOSAIC_INDEX_CACHE_SIZE", 32))
+
+WEB_MERCATOR_TMS = morecantile_tms.get("WebMercatorQuad")
+
+
+def quadkey_to_int(quadkey: str) -> int:
+    """Convert a quadkey to its integer (base 4) value."""
+    return int(quadkey, 4) if quadkey else 0
+
+
+def tile_to_int(x: int, y: int, z: int) -> int:
+    """Interleave tile indices into the integer value of the tile's quadkey."""
+    value = 0
+    for i in range(z - 1, -1, -1):
+        value = (value << 2) | ((x >> i) & 1) | (((y >> i) & 1) << 1)
+
+    return value
+
+
+def _deinterleave(values: numpy.ndarray, zoom: int) -> numpy.ndarray:
+    """Extract every other bit of quadkey integers (x: shift=0, y: shift=1)."""
+    out = numpy.zeros(values.shape, dtype="int64")
+    for i in range(zoom):
+        out |= ((values >> (2 * i)) & 1).astype("int64") << i
+
+    return out
+
+
+@attr.s(frozen=True)
+class MosaicIndex:
+    """MosaicJSON tiles compiled into sorted NumPy arrays.
+
+    Quadkeys (at `quadkey_zoom`) are stored as sorted integers. Because a
+    quadkey is a prefix of all its children's quadkeys, the children of any
+    tile form a contiguous range of the sorted array and can be found with a
+    binary search.
+
+    Attributes:
+        quadkey_zoom (int): zoom level of the mosaic's quadkeys.
+        keys (numpy.ndarray): sorted quadkey integers.
+        offsets (numpy.ndarray): start/end offsets of each quadkey in `asset_ids` (len(keys) + 1).
+        asset_ids (numpy.ndarray): flat array of asset ids (indices in `strings`).
+        strings (sequence): unique assets.
+        xs (numpy.ndarray): sorted tile columns (for bbox queries).
+        xs_order (numpy.ndarray): indices of `keys` sorted by tile column.
+        ys (numpy.ndarray): tile rows (matching `keys`).
+        footprints (dict, optional): prepared assets footprints (WGS84).
+
+    """
+
+    quadkey_zoom: int = attr.ib()
+    keys: numpy.ndarray = attr.ib()
+    offsets: numpy.ndarray = attr.ib()
+    asset_ids: numpy.ndarray = attr.ib()
+    strings: Sequence[str] = attr.ib()
+    xs: numpy.ndarray = attr.ib()
+    xs_order: numpy.ndarray = attr.ib()
+    ys: numpy.ndarray = attr.ib()
+    footprints: Optional[Dict[str, BaseGeometry]] = attr.ib(default=None)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        quadkey_zoom: int,
+        keys: numpy.ndarray,
+        offsets: numpy.ndarray,
+        asset_ids: numpy.ndarray,
+        strings: Sequence[str],
+        footprints: Optional[Dict[str, Dict]] = None,
+    ) -> "MosaicIndex":
+        """Create an index from sorted quadkey integers and asset tables."""
+        xs = _deinterleave(keys, quadkey_zoom)
+        ys = _deinterleave(keys >> numpy.uint64(1), quadkey_zoom)
+        xs_order = numpy.argsort(xs, kind="stable")
+
+        return cls(
+            quadkey_zoom=quadkey_zoom,
+            keys=keys,
+            offsets=offsets,
+            asset_ids=asset_ids,
+            strings=strings,
+            xs=xs[xs_order],
+            xs_order=xs_order,
+            ys=ys,
+            footprints=compile_footprints(footprints),
+        )
+
+    @classmethod
+    def from_mosaic(cls, mosaic_def: MosaicJSON) -> "MosaicIndex":
+        """Compile a MosaicJSON document."""
+        quadkey_zoom = mosaic_def.quadkey_zoom or mosaic_def.minzoom
+
+        quadkeys = sorted(mosaic_def.tiles, key=quadkey_to_int)
+        keys = numpy.array([quadkey_to_int(qk) for qk in quadkeys], dtype="uint64")
+
+        strings: Dict[str, int] = {}
+        ids: List[int] = []
+        offsets = numpy.zeros(len(quadkeys) + 1, dtype="uint64")
+        for i, qk in enumerate(quadkeys):
+            ids.extend(
+                strings.setdefault(a, len(strings)) for a in mosaic_def.tiles[qk]
+            )
+            offsets[i + 1] = len(ids)
+
+        return cls.from_arrays(
+            quadkey_zoom,
+            keys,
+            offsets,
+            numpy.array(ids, dtype="uint32"),
+            list(strings),
+            footprints=getattr(mosaic_def, "footprints", None),
+        )
+
+    def _assets(self, indices: Sequence[int]) -> List[str]:
+        """Return unique assets for quadkey indices (in order)."""
+        ids = dict.fromkeys(
+            itertools.chain.from_iterable(
+                self.asset_ids[self.offsets[i] : self.offsets[i + 1]].tolist()
+                for i in indices
+            )
+        )
+        return [self.strings[i] for i in ids]
+
+    def quadkeys(self) -> List[str]:
+        """Return the list of quadkeys."""
+        if not self.quadkey_zoom:
+            return [""] * len(self.keys)
+
+        return [
+            numpy.base_repr(int(key), 4).zfill(self.quadkey_zoom)
+            for key in self.keys.tolist()
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory used by the index arrays and asset strings."""
+        arrays = (self.keys, self.offsets, self.asset_ids, self.xs, self.xs_order)
+        nbytes = sum(arr.nbytes for arr in arrays) + self.ys.nbytes
+
+        strings_nbytes = getattr(self.strings, "nbytes", None)
+        if strings_nbytes is None:
+            strings_nbytes = sys.getsizeof(self.strings) + sum(
+                sys.getsizeof(asset) for asset in self.strings
+            )
+
+        return nbytes + strings_nbytes
+
+    def tiles(self) -> Dict[str, List[str]]:
+        """Return the MosaicJSON `tiles` mapping."""
+        return {
+            qk: [
+                self.strings[i]
+                for i in self.asset_ids[self.offsets[n] : self.offsets[n + 1]].tolist()
+            ]
+            for n, qk in enumerate(self.quadkeys())
+        }
+
+    def _tile_range(self, x: int, y: int, z: int) -> Tuple[int, int, int]:
+        """Return the range of quadkeys within a tile and the tile's number of quadkeys."""
+        if z >= self.quadkey_zoom:
+            depth = z - self.quadkey_zoom
+            key = tile_to_int(x >> depth, y >> depth, self.quadkey_zoom)
+            start = numpy.uint64(key)
+            stop = numpy.uint64(key + 1)
+            total = 1
+
+        else:
+            depth = 2 * (self.quadkey_zoom - z)
+            key = tile_to_int(x, y, z)
+            start = numpy.uint64(key << depth)
+            stop = numpy.uint64((key + 1) << depth)
+            total = 1 << depth
+
+        i0, i1 = numpy.searchsorted(self.keys, [start, stop])
+        return int(i0), int(i1), total
+
+    def get_assets(self, x: int, y: int, z: int) -> List[str]:
+        """Find assets for a tile of the mosaic's TileMatrixSet."""
+        i0, i1, _ = self._tile_range(x, y, z)
+        return self._assets(range(i0, i1))
+
+    def get_assets_coverage(
+        self, x: int, y: int, z: int
+    ) -> Tuple[Dict[str, Set[int]], int]:
+        """Find the quadkeys covered by each asset of a tile.
+
+        Returns the quadkeys (positions in `keys`) of each asset and the total
+        number of quadkeys within the tile.
+
+        """
+        i0, i1, total = self._tile_range(x, y, z)
+        coverage: Dict[str, Set[int]] = {}
+        for i in range(i0, i1):
+            for asset_id in self.asset_ids[
+                self.offsets[i] : self.offsets[i + 1]
+            ].tolist():
+                coverage.setdefault(self.strings[asset_id], set()).add(i)
+
+        return coverage, total
+
+    def get_assets_for_range(
+        self, minx: int, miny: int, maxx: int, maxy: int
+    ) -> List[str]:
+        """Find assets for all quadkeys within a range of tile indices (inclusive)."""
+        i0, i1 = numpy.searchsorted(self.xs, [minx, maxx + 1])
+        xs = self.xs[i0:i1]
+        indices = self.xs_order[i0:i1]
+        ys = self.ys[indices]
+        mask = (ys >= miny) & (ys <= maxy)
+
+        # sort by column then row, like cogeo-mosaic's `assets_for_bbox`
+        order = numpy.lexsort((ys[mask], xs[mask]))
+        return self._assets(indices[mask][order].tolist())
+
+
+class IndexedMosaicJSON(OverviewMosaicJSON):
+    """MosaicJSON document backed by a compiled index.
+
+    The `tiles` mapping is not materialized, use `to_mosaicjson()` to get a
+    regular MosaicJSON document.
+
+    """
+
+    _index: Optional[MosaicIndex] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_index(cls, index: MosaicIndex, **kwargs: Any) -> "IndexedMosaicJSON":
+        """Create a document from an index and the MosaicJSON metadata."""
+        mosaic_def = cls(**{**kwargs, "tiles": {}})
+        mosaic_def._index = index
+        return mosaic_def
+
+    def to_mosaicjson(self) -> MosaicJSON:
+        """Return a MosaicJSON document with its `tiles`."""
+        tiles = self._index.tiles() if self._index is not None else {}
+        return OverviewMosaicJSON(
+            **{**self.model_dump(exclude={"tiles"}), "tiles": tiles}
+        )
+
+
+# Compiled indexes, keyed by MosaicJSON object identity. Backends cache the
+# MosaicJSON they read, so identity is stable across requests. Entries keep a
+# reference to the document and its version so updated mosaics are re-indexed.
+mosaic_indexes = LRUCache(maxsize=MOSAIC_INDEX_CACHE_SIZE)
+
+
+def get_mosaic_index(mosaic_def: MosaicJSON) -> MosaicIndex:
+    """Get or compile a MosaicJSON index."""
+    if isinstance(mosaic_def, IndexedMosaicJSON) and mosaic_def._index is not None:
+        return mosaic_def._index
+
+    entry = mosaic_indexes.get(id(mosaic_def))
+    if (
+        entry is not None
+        and entry[0] is mosaic_def
+        and entry[1] == (mosaic_def.version, len(mosaic_def.tiles))
+    ):
+        return entry[2]
+
+    index = MosaicIndex.from_mosaic(mosaic_def)
+    mosaic_indexes.set(
+        id(mosaic_def),
+        (mosaic_def, (mosaic_def.version, len(mosaic_def.tiles)), index),
+    )
+    return index
+
+
+class MosaicIndexMixin:
+    """Resolve assets using a compiled index instead of walking quadkeys.
+
+    To be used with backends storing the MosaicJSON tiles in memory
+    (File, HTTP, S3, GCS, Azure or Memory backends) or reading compiled
+    indexes (binary mosaics).
+
+    """
+
+    reader_pool: ReaderPool = reader_pool
+
+    def __attrs_post_init__(self):
+        """Extend the backend zoom range with the mosaic overviews."""
+        super().__attrs_post_init__()  # type: ignore
+        if self.overviews_tms and (overviews := self.mosaic_def.overviews):  # type: ignore
+            self.minzoom = min(self.minzoom, *(ov.minzoom for ov in overviews))  # type: ignore
+
+    @property
+    def overviews_tms(self) -> bool:
+        """Check if the mosaic overviews can be used with the backend's TileMatrixSet."""
+        mosaic_tms = self.mosaic_def.tilematrixset or WEB_MERCATOR_TMS  # type: ignore
+        return self.tms == mosaic_tms and hasattr(self.mosaic_def, "get_overview")  # type: ignore
+
+    @property
+    def mosaic_index(self) -> MosaicIndex:
+        """Compiled index for the mosaic."""
+        return get_mosaic_index(self.mosaic_def)  # type: ignore
+
+    def get_assets(self, x: int, y: int, z: int) -> List[str]:
+        """Find assets."""
+        assets = self.mosaic_index.get_assets(x, y, z)
+        if self.mosaic_def.asset_prefix:  # type: ignore
+            assets = [self.mosaic_def.asset_prefix + asset for asset in assets]  # type: ignore
+
+        return assets
+
+    def assets_for_bbox(
+        self,
+        xmin: float,
+        ymin: float,
+        xmax: float,
+        ymax: float,
+        coord_crs: Optional[CRS] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        """Retrieve assets for bbox."""
+        mosaic_tms = self.mosaic_def.tilematrixset or WEB_MERCATOR_TMS  # type: ignore
+
+        coord_crs = coord_crs or self.tms.rasterio_geographic_crs  # type: ignore
+        if coord_crs != mosaic_tms.rasterio_geographic_crs:
+            xmin, ymin, xmax, ymax = transform_bounds(
+                coord_crs,
+                mosaic_tms.rasterio_geographic_crs,
+                xmin,
+                ymin,
+                xmax,
+                ymax,
+            )
+
+        index = self.mosaic_index
+        tl_tile = mosaic_tms.tile(xmin, ymax, index.quadkey_zoom)
+        br_tile = mosaic_tms.tile(xmax, ymin, index.quadkey_zoom)
+
+        assets = index.get_assets_for_range(tl_tile.x, tl_tile.y, br_tile.x, br_tile.y)
+        if self.mosaic_def.asset_prefix:  # type: ignore
+            assets = [self.mosaic_def.asset_prefix + asset for asset in assets]  # type: ignore
+
+        return assets
+
+    def filter_footprints(self, assets: List[str], x: int, y: int, z: int) -> List[str]:
+        """Remove assets whose footprint doesn't intersect the tile.
+
+        Assets without footprint in the mosaic are kept.
+
+        """
+        footprints = self.mosaic_index.footprints
+        if not footprints:
+            return assets
+
+        bounds = self.tms.bounds(x, y, z)  # type: ignore
+        geographic_crs = self.tms.rasterio_geographic_crs  # type: ignore
+        if geographic_crs != WGS84_CRS:
+            bounds = transform_bounds(geographic_crs, WGS84_CRS, *bounds)
+
+        tile_geom = box(*bounds)
+        prefix = len(self.mosaic_def.asset_prefix or "")  # type: ignore
+        return [
+            asset
+            for asset in assets
+            if (footprint := footprints.get(asset[prefix:])) is None
+            or intersects(footprint, tile_geom)
+        ]
+
+    def tile(  # type: ignore
+        self,
+        x: int,
+        y: int,
+        z: int,
+        reverse: bool = False,
+        **kwargs: Any,
+    ) -> Tuple[ImageData, List[str]]:
+        """Get Tile from multiple observation, reading assets in waves.
+
+        Tiles at zoom levels covered by the mosaic `overviews` are read from
+        the overview COG. Otherwise, assets whose footprint doesn't intersect
+        the tile are not opened. The first wave reads the leading assets needed
+        to cover the tile's quadkeys, the next waves double in size up to
+        `threads` assets.
+
+        """
+        if self.overviews_tms and (
+            overview := self.mosaic_def.get_overview(z)  # type: ignore
+        ):
+            return overview_tile(overview, x, y, z, tms=self.tms, **kwargs)  # type: ignore
+
+        mosaic_assets = self.filter_footprints(self.assets_for_tile(x, y, z), x, y, z)
+        if not mosaic_assets:
+            raise NoAssetFoundError(f"No assets found for tile {z}-{x}-{y}")
+
+        if reverse:
+            mosaic_assets = list(reversed(mosaic_assets))
+
+        first_wave = 1
+        mosaic_tms = self.mosaic_def.tilematrixset or WEB_MERCATOR_TMS  # type: ignore
+        if self.tms == mosaic_tms:  # type: ignore
+            coverage, total = self.mosaic_index.get_assets_coverage(x, y, z)
+            if prefix := self.mosaic_def.asset_prefix:  # type: ignore
+                coverage = {prefix + asset: qks for asset, qks in coverage.items()}
+
+            first_wave = assets_to_cover(mosaic_assets, coverage, total)
+
+        # assets are read in worker threads, which don't see the request's
+        # (thread-local) rasterio environment
+        gdal_env = gdal_env_key()
+
+        def _reader(asset: str, x: int, y: int, z: int, **kwargs: Any) -> ImageData:
+            with self.reader_pool.reader(
+                self.reader,  # type: ignore
+                asset,
+                tms=self.tms,  # type: ignore
+                gdal_env=gdal_env,
+                **self.reader_options,  # type: ignore
+            ) as src_dst:
+                return src_dst.tile(x, y, z, **kwargs)
+
+        return mosaic_wave_reader(
+            mosaic_assets, _reader, x, y, z, first_wave=first_wave, **kwargs
+        )
@@ -0,0 +1,186 @@
+"""titiler.mosaic low zoom overviews."""
+
+import os
+import tempfile
+from concurrent import futures
+from typing import Any, List, Optional, Tuple
+
+import rasterio
+from cogeo_mosaic.backends import BaseBackend
+from cogeo_mosaic.errors import NoAssetFoundError
+from morecantile import TileMatrixSet
+from morecantile.defaults import tms as morecantile_tms
+from pydantic import BaseModel
+from rasterio.shutil import copy as rio_copy
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from rio_tiler.errors import EmptyMosaicError, TileOutsideBounds
+from rio_tiler.io import Reader
+from rio_tiler.models import ImageData
+
+from titiler.mosaic.footprints import FootprintMosaicJSON
+
+WEB_MERCATOR_TMS = morecantile_tms.get("WebMercatorQuad")
+
+MOSAIC_OVERVIEW_THREADS = int(os.getenv("TITILER_MOSAIC_OVERVIEW_THREADS", 8))
+
+# `BaseBackend.tile` options which don't apply to a single COG
+MOSAIC_TILE_OPTIONS = {"pixel_selection", "threads", "chunk_size", "allowed_exceptions"}
+
+
+class MosaicOverview(BaseModel):
+    """Pre-rendered low zoom levels of a mosaic.
+
+    Attributes:
+        path (str): COG path or URL, in the mosaic's TileMatrixSet CRS.
+        minzoom (int): Lowest zoom level served from the COG.
+        maxzoom (int): Highest zoom level served from the COG (zoom of the COG full resolution).
+
+    """
+
+    path: str
+    minzoom: int
+    maxzoom: int
+
+
+class OverviewMosaicJSON(FootprintMosaicJSON):
+    """MosaicJSON document with per-asset footprints and low zoom overviews."""
+
+    overviews: Optional[List[MosaicOverview]] = None
+
+    def get_overview(self, zoom: int) -> Optional[MosaicOverview]:
+        """Find an overview serving a zoom level."""
+        for overview in self.overviews or []:
+            if overview.minzoom <= zoom <= overview.maxzoom:
+                return overview
+
+        return None
+
+
+def overview_tile(
+    overview: MosaicOverview,
+    x: int,
+    y: int,
+    z: int,
+    tms: TileMatrixSet = WEB_MERCATOR_TMS,
+    **kwargs: Any,
+) -> Tuple[ImageData, List[str]]:
+    """Read a mosaic tile from an overview COG.
+
+    Returns the same (ImageData, assets) tuple as `BaseBackend.tile`, the
+    overview path being the only asset.
+
+    """
+    options = {k: v for k, v in kwargs.items() if k not in MOSAIC_TILE_OPTIONS}
+    with Reader(overview.path, tms=tms) as src_dst:
+        return src_dst.tile(x, y, z, **options), [overview.path]
+
+
+def build_overview(
+    src_dst: BaseBackend,
+    path: str,
+    zoom: Optional[int] = None,
+    minzoom: Optional[int] = None,
+    threads: int = MOSAIC_OVERVIEW_THREADS,
+    tilesize: int = 256,
+    profile: Optional[dict] = None,
+    **kwargs: Any,
+) -> MosaicOverview:
+    """Render a mosaic at a low zoom level into a COG.
+
+    Mosaic tiles (in the backend's TileMatrixSet) covering the mosaic bounds
+    are read, like the tile endpoint would, and written to a Cloud Optimized
+    GeoTIFF with internal overviews and mask.
+
+    Args:
+        src_dst (BaseBackend): Mosaic backend.
+        path (str): Local output path.
+        zoom (int, optional): Zoom level of the COG full resolution. Defaults to the mosaic `minzoom - 1`.
+        minzoom (int, optional): Lowest zoom level to serve from the COG. Defaults to the TileMatrixSet minzoom.
+        threads (int): Number of tiles to read concurrently.
+        tilesize (int): Tile size.
+        profile (dict, optional): COG creation options (e.g `{"compress": "deflate"}`).
+        kwargs (optional): Options forwarded to the backend's `tile` method (e.g `pixel_selection`).
+
+    Returns:
+        MosaicOverview: the overview to add to the mosaic `overviews`.
+
+    """
+    tms = src_dst.tms
+    zoom = zoom if zoom is not None else max(src_dst.minzoom - 1, tms.minzoom)
+    minzoom = minzoom if minzoom is not None else tms.minzoom
+
+    tiles = list(tms.tiles(*src_dst.bounds, zooms=[zoom]))
+    minx = min(t.x for t in tiles)
+    miny = min(t.y for t in tiles)
+    width = (max(t.x for t in tiles) - minx + 1) * tilesize
+    height = (max(t.y for t in tiles) - miny + 1) * tilesize
+
+    left, _, right, top = tms.xy_bounds(minx, miny, zoom)
+    res = (right - left) / tilesize
+
+    def _read(tile) -> Optional[ImageData]:
+        try:
+            img, _ = src_dst.tile(tile.x, tile.y, tile.z, tilesize=tilesize, **kwargs)
+        except (NoAssetFoundError, EmptyMosaicError, TileOutsideBounds):
+            return None
+
+        return img
+
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        rasterio.Env(GDAL_TIFF_INTERNAL_MASK=True),
+    ):
+        tmp_path = os.path.join(tmpdir, "overview.tif")
+
+        dst = None
+        try:
+            with futures.ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+                for tile, img in zip(tiles, executor.map(_read, tiles)):
+                    if img is None:
+                        continue
+
+                    if dst is None:
+                        dst = rasterio.open(
+                            tmp_path,
+                            "w",
+                            driver="GTiff",
+                            width=width,
+                            height=height,
+                            count=img.count,
+                            dtype=img.data.dtype,
+                            crs=tms.rasterio_crs,
+                            transform=from_origin(left, top, res, res),
+                            tiled=True,
+                            blockxsize=tilesize,
+                            blockysize=tilesize,
+                        )
+                        if img.band_names:
+                            dst.descriptions = tuple(img.band_names)
+
+                    window = Window(
+                        (tile.x - minx) * tilesize,
+                        (tile.y - miny) * tilesize,
+                        tilesize,
+                        tilesize,
+                    )
+                    dst.write(img.data, window=window)
+                    dst.write_mask(img.mask, window=window)
+
+        finally:
+            if dst is not None:
+                dst.close()
+
+        if dst is None:
+            raise NoAssetFoundError(f"No assets found for zoom {zoom}")
+
+        rio_copy(
+            tmp_path,
+            path,
+            driver="COG",
+            blocksize=tilesize,
+            overview_resampling="average",
+            **(profile or {}),
+        )
+
+    return MosaicOverview(path=path, minzoom=minzoom, maxzoom=zoom)
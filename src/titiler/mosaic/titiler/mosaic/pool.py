@@ -0,0 +1,158 @@
+"""titiler.mosaic pool of opened asset readers."""
+
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, List, Optional, Tuple, Type
+
+from morecantile import TileMatrixSet
+from rio_tiler.errors import RioTilerError
+from rio_tiler.io import BaseReader
+
+from titiler.core.cache import gdal_env_key
+
+MOSAIC_READER_POOL_SIZE = int(os.getenv("TITILER_MOSAIC_READER_POOL_SIZE", 64))
+MOSAIC_READER_POOL_TTL = int(os.getenv("TITILER_MOSAIC_READER_POOL_TTL", 300))
+
+
+def _freeze(value: Any) -> Hashable:
+    """Make (nested) reader options hashable."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+
+    return value
+
+
+class ReaderPool:
+    """Pool of opened readers shared across tiles and requests.
+
+    Readers are checked out for the duration of a read (datasets are not
+    thread-safe) and returned to the pool afterwards. Idle readers are kept
+    by asset, reader options and rasterio environment, so header reads and
+    connection setup are skipped for assets used by consecutive tiles.
+
+    Args:
+        maxsize (int): Maximum number of idle (open) readers. The least recently used are closed first. A `maxsize` of 0 disables the pool.
+        ttl (int): Time (in seconds) after which an idle reader is closed.
+
+    """
+
+    def __init__(self, maxsize: int = 64, ttl: float = 300):
+        """Create the pool."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._idle: "OrderedDict[Tuple[Hashable, int], Tuple[float, BaseReader]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def __len__(self) -> int:
+        """Number of idle readers."""
+        return len(self._idle)
+
+    def _acquire(self, key: Hashable) -> Any:
+        """Take an idle reader for `key`."""
+        now = time.monotonic()
+        expired: List[BaseReader] = []
+        reader = None
+        with self._lock:
+            for entry_key in list(self._idle):
+                if entry_key[0] != key:
+                    continue
+
+                checked, src_dst = self._idle.pop(entry_key)
+                if now - checked < self.ttl:
+                    reader = src_dst
+                    break
+
+                expired.append(src_dst)
+
+        for src_dst in expired:
+            self._close(src_dst)
+
+        return reader
+
+    def _release(self, key: Hashable, src_dst: BaseReader):
+        """Return a reader to the pool, closing the least recently used ones."""
+        closed: List[BaseReader] = []
+        with self._lock:
+            self._counter += 1
+            self._idle[(key, self._counter)] = (time.monotonic(), src_dst)
+            while len(self._idle) > self.maxsize:
+                _, (_, evicted) = self._idle.popitem(last=False)
+                closed.append(evicted)
+
+        for src_dst in closed:
+            self._close(src_dst)
+
+    @staticmethod
+    def _close(src_dst: BaseReader):
+        with contextlib.suppress(Exception):
+            src_dst.__exit__(None, None, None)
+
+    @contextlib.contextmanager
+    def reader(
+        self,
+        reader: Type[BaseReader],
+        input: str,
+        tms: TileMatrixSet,
+        gdal_env: Optional[Hashable] = None,
+        **options: Any,
+    ) -> Iterator[BaseReader]:
+        """Open (or re-use) a reader.
+
+        rasterio environments are thread-local: when reading from worker threads,
+        `gdal_env` must be taken with `titiler.core.cache.gdal_env_key()` in the
+        thread which entered the environment (e.g the request thread). Defaults
+        to the current thread's environment.
+
+        """
+        if self.maxsize <= 0:
+            with reader(input, tms=tms, **options) as src_dst:
+                yield src_dst
+            return
+
+        if gdal_env is None:
+            gdal_env = gdal_env_key()
+
+        key = (reader, input, tms.id, _freeze(options), gdal_env)
+        src_dst = self._acquire(key)
+        if src_dst is None:
+            src_dst = reader(input, tms=tms, **options)
+            src_dst.__enter__()
+
+        try:
+            yield src_dst
+        except RioTilerError:
+            # e.g `TileOutsideBounds`, the reader is still usable
+            self._release(key, src_dst)
+            raise
+        except BaseException:
+            # don't keep readers in an unknown state
+            self._close(src_dst)
+            raise
+        else:
+            self._release(key, src_dst)
+
+    def clear(self):
+        """Close all idle readers."""
+        with self._lock:
+            idle = [src_dst for _, src_dst in self._idle.values()]
+            self._idle.clear()
+
+        for src_dst in idle:
+            self._close(src_dst)
+
+
+reader_pool = ReaderPool(maxsize=MOSAIC_READER_POOL_SIZE, ttl=MOSAIC_READER_POOL_TTL)
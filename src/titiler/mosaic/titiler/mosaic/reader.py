@@ -0,0 +1,119 @@
+"""titiler.mosaic wave mosaic reader."""
+
+from concurrent import futures
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from rio_tiler.constants import MAX_THREADS
+from rio_tiler.models import ImageData
+from rio_tiler.mosaic.methods.defaults import FirstMethod
+from rio_tiler.mosaic.reader import mosaic_reader
+
+
+def assets_to_cover(
+    assets: Sequence[str], coverage: Dict[str, Set[int]], total: int
+) -> int:
+    """Number of leading assets needed to cover all the `total` quadkeys.
+
+    Returns the number of assets when they don't cover all the quadkeys.
+
+    """
+    covered: Set[int] = set()
+    for n, asset in enumerate(assets, start=1):
+        covered |= coverage.get(asset, set())
+        if len(covered) >= total:
+            return n
+
+    return len(assets)
+
+
+class WaveScheduler:
+    """Read assets in waves, ahead of their (in order) consumption.
+
+    The first wave reads `first_wave` assets, the next waves double in size up
+    to `threads` assets.
+
+    """
+
+    def __init__(
+        self,
+        reader: Callable[..., ImageData],
+        assets: Sequence[str],
+        threads: int,
+        first_wave: int = 1,
+    ):
+        """Create the scheduler."""
+        self.reader = reader
+        self.assets = assets
+        self.threads = max(threads, 1)
+        self.wave = min(max(first_wave, 1), self.threads)
+        self.executor = futures.ThreadPoolExecutor(max_workers=self.threads)
+        self.futures: List[futures.Future] = []
+        self.waves: List[int] = []
+        self.position = 0
+
+    def _submit(self, *args: Any, **kwargs: Any):
+        start = len(self.futures)
+        chunk = self.assets[start : start + self.wave]
+        self.futures.extend(
+            self.executor.submit(self.reader, asset, *args, **kwargs) for asset in chunk
+        )
+        self.waves.append(len(chunk))
+        self.wave = min(self.wave * 2, self.threads)
+
+    def __call__(self, asset: str, *args: Any, **kwargs: Any) -> ImageData:
+        """Return the (read ahead) result for the next asset."""
+        if self.position >= len(self.futures):
+            self._submit(*args, **kwargs)
+
+        future = self.futures[self.position]
+        self.position += 1
+        return future.result()
+
+    def close(self):
+        """Cancel reads which are not needed anymore."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def mosaic_wave_reader(
+    mosaic_assets: Sequence[str],
+    reader: Callable[..., ImageData],
+    *args: Any,
+    threads: int = MAX_THREADS,
+    first_wave: Optional[int] = None,
+    **kwargs: Any,
+) -> Tuple[ImageData, List]:
+    """Merge multiple assets, reading them in waves.
+
+    Like `rio_tiler.mosaic.reader.mosaic_reader` but assets are read in waves
+    of increasing size (`first_wave`, then doubling up to `threads`) and the
+    results are fed to the pixel selection method in order, as soon as they
+    are available. When the method is done (e.g the tile is full with
+    `FirstMethod`), outstanding reads are cancelled.
+
+    Args:
+        mosaic_assets (sequence): List of assets.
+        reader (callable): Reader function.
+        args (Any): Argument to forward to the reader function.
+        threads (int, optional): Maximum number of concurrent reads. If <= 1, runs `mosaic_reader` single threaded.
+        first_wave (int, optional): Number of assets to read in the first wave. Defaults to `threads` (and is ignored for pixel selection methods which don't exit when filled).
+        kwargs (optional): `mosaic_reader` and reader callable's keywords options.
+
+    Returns:
+        tuple: ImageData and assets (list).
+
+    """
+    if not threads or threads <= 1:
+        return mosaic_reader(mosaic_assets, reader, *args, threads=0, **kwargs)
+
+    # methods which can't stop early need all the assets anyway
+    pixel_selection = kwargs.get("pixel_selection", FirstMethod)
+    if not first_wave or not pixel_selection.exit_when_filled:
+        first_wave = threads
+
+    scheduler = WaveScheduler(reader, mosaic_assets, threads, first_wave=first_wave)
+    try:
+        # `mosaic_reader` runs the tasks lazily and in order when threads=0,
+        # stopping as soon as the pixel selection method is done.
+        return mosaic_reader(mosaic_assets, scheduler, *args, threads=0, **kwargs)
+    finally:
+        scheduler.close()
@@ -0,0 +1,167 @@
+"""test titiler.xarray opened datasets cache."""
+
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from titiler.xarray.cache import DatasetCache
+from titiler.xarray.chunks import ChunkCache, load_dataarray
+from titiler.xarray.extensions import DatasetCacheExtension
+from titiler.xarray.factory import TilerFactory
+from titiler.xarray.io import Reader, fs_open_dataset, open_zarr
+
+prefix = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture
+def dataset_zarr(tmp_path):
+    """Copy of the 3D Zarr dataset."""
+    path = str(tmp_path / "dataset_3d.zarr")
+    shutil.copytree(os.path.join(prefix, "dataset_3d.zarr"), path)
+    return path
+
+
+@pytest.mark.parametrize("opener", [open_zarr, fs_open_dataset])
+def test_dataset_cache(opener, dataset_zarr):
+    """Datasets should be cached and revalidated."""
+    cache = DatasetCache(maxsize=2, ttl=300)
+    with patch("titiler.xarray.io.dataset_cache", cache):
+        with opener(dataset_zarr) as ds:
+            assert ds["dataset"].shape
+
+        # closing the returned dataset doesn't close the cached one
+        with Reader(dataset_zarr, variable="dataset", opener=opener) as src:
+            assert src.tile(0, 0, 0)
+
+        assert len(cache) == 1
+        entry = cache.stats()["datasets"][0]
+        assert entry["src_path"] == dataset_zarr
+        assert entry["hits"] == 1
+        assert entry["version"]
+        assert entry["nbytes"] > 0
+        assert cache.nbytes == entry["nbytes"]
+
+        # metadata didn't change
+        cached = next(iter(cache._data.values())).dataset
+        cache.ttl = 0
+        opener(dataset_zarr)
+        assert next(iter(cache._data.values())).dataset is cached
+
+        # metadata changed
+        metadata = os.path.join(dataset_zarr, ".zmetadata")
+        with open(metadata, "a") as f:
+            f.write(" ")
+
+        opener(dataset_zarr)
+        assert next(iter(cache._data.values())).dataset is not cached
+        assert cache.stats()["datasets"][0]["hits"] == 0
+
+        # options are part of the key
+        opener(dataset_zarr, decode_times=False)
+        assert len(cache) == 2
+
+        # least recently used datasets are evicted
+        opener(os.path.join(prefix, "pyramid.zarr"), group="0")
+        assert len(cache) == 2
+        assert [e["src_path"] for e in cache.stats()["datasets"]] == [
+            dataset_zarr,
+            os.path.join(prefix, "pyramid.zarr"),
+        ]
+
+        assert cache.evict(dataset_zarr) == 1
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.nbytes == 0
+
+
+def test_dataset_cache_chunks(dataset_zarr):
+    """Decoded chunks should be evicted when their dataset changed."""
+    chunks = ChunkCache(maxbytes=256 * 1024 * 1024, ttl=300)
+    cache = DatasetCache(maxsize=2, ttl=0, chunk_cache=chunks)
+
+    def _read():
+        ds = open_zarr(dataset_zarr)
+        da = ds["dataset"].isel(time=0, y=slice(0, 10), x=slice(0, 10))
+        load_dataarray(da, cache=chunks)
+
+    with patch("titiler.xarray.io.dataset_cache", cache):
+        _read()
+        assert len(chunks) == 1
+
+        # metadata didn't change
+        _read()
+        assert len(chunks) == 1
+        assert chunks.hits == 1
+
+        # metadata changed
+        with open(os.path.join(dataset_zarr, ".zmetadata"), "a") as f:
+            f.write(" ")
+
+        open_zarr(dataset_zarr)
+        assert len(chunks) == 0
+
+        _read()
+        assert len(chunks) == 1
+        assert cache.evict(dataset_zarr) == 1
+        assert len(chunks) == 0
+
+
+def test_dataset_cache_limits():
+    """Cache should respect its memory budget and be disabled with maxsize=0."""
+    src_path = os.path.join(prefix, "dataset_2d.nc")
+
+    cache = DatasetCache(maxsize=10, maxbytes=1)
+    with patch("titiler.xarray.io.dataset_cache", cache):
+        fs_open_dataset(src_path)
+        assert len(cache) == 0
+
+    cache = DatasetCache(maxsize=0)
+    with patch("titiler.xarray.io.dataset_cache", cache):
+        ds = fs_open_dataset(src_path)
+        assert len(cache) == 0
+        assert ds._close is not None
+        ds.close()
+
+
+def test_dataset_cache_extension():
+    """Test /cache/datasets endpoints."""
+    src_path = os.path.join(prefix, "dataset_3d.zarr")
+    cache = DatasetCache(maxsize=10)
+
+    md = TilerFactory(extensions=[DatasetCacheExtension(cache=cache)])
+    app = FastAPI()
+    app.include_router(md.router)
+    client = TestClient(app)
+
+    with patch("titiler.xarray.io.dataset_cache", cache):
+        response = client.get(
+            "/tiles/WebMercatorQuad/0/0/0.png",
+            params={"url": src_path, "variable": "dataset", "sel": "time=2022-01-01"},
+        )
+        assert response.status_code == 200
+
+    response = client.get("/cache/datasets")
+    assert response.status_code == 200
+    info = response.json()
+    assert info["maxsize"] == 10
+    assert len(info["datasets"]) == 1
+    assert info["datasets"][0]["src_path"] == src_path
+
+    response = client.delete("/cache/datasets", params={"url": "another.zarr"})
+    assert response.json() == {"evicted": 0}
+
+    response = client.delete("/cache/datasets", params={"url": src_path})
+    assert response.json() == {"evicted": 1}
+    assert len(cache) == 0
+
+    response = client.get("/cache/chunks")
+    assert response.status_code == 200
+    assert response.json()["chunks"] >= 0
+
+    response = client.delete("/cache/chunks")
+    assert response.json()["chunks"] == 0
@@ -0,0 +1,131 @@
+"""test titiler.xarray chunk-aligned Zarr reads."""
+
+import os
+
+import numpy
+import pytest
+import xarray
+
+from titiler.xarray.chunks import (
+    ChunkCache,
+    chunk_key,
+    load_dataarray,
+    plan_chunks,
+    zarr_source,
+)
+from titiler.xarray.io import Reader, fs_open_dataset, open_zarr
+
+prefix = os.path.join(os.path.dirname(__file__), "fixtures")
+dataset_3d_zarr = os.path.join(prefix, "dataset_3d.zarr")
+
+
+def test_plan_chunks():
+    """Plan should list the chunks covered by a selection."""
+    ds = open_zarr(dataset_3d_zarr)
+    da = ds["dataset"].isel(time=0, y=slice(438, 564), x=slice(941, 1060))
+
+    source = zarr_source(da)
+    assert source.array.chunks == (1, 250, 500)
+    assert source.selection == (0, slice(438, 564, 1), slice(941, 1060, 1))
+
+    shape, reads = plan_chunks(source.array, source.selection)
+    assert shape == (126, 119)
+    assert [r.chunk_coords for r in reads] == [
+        (0, 1, 1),
+        (0, 1, 2),
+        (0, 2, 1),
+        (0, 2, 2),
+    ]
+
+    loaded = load_dataarray(da, threads=4, cache=None)
+    assert loaded.variable._in_memory
+    numpy.testing.assert_array_equal(loaded.values, da.values)
+
+    # not backed by zarr
+    assert zarr_source(loaded) is None
+    assert (
+        zarr_source(fs_open_dataset(os.path.join(prefix, "dataset_2d.nc"))["dataset"])
+        is None
+    )
+
+
+def test_load_dataarray_decoded(tmp_path):
+    """CF decoding (scale/offset and fill value) should be applied."""
+    data = numpy.arange(100 * 120, dtype="float32").reshape(100, 120)
+    data[10:20, 10:20] = numpy.nan
+    ds = xarray.Dataset(
+        {"var": (("y", "x"), data)},
+        coords={"y": numpy.arange(100), "x": numpy.arange(120)},
+    )
+    path = str(tmp_path / "encoded.zarr")
+    ds.to_zarr(
+        path,
+        encoding={
+            "var": {
+                "dtype": "int16",
+                "scale_factor": 0.5,
+                "_FillValue": -1,
+                "chunks": (30, 40),
+            }
+        },
+    )
+
+    da = xarray.open_dataset(path, engine="zarr")["var"][5:95, 15:110]
+    source = zarr_source(da)
+    assert source is not None
+    assert source.decoders
+
+    loaded = load_dataarray(da, threads=4)
+    assert loaded.dtype == da.dtype
+    numpy.testing.assert_array_equal(loaded.values, da.values)
+    assert numpy.isnan(loaded.values[5:15, 0:5]).all()
+
+
+def test_chunk_cache():
+    """Decoded chunks should be shared between reads."""
+    ds = open_zarr(dataset_3d_zarr)
+    cache = ChunkCache(maxbytes=4 * 250 * 500 * 8, ttl=300)
+
+    # single thread, so chunks are cached in a deterministic order
+    da = ds["dataset"].isel(time=0, y=slice(438, 564), x=slice(941, 1060))
+    loaded = load_dataarray(da, threads=1, cache=cache)
+    numpy.testing.assert_array_equal(loaded.values, da.values)
+    assert len(cache) == 4
+    assert cache.nbytes == 4 * 250 * 500 * 8
+    assert (cache.hits, cache.misses) == (0, 4)
+
+    # neighbouring read within the same chunks
+    da = ds["dataset"].isel(time=0, y=slice(300, 400), x=slice(600, 1200))
+    source = zarr_source(da)
+    loaded = load_dataarray(da, threads=2, cache=cache)
+    numpy.testing.assert_array_equal(loaded.values, da.values)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    chunk = cache.get(chunk_key(source.array, (0, 1, 1)))
+    assert not chunk.flags.writeable
+
+    # least recently used chunks are evicted
+    da = ds["dataset"].isel(time=1, y=slice(0, 10), x=slice(0, 10))
+    load_dataarray(da, cache=cache)
+    assert len(cache) == 4
+    assert cache.get(chunk_key(source.array, (0, 2, 1))) is None
+
+    cache.clear()
+    assert cache.stats()["nbytes"] == 0
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"sel": ["time=2023-01-01"]}],
+)
+def test_reader_chunk_threads(options):
+    """Chunk-aligned reads should return the same data as xarray."""
+    with Reader(dataset_3d_zarr, variable="dataset", chunk_threads=4, **options) as src:
+        images = [src.tile(1, 1, 2), src.part((-10, -10, 10, 10), max_size=64)]
+
+    with Reader(dataset_3d_zarr, variable="dataset", chunk_threads=0, **options) as src:
+        expected = [src.tile(1, 1, 2), src.part((-10, -10, 10, 10), max_size=64)]
+
+    for img, ref in zip(images, expected):
+        numpy.testing.assert_array_equal(img.array, ref.array)
+        assert img.band_names == ref.band_names
@@ -1,12 +1,15 @@
 """test titiler.xarray factory."""
 
 import os
+from io import BytesIO
 
+import numpy
 import pytest
 from fastapi import FastAPI
 from rasterio.io import MemoryFile
 from starlette.testclient import TestClient
 
+from titiler.core.errors import DEFAULT_STATUS_CODES, add_exception_handlers
 from titiler.xarray.extensions import DatasetMetadataExtension, VariablesExtension
 from titiler.xarray.factory import TilerFactory
 from titiler.xarray.io import FsReader, fs_open_dataset
@@ -25,28 +28,28 @@ def test_deprecated_extension():
     """Test TilerFactory class."""
     with pytest.warns(DeprecationWarning):
         md = TilerFactory(extensions=[VariablesExtension()])
-    assert len(md.router.routes) == 19
+    assert len(md.router.routes) == 23
 
 
 def test_tiler_factory():
     """Test factory with options."""
     """Test TilerFactory class."""
     md = TilerFactory()
-    assert len(md.router.routes) == 18
+    assert len(md.router.routes) == 22
 
     with pytest.warns(UserWarning):
         md = TilerFactory(
             # /preview, /preview.{format}, /preview/{width}x{height}.{format}
             add_preview=True,
         )
-        assert len(md.router.routes) == 21
+        assert len(md.router.routes) == 25
 
     md = TilerFactory(
         router_prefix="/md",
         # /dataset, /dataset/dict, /dataset/keys
         extensions=[DatasetMetadataExtension()],
     )
-    assert len(md.router.routes) == 21
+    assert len(md.router.routes) == 25
 
     app = FastAPI()
     app.include_router(md.router, prefix="/md")
@@ -69,7 +72,7 @@ def app():
         ],
         reader=FsReader,
     )
-    assert len(md.router.routes) == 21
+    assert len(md.router.routes) == 25
 
     app = FastAPI()
     app.include_router(md.router, prefix="/md")
@@ -86,7 +89,7 @@ def app_zarr():
             DatasetMetadataExtension(),
         ],
     )
-    assert len(md.router.routes) == 21
+    assert len(md.router.routes) == 25
 
     app = FastAPI()
     app.include_router(md.router, prefix="/md")
@@ -233,6 +236,85 @@ def test_tiles(filename, app):
     assert resp.headers["content-type"] == "application/json"
 
 
+@pytest.mark.parametrize(
+    "filename",
+    [dataset_3d_nc, dataset_3d_zarr],
+)
+def test_animation(filename, app):
+    """Test /animation endpoints."""
+    params = {"url": filename, "variable": "dataset", "rescale": "0,500"}
+
+    resp = app.get("/md/animation/WebMercatorQuad/0/0/0.npy", params=params)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-binary"
+    arr = numpy.load(BytesIO(resp.content))
+    # 2 time steps + mask
+    assert arr.shape == (3, 256, 256)
+
+    resp = app.get(
+        "/md/animation/WebMercatorQuad/0/0/0@2x.multipart",
+        params={**params, "frame_format": "jpeg"},
+    )
+    assert resp.status_code == 200
+    media_type, boundary = resp.headers["content-type"].split("; boundary=")
+    assert media_type == "multipart/mixed"
+    parts = resp.content.split(f"--{boundary}".encode())
+    assert parts[-1] == b"--\r\n"
+    frames = parts[1:-1]
+    assert len(frames) == 2
+    assert b"Content-Type: image/jpeg" in frames[0]
+    assert b'name="2022-01-01T00:00:00.000000000"' in frames[0]
+    assert b'name="2023-01-01T00:00:00.000000000"' in frames[1]
+    with MemoryFile(frames[1].split(b"\r\n\r\n", 1)[1][:-2]) as mem:
+        with mem.open() as dst:
+            assert dst.width == 512
+
+    # single step
+    resp = app.get(
+        "/md/animation/WebMercatorQuad/0/0/0.multipart",
+        params={**params, "sel": "time=2022-01-01"},
+    )
+    assert resp.status_code == 200
+    assert resp.content.count(b"Content-Type: image/png") == 1
+
+    resp = app.get("/md/animation/WebMercatorQuad/0/0/0.mp4", params=params)
+    assert resp.status_code == 422
+
+
+def test_animation_frames():
+    """Test /animation encoding and maximum number of frames."""
+    md = TilerFactory(animation_max_frames=1)
+    app = FastAPI()
+    app.include_router(md.router)
+    add_exception_handlers(app, DEFAULT_STATUS_CODES)
+    client = TestClient(app)
+
+    params = {"url": dataset_3d_zarr, "variable": "dataset", "rescale": "0,500"}
+    resp = client.get("/animation/WebMercatorQuad/0/0/0.webp", params=params)
+    assert resp.status_code == 400
+
+    # 2 float64 frames of 256x256 (1 MiB) or 512x512 (4 MiB)
+    md = TilerFactory(animation_max_bytes=2 * 1024 * 1024)
+    size_app = FastAPI()
+    size_app.include_router(md.router)
+    add_exception_handlers(size_app, DEFAULT_STATUS_CODES)
+    size_client = TestClient(size_app)
+
+    resp = size_client.get("/animation/WebMercatorQuad/0/0/0.npy", params=params)
+    assert resp.status_code == 200
+    resp = size_client.get("/animation/WebMercatorQuad/0/0/0@2x.npy", params=params)
+    assert resp.status_code == 400
+    assert "Maximum animation size" in resp.json()["detail"]
+
+    pytest.importorskip("PIL")
+
+    params["sel"] = "time=2022-01-01/2022-12-31"
+    for fmt in ["webp", "gif"]:
+        resp = client.get(f"/animation/WebMercatorQuad/0/0/0.{fmt}", params=params)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == f"image/{fmt}"
+
+
 @pytest.mark.parametrize(
     "filename",
     [dataset_2d_nc, dataset_3d_nc, dataset_3d_zarr],
@@ -248,6 +330,64 @@ def test_point(filename, app):
     assert resp.headers["content-type"] == "application/json"
 
 
+@pytest.mark.parametrize(
+    "filename",
+    [dataset_2d_nc, dataset_3d_nc, dataset_3d_zarr],
+)
+def test_timeseries(filename, app):
+    """Test /timeseries endpoints."""
+    points = ["-100.1,45.5", "10,10", "-100,45.6", "500,10"]
+    resp = app.get(
+        "/md/timeseries",
+        params={"url": filename, "variable": "dataset", "point": points},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    body = resp.json()
+    if filename == dataset_2d_nc:
+        assert body["dimension"] is None
+        assert body["steps"] == ["value"]
+    else:
+        assert body["dimension"] == "time"
+        assert body["steps"] == [
+            "2022-01-01T00:00:00.000000000",
+            "2023-01-01T00:00:00.000000000",
+        ]
+
+    values = {p["index"]: p["values"] for p in body["points"]}
+    assert sorted(values) == [0, 1, 2, 3]
+    assert values[3] == [None] * len(body["steps"])
+    for idx in [0, 1, 2]:
+        resp = app.get(
+            f"/md/point/{points[idx]}", params={"url": filename, "variable": "dataset"}
+        )
+        assert values[idx] == resp.json()["values"]
+
+    resp = app.get(
+        "/md/timeseries.csv",
+        params={
+            "url": filename,
+            "variable": "dataset",
+            "point": points[:2],
+            "sel": "time=2023-01-01",
+        }
+        if filename != dataset_2d_nc
+        else {"url": filename, "variable": "dataset", "point": points[:2]},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    rows = resp.text.splitlines()
+    assert len(rows) == 3
+    assert rows[0] == "index,x,y,value"
+    assert rows[1].startswith("0,-100.1,45.5,")
+
+    resp = app.get(
+        "/md/timeseries",
+        params={"url": filename, "variable": "dataset", "point": "a,b"},
+    )
+    assert resp.status_code == 422
+
+
 @pytest.mark.parametrize(
     "filename",
     [dataset_2d_nc, dataset_3d_nc, dataset_3d_zarr],
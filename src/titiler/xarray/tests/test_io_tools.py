@@ -9,12 +9,15 @@ import numpy
 import pytest
 import xarray
 
+from titiler.xarray.chunks import plan_chunks, zarr_source
 from titiler.xarray.io import (
     Reader,
     _parse_dsl,
     fs_open_dataset,
     get_variable,
+    longitude_cache,
     open_zarr,
+    selector_cache,
 )
 
 prefix = os.path.join(os.path.dirname(__file__), "fixtures")
@@ -211,6 +214,89 @@ def test_get_variable_datetime_tz():
     assert da["time"] == numpy.datetime64("2023-01-01")
 
 
+def test_get_variable_time_steps():
+    """test io.get_variable with many time steps."""
+    arr = numpy.arange(0, 33 * 35 * 12).reshape(12, 33, 35)
+    data = xarray.DataArray(
+        arr,
+        dims=("time", "y", "x"),
+        coords={
+            "x": numpy.arange(-170, 180, 10),
+            "y": numpy.arange(-80, 85, 5),
+            "time": [datetime(2022, m, 1) for m in range(1, 13)],
+        },
+    )
+    ds = data.to_dataset(name="dataset")
+
+    selector_cache.clear()
+    da = get_variable(ds, "dataset", sel=["time=2022-03-01/2022-06-01"])
+    assert da.dims == ("time", "y", "x")
+    assert da["time"].dt.month.values.tolist() == [3, 4, 5, 6]
+    assert len(selector_cache) == 1
+
+    # resolved positions are cached
+    da = get_variable(ds.copy(), "dataset", sel=["time=2022-03-01/2022-06-01"])
+    assert da["time"].dt.month.values.tolist() == [3, 4, 5, 6]
+    assert len(selector_cache) == 1
+
+    # open intervals and values
+    da = get_variable(
+        ds, "dataset", sel=["time=2022-11-01/", "time=2022-01-01", "time=/2022-02-01"]
+    )
+    assert da["time"].dt.month.values.tolist() == [11, 12, 1, 1, 2]
+
+    da = get_variable(
+        ds,
+        "dataset",
+        sel=["time=nearest::2022-02-03", "time=nearest::2022-07-30"],
+    )
+    assert da["time"].dt.month.values.tolist() == [2, 8]
+
+    with pytest.raises(ValueError):
+        get_variable(ds, "dataset", sel=["time=nearest::2022-03-01/2022-06-01"])
+
+    with pytest.raises(KeyError):
+        get_variable(ds, "dataset", sel=["time=2022-03-01", "time=2022-03-02"])
+
+
+def test_get_variable_0_360(tmp_path):
+    """test io.get_variable with 0-360 longitudes."""
+    arr = numpy.arange(0, 33 * 36).reshape(33, 36)
+    ds = xarray.Dataset(
+        {"dataset": (("y", "x"), arr)},
+        coords={"x": numpy.arange(5, 360, 10), "y": numpy.arange(-80, 85, 5)},
+    )
+    path = str(tmp_path / "dataset_0_360.zarr")
+    ds.to_zarr(path, encoding={"dataset": {"chunks": (33, 6)}})
+
+    longitude_cache.clear()
+    ds = xarray.open_dataset(path, engine="zarr")
+    da = get_variable(ds, "dataset")
+    assert da.x.values.tolist() == list(range(-175, 180, 10))
+    assert da.sel(x=-175).values.tolist() == arr[:, 18].tolist()
+    assert da.sel(x=175).values.tolist() == arr[:, 17].tolist()
+    assert len(longitude_cache) == 1
+
+    # the -180/180 ordering is computed once
+    get_variable(ds, "dataset")
+    assert len(longitude_cache) == 1
+
+    # reads across the antimeridian are split in two contiguous slices
+    part = da.isel(x=slice(15, 21))
+    assert part.x.values.tolist() == [-25, -15, -5, 5, 15, 25]
+    source = zarr_source(part)
+    shape, reads = plan_chunks(source.array, source.selection)
+    assert shape == (33, 6)
+    assert [r.chunk_coords for r in reads] == [(0, 5), (0, 0)]
+    assert [r.out_selection[1] for r in reads] == [slice(0, 3), slice(3, 6)]
+
+    with Reader(path, variable="dataset") as src:
+        img = src.part((-30, -10, 30, 10), dst_crs="epsg:4326", max_size=6)
+        numpy.testing.assert_array_equal(
+            img.array[0, 0], numpy.r_[arr[18, 33:], arr[18, :3]]
+        )
+
+
 @pytest.mark.parametrize(
     "protocol,filename",
     [
@@ -0,0 +1,157 @@
+"""test titiler.xarray multiscale pyramids."""
+
+import os
+import shutil
+
+import numpy
+import pytest
+import xarray
+
+from titiler.xarray.cache import dataset_cache, dataset_version
+from titiler.xarray.io import Reader, open_zarr
+from titiler.xarray.pyramid import (
+    build_pyramid,
+    find_pyramid,
+    get_multiscales,
+    is_current,
+    pyramid_path,
+    select_level,
+)
+
+prefix = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture
+def dataset_zarr(tmp_path):
+    """Copy of the 3D Zarr dataset."""
+    path = str(tmp_path / "dataset_3d.zarr")
+    shutil.copytree(os.path.join(prefix, "dataset_3d.zarr"), path)
+    return path
+
+
+def test_pyramid_path():
+    """Pyramids should be stored next to the dataset or in a directory."""
+    assert pyramid_path("/data/dataset.zarr") == "/data/dataset.pyramid.zarr"
+    assert pyramid_path("s3://bucket/dataset.nc/") == "s3://bucket/dataset.pyramid.zarr"
+    assert (
+        pyramid_path("/data/dataset.zarr", group="a/b")
+        == "/data/dataset_a_b.pyramid.zarr"
+    )
+
+    path = pyramid_path("s3://bucket/dataset.zarr", directory="/pyramids")
+    assert path.startswith("/pyramids/") and path.endswith(".zarr")
+    assert path != pyramid_path("s3://bucket/dataset.zarr", "g", directory="/pyramids")
+
+
+def test_select_level():
+    """The coarsest level finer than the requested resolution should be selected."""
+    levels = [
+        {"path": "1", "level": 1, "resolution": 0.2},
+        {"path": "2", "level": 2, "resolution": 0.4},
+        {"path": "3", "level": 3, "resolution": 0.8},
+    ]
+    assert select_level(levels, 0.1) is None
+    assert select_level(levels, 0.3)["path"] == "1"
+    assert select_level(levels, 0.4)["path"] == "2"
+    assert select_level(levels, 10)["path"] == "3"
+
+
+def test_build_pyramid(dataset_zarr):
+    """Levels should halve the resolution of the dataset."""
+    assert find_pyramid(dataset_zarr) is None
+
+    multiscales = build_pyramid(dataset_zarr, strip_size=300)
+    assert [level["path"] for level in multiscales["datasets"]] == ["1", "2", "3"]
+    assert multiscales["metadata"]["variables"] == ["dataset"]
+    assert multiscales["metadata"]["version"] == dataset_version(
+        open_zarr(dataset_zarr)
+    )
+
+    path = pyramid_path(dataset_zarr)
+    assert get_multiscales(path) == multiscales
+    assert find_pyramid(dataset_zarr) == (path, multiscales)
+
+    ds = open_zarr(dataset_zarr)
+    level = open_zarr(path, group="1")
+    assert level["dataset"].shape == (2, 500, 1000)
+    numpy.testing.assert_allclose(
+        level["dataset"].values,
+        ds["dataset"].coarsen(y=2, x=2).mean().values,
+    )
+    assert multiscales["datasets"][0]["resolution"] == pytest.approx(
+        2 * abs(float(ds.x[1] - ds.x[0]))
+    )
+
+
+def test_reader_pyramid(dataset_zarr):
+    """Reader should read low resolution tiles from the pyramid."""
+    build_pyramid(dataset_zarr)
+
+    with Reader(dataset_zarr, variable="dataset", sel=["time=2023-01-01"]) as src:
+        assert src.pyramid == pyramid_path(dataset_zarr)
+        assert len(src._levels) == 3
+
+        # zoom 0: 1.4 x 0.66 degree per pixel
+        da = src._level_input(
+            tuple(src.tms.xy_bounds(0, 0, 0)),
+            src.tms.rasterio_crs,
+            height=256,
+            width=256,
+        )
+        assert da.shape == (500, 1000)
+
+        # 2.6 degree per pixel, coarsest level
+        da = src._level_input(src.bounds, src.crs, max_size=128)
+        assert da.shape == (125, 250)
+
+        # full resolution
+        da = src._level_input(
+            tuple(src.tms.xy_bounds(1, 1, 5)),
+            src.tms.rasterio_crs,
+            height=256,
+            width=256,
+        )
+        assert da is src.input
+
+        img = src.tile(0, 0, 0)
+        assert img.band_names == ["2023-01-01T00:00:00.000000000"]
+
+        preview = src.preview(max_size=256)
+        assert preview.width == 256
+
+    with Reader(dataset_zarr, variable="dataset", sel=["time=2023-01-01"]) as src:
+        src._levels = []
+        ref = src.tile(0, 0, 0)
+
+    assert img.array.shape == ref.array.shape
+    numpy.testing.assert_allclose(img.array.mean(), ref.array.mean(), rtol=0.01)
+
+
+def test_reader_pyramid_stale(dataset_zarr):
+    """Reader shouldn't use a pyramid built from another version of the dataset."""
+    multiscales = build_pyramid(dataset_zarr)
+
+    # add a time step
+    ds = xarray.open_zarr(dataset_zarr)
+    step = ds.isel(time=[-1]).assign_coords(
+        time=ds.time[-1:].values + numpy.timedelta64(365, "D")
+    )
+    for var in step.variables.values():
+        var.encoding = {}
+    step.drop_vars(["x", "y"]).to_zarr(dataset_zarr, append_dim="time")
+    dataset_cache.evict(dataset_zarr)
+
+    assert not is_current(multiscales, dataset_version(open_zarr(dataset_zarr)))
+
+    with Reader(dataset_zarr, variable="dataset", sel=["time=2024-01-01"]) as src:
+        assert src.pyramid == pyramid_path(dataset_zarr)
+        assert not src._levels
+        assert src._level_input(src.bounds, src.crs, max_size=128) is src.input
+
+        # selectors which can't be resolved on the level use the dataset
+        src._levels = multiscales["datasets"]
+        assert src._level_input(src.bounds, src.crs, max_size=128) is src.input
+
+    # pyramids without version are always used
+    multiscales["metadata"]["version"] = None
+    assert is_current(multiscales, "any")
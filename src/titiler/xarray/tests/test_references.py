@@ -0,0 +1,119 @@
+"""test titiler.xarray virtual references."""
+
+import json
+import os
+import shutil
+from unittest.mock import patch
+
+import numpy
+import pytest
+
+from titiler.xarray.cache import DatasetCache
+from titiler.xarray.chunks import zarr_source
+from titiler.xarray.cli import main
+from titiler.xarray.io import Reader, fs_open_dataset, open_zarr
+from titiler.xarray.references import find_references, references_cache, references_path
+
+prefix = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _zarr_references(path: str) -> dict:
+    """Virtual references of a (Zarr V2) store: metadata inlined, chunks referenced."""
+    refs = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            filepath = os.path.join(root, name)
+            key = os.path.relpath(filepath, path)
+            if name.startswith(".z"):
+                with open(filepath) as f:
+                    refs[key] = f.read()
+            else:
+                refs[key] = [filepath]
+
+    return {"version": 1, "refs": refs}
+
+
+@pytest.fixture
+def dataset_refs(tmp_path):
+    """Copy of the 3D NetCDF dataset with its virtual references."""
+    references_cache.clear()
+
+    path = str(tmp_path / "dataset_3d.nc")
+    shutil.copy(os.path.join(prefix, "dataset_3d.nc"), path)
+    with open(references_path(path, directory=None), "w") as f:
+        json.dump(_zarr_references(os.path.join(prefix, "dataset_3d.zarr")), f)
+
+    yield path
+
+    references_cache.clear()
+
+
+def test_references_path():
+    """References should be stored next to the dataset or in a directory."""
+    assert references_path("/data/dataset.nc", directory=None) == (
+        "/data/dataset.nc.refs.json"
+    )
+    assert references_path("s3://bucket/data.h5", "parquet", directory=None) == (
+        "s3://bucket/data.h5.refs.parquet"
+    )
+
+    path = references_path("s3://bucket/dataset.nc", directory="/refs")
+    assert path.startswith("/refs/") and path.endswith(".refs.json")
+
+
+def test_find_references(dataset_refs):
+    """References should only be looked up (once) for NetCDF/HDF5 datasets."""
+    assert find_references(dataset_refs, directory=None) == dataset_refs + ".refs.json"
+    assert references_cache.get(dataset_refs) == dataset_refs + ".refs.json"
+
+    assert not find_references(os.path.join(prefix, "dataset_3d.zarr"))
+    references_cache.clear()
+    assert not find_references(os.path.join(prefix, "dataset_2d.nc"), directory=None)
+    assert references_cache.get(os.path.join(prefix, "dataset_2d.nc")) is None
+
+
+def test_fs_open_dataset_references(dataset_refs):
+    """NetCDF datasets with references should be read like Zarr stores."""
+    expected = open_zarr(os.path.join(prefix, "dataset_3d.zarr"))["dataset"]
+
+    with patch("titiler.xarray.io.dataset_cache", DatasetCache(maxsize=0)):
+        with patch(
+            "titiler.xarray.io.find_references",
+            lambda src_path, **kwargs: find_references(src_path, directory=None),
+        ):
+            ds = fs_open_dataset(dataset_refs)
+            assert zarr_source(ds["dataset"]) is not None
+            numpy.testing.assert_array_equal(
+                ds["dataset"][0, :10, :10].values, expected[0, :10, :10].values
+            )
+
+            with Reader(
+                dataset_refs, variable="dataset", opener=fs_open_dataset
+            ) as src:
+                assert src.tile(0, 0, 0).count == 2
+
+        # explicit references
+        ds = fs_open_dataset(
+            os.path.join(prefix, "dataset_2d.nc"),
+            references=dataset_refs + ".refs.json",
+        )
+        assert zarr_source(ds["dataset"]) is not None
+
+
+def test_generate_references(tmp_path):
+    """Generate references with the CLI."""
+    pytest.importorskip("kerchunk")
+
+    path = str(tmp_path / "dataset_3d.nc")
+    shutil.copy(os.path.join(prefix, "dataset_3d.nc"), path)
+    main(["references", path, "--directory", ""])
+
+    refs = path + ".refs.json"
+    assert os.path.exists(refs)
+
+    with patch("titiler.xarray.io.dataset_cache", DatasetCache(maxsize=0)):
+        ds = fs_open_dataset(path, references=refs)
+        expected = fs_open_dataset(os.path.join(prefix, "dataset_3d.nc"))
+        numpy.testing.assert_array_equal(
+            ds["dataset"][0, :10, :10].values, expected["dataset"][0, :10, :10].values
+        )
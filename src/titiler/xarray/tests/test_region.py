@@ -0,0 +1,95 @@
+"""test titiler.xarray S3 bucket region discovery."""
+
+import json
+from unittest.mock import patch
+
+import httpx
+
+from titiler.xarray.io import fs_open_dataset
+from titiler.xarray.region import BucketRegionResolver
+
+
+def _response(region=None):
+    headers = {"x-amz-bucket-region": region} if region else {}
+    return httpx.Response(200, headers=headers)
+
+
+def test_region_resolver(tmp_path):
+    """Bucket regions should be cached in memory and in the cache file."""
+    path = str(tmp_path / "regions.json")
+    resolver = BucketRegionResolver(path=path, timeout=1)
+
+    with patch("titiler.xarray.region.httpx.head") as head:
+        head.return_value = _response("us-west-2")
+        assert resolver.resolve("mybucket") == "us-west-2"
+        assert resolver.resolve("mybucket") == "us-west-2"
+        head.assert_called_once_with("https://mybucket.s3.amazonaws.com", timeout=1)
+
+    with open(path) as f:
+        assert json.load(f) == {"mybucket": "us-west-2"}
+
+    # regions are shared through the cache file
+    resolver = BucketRegionResolver(path=path)
+    with patch("titiler.xarray.region.httpx.head") as head:
+        assert resolver.resolve("mybucket") == "us-west-2"
+        assert not head.called
+
+
+def test_region_resolver_merge(tmp_path):
+    """Regions saved by other processes should not be overwritten."""
+    path = str(tmp_path / "regions.json")
+    resolver_a = BucketRegionResolver(path=path)
+    resolver_b = BucketRegionResolver(path=path)
+
+    with patch("titiler.xarray.region.httpx.head") as head:
+        head.return_value = _response("us-west-2")
+        assert resolver_a.resolve("bucket-a") == "us-west-2"
+
+        # resolver_b loaded the file before resolver_a saved `bucket-b`
+        head.return_value = _response("eu-central-1")
+        assert resolver_b.resolve("bucket-b") == "eu-central-1"
+
+        head.return_value = _response("ap-south-1")
+        assert resolver_a.resolve("bucket-c") == "ap-south-1"
+
+    with open(path) as f:
+        assert json.load(f) == {
+            "bucket-a": "us-west-2",
+            "bucket-b": "eu-central-1",
+            "bucket-c": "ap-south-1",
+        }
+
+
+def test_region_resolver_failures():
+    """Failed lookups should be cached for `negative_ttl` seconds."""
+    resolver = BucketRegionResolver(negative_ttl=300)
+
+    with patch("titiler.xarray.region.httpx.head") as head:
+        head.side_effect = httpx.ConnectTimeout("timeout")
+        assert resolver.resolve("mybucket") is None
+        assert resolver.resolve("mybucket") is None
+        assert head.call_count == 1
+
+        head.side_effect = None
+        head.return_value = _response()
+        resolver.negative_ttl = 0
+        assert resolver.resolve("mybucket") is None
+        assert head.call_count == 2
+
+        head.return_value = _response("eu-central-1")
+        assert resolver.resolve("mybucket") == "eu-central-1"
+
+
+def test_fs_open_dataset_region():
+    """fs_open_dataset should use the resolved bucket region."""
+    with (
+        patch("titiler.xarray.io.region_resolver") as resolver,
+        patch("titiler.xarray.io.zarr.storage.FsspecStore.from_url") as from_url,
+        patch("titiler.xarray.io.xarray.open_zarr"),
+    ):
+        resolver.resolve.return_value = "us-west-2"
+        fs_open_dataset("s3://mybucket/dataset.zarr", anon=True)
+        resolver.resolve.assert_called_once_with("mybucket", use_https=True)
+        storage_options = from_url.call_args.kwargs["storage_options"]
+        assert storage_options["client_kwargs"] == {"region_name": "us-west-2"}
+        assert storage_options["anon"]
@@ -0,0 +1,39 @@
+"""test titiler.xarray point time series."""
+
+import os
+
+import numpy
+
+from titiler.xarray.chunks import ChunkCache
+from titiler.xarray.io import Reader
+from titiler.xarray.timeseries import group_points, point_timeseries
+
+prefix = os.path.join(os.path.dirname(__file__), "fixtures")
+dataset_3d_zarr = os.path.join(prefix, "dataset_3d.zarr")
+
+
+def test_point_timeseries():
+    """Points should be grouped by chunk and each chunk read once."""
+    with Reader(dataset_3d_zarr, variable="dataset") as src:
+        da = src.input
+        # chunks of 250 rows x 500 columns
+        groups = group_points(
+            da, numpy.array([10, 20, 260, 10]), numpy.array([10, 400, 10, 600])
+        )
+        assert list(groups.values()) == [[0, 1], [2], [3]]
+
+        points = [(-100.1, 45.5), (-100, 45.6), (10, 10), (-170, -80), (500, 10)]
+        cache = ChunkCache(maxbytes=100 * 1024 * 1024)
+        results = {
+            ts["index"]: ts["values"]
+            for ts in point_timeseries(da, points, threads=2, cache=cache)
+        }
+        assert sorted(results) == [0, 1, 2, 3, 4]
+        assert results[4] == [None, None]
+
+        # 3 spatial chunks x 2 time chunks
+        assert cache.misses == 6
+        assert len(cache) == 6
+
+        for idx, (lon, lat) in enumerate(points[:4]):
+            assert results[idx] == src.point(lon, lat).array.tolist()
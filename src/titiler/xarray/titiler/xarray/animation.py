@@ -0,0 +1,135 @@
+"""titiler.xarray animations."""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from io import BytesIO
+from types import DynamicClassAttribute
+from typing import Callable, Iterator, List, Sequence
+
+from rio_tiler.io.xarray import MAX_ARRAY_SIZE
+from rio_tiler.models import ImageData
+
+from titiler.core.resources.enums import MediaType
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: nocover
+    Image = None  # type: ignore
+
+XARRAY_ANIMATION_MAX_FRAMES = int(os.getenv("TITILER_XARRAY_ANIMATION_MAX_FRAMES", 366))
+XARRAY_ANIMATION_THREADS = int(os.getenv("TITILER_XARRAY_ANIMATION_THREADS", 8))
+# Maximum size (in bytes) of the frames array (`frames x tilesize x tilesize x itemsize`)
+XARRAY_ANIMATION_MAX_BYTES = int(
+    os.getenv("TITILER_XARRAY_ANIMATION_MAX_BYTES", MAX_ARRAY_SIZE)
+)
+
+
+class AnimationType(str, Enum):
+    """Available animation output type."""
+
+    webp = "webp"
+    gif = "gif"
+    npy = "npy"
+    multipart = "multipart"
+
+    @DynamicClassAttribute
+    def mediatype(self):
+        """Return animation media type."""
+        if self._name_ == "multipart":
+            return "multipart/mixed"
+
+        return MediaType[self._name_].value
+
+
+def split_frames(image: ImageData) -> List[ImageData]:
+    """Split a multi-band image (one band per step) in single band frames."""
+    statistics = image.dataset_statistics
+    return [
+        ImageData(
+            image.array[idx : idx + 1],
+            assets=image.assets,
+            bounds=image.bounds,
+            crs=image.crs,
+            metadata=image.metadata,
+            band_names=[name],
+            dataset_statistics=[statistics[idx]]
+            if statistics and len(statistics) == image.count
+            else statistics,
+        )
+        for idx, name in enumerate(image.band_names)
+    ]
+
+
+def render_frames(
+    frames: Sequence[ImageData],
+    render: Callable[[ImageData], bytes],
+    threads: int = XARRAY_ANIMATION_THREADS,
+) -> Iterator[bytes]:
+    """Render frames concurrently, yielding them in order."""
+    if threads <= 1 or len(frames) <= 1:
+        yield from map(render, frames)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=min(threads, len(frames)))
+    try:
+        yield from executor.map(render, frames)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def encode_animation(
+    frames: Sequence[bytes],
+    output_format: AnimationType,
+    duration: int = 100,
+    loop: int = 0,
+) -> bytes:
+    """Encode rendered (e.g PNG) frames as an animated WEBP or GIF."""
+    assert Image is not None, "'pillow' must be installed to create animations"
+
+    images = [Image.open(BytesIO(frame)).convert("RGBA") for frame in frames]
+
+    options = {}
+    if output_format == AnimationType.gif:
+        # clear each frame before drawing the next one (keeps transparency)
+        options["disposal"] = 2
+    else:
+        options["lossless"] = True
+
+    with BytesIO() as buf:
+        images[0].save(
+            buf,
+            format=output_format.value.upper(),
+            save_all=True,
+            append_images=images[1:],
+            duration=duration,
+            loop=loop,
+            **options,
+        )
+        return buf.getvalue()
+
+
+def multipart_stream(
+    frames: Iterator[bytes],
+    names: Sequence[str],
+    media_type: str,
+    boundary: str,
+) -> Iterator[bytes]:
+    """Stream rendered frames as `multipart/mixed` parts, named after the frame step."""
+    for name, content in zip(names, frames):
+        yield (
+            f"--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f'Content-Disposition: inline; name="{name}"\r\n'
+            f"Content-Length: {len(content)}\r\n\r\n"
+        ).encode()
+        yield content
+        yield b"\r\n"
+
+    yield f"--{boundary}--\r\n".encode()
+
+
+def multipart_boundary() -> str:
+    """Random multipart boundary."""
+    return uuid.uuid4().hex
@@ -0,0 +1,299 @@
+"""titiler.xarray opened datasets cache."""
+
+import datetime
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import attr
+import xarray
+from typing_extensions import TypedDict
+
+from titiler.xarray.chunks import ChunkCache, chunk_cache, dataset_stores
+
+XARRAY_DATASET_CACHE_SIZE = int(os.getenv("TITILER_XARRAY_DATASET_CACHE_SIZE", 64))
+XARRAY_DATASET_CACHE_MAXBYTES = int(
+    os.getenv("TITILER_XARRAY_DATASET_CACHE_MAXBYTES", 512 * 1024 * 1024)
+)
+XARRAY_DATASET_CACHE_TTL = int(os.getenv("TITILER_XARRAY_DATASET_CACHE_TTL", 300))
+
+# `version()` returns a token identifying the dataset metadata (e.g the
+# consolidated metadata ETag), or `None` when it can't be retrieved.
+DatasetVersion = Callable[[], Optional[str]]
+
+# `open()` returns the opened dataset and its `version` function.
+DatasetLoader = Callable[[], Tuple[xarray.Dataset, DatasetVersion]]
+
+# Dataset encoding key holding the metadata version
+VERSION_ENCODING = "titiler_version"
+
+
+class DatasetCacheEntry(TypedDict):
+    """Dataset cache entry stats."""
+
+    src_path: str
+    key: str
+    version: Optional[str]
+    nbytes: int
+    hits: int
+    opened: str
+    last_access: str
+    last_checked: str
+
+
+class DatasetCacheInfo(TypedDict):
+    """Dataset cache stats."""
+
+    maxsize: int
+    maxbytes: int
+    ttl: float
+    nbytes: int
+    datasets: List[DatasetCacheEntry]
+
+
+def dataset_version(ds: xarray.Dataset) -> Optional[str]:
+    """Metadata version of a dataset opened through a `DatasetCache`, `None` if unknown."""
+    return ds.encoding.get(VERSION_ENCODING)
+
+
+def cache_key(*args: Any, **kwargs: Any) -> Hashable:
+    """Create a hashable key from opener arguments."""
+    return (repr(args), repr(sorted(kwargs.items())))
+
+
+def dataset_nbytes(ds: xarray.Dataset) -> int:
+    """Size of the in-memory variables (e.g coordinates and indexes) of a dataset."""
+    return sum(var.nbytes for var in ds.variables.values() if var._in_memory)
+
+
+def _isoformat(ts: float) -> str:
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).isoformat()
+
+
+@attr.s
+class CachedDataset:
+    """Dataset cache entry."""
+
+    dataset: xarray.Dataset = attr.ib()
+    src_path: str = attr.ib()
+    key: Hashable = attr.ib()
+    version: Optional[str] = attr.ib()
+    get_version: DatasetVersion = attr.ib()
+    nbytes: int = attr.ib()
+    checked: float = attr.ib()
+    opened: float = attr.ib(factory=time.time)
+    last_access: float = attr.ib(factory=time.time)
+    hits: int = attr.ib(default=0)
+
+    def stats(self) -> DatasetCacheEntry:
+        """Entry stats."""
+        return {
+            "src_path": self.src_path,
+            "key": repr(self.key),
+            "version": self.version,
+            "nbytes": self.nbytes,
+            "hits": self.hits,
+            "opened": _isoformat(self.opened),
+            "last_access": _isoformat(self.last_access),
+            "last_checked": _isoformat(time.time() - (time.monotonic() - self.checked)),
+        }
+
+
+class DatasetCache:
+    """Process-wide cache of opened Xarray datasets.
+
+    Entries are returned as-is for `ttl` seconds, then revalidated against
+    the dataset metadata version (e.g Zarr consolidated metadata ETag) and
+    re-opened when it changed. The least recently used entries are evicted
+    to keep at most `maxsize` datasets and their in-memory variables under
+    `maxbytes`.
+
+    Callers get a shallow copy of the cached dataset: closing it doesn't close
+    the cached one. Evicted datasets are not closed either, their files are
+    released once the last copy is garbage collected.
+
+    When a dataset changed (or is explicitly evicted), the decoded chunks of
+    its Zarr stores are removed from `chunk_cache`.
+
+    The metadata version of returned datasets is available with `dataset_version`.
+
+    Args:
+        maxsize (int): Maximum number of datasets. A `maxsize` of 0 disables the cache.
+        maxbytes (int): Memory budget (size of the datasets in-memory variables).
+        ttl (int): Time (in seconds) after which an entry is revalidated.
+        chunk_cache (titiler.xarray.chunks.ChunkCache, optional): Decoded chunks cache to invalidate.
+
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 64,
+        maxbytes: int = 512 * 1024 * 1024,
+        ttl: float = 300,
+        chunk_cache: Optional[ChunkCache] = None,
+    ):
+        """Create the cache."""
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.chunk_cache = chunk_cache
+        self.nbytes = 0
+        self._data: "OrderedDict[Hashable, CachedDataset]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of entries."""
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check if a key is in the cache."""
+        return key in self._data
+
+    def _hit(self, entry: CachedDataset) -> xarray.Dataset:
+        with self._lock:
+            entry.hits += 1
+            entry.last_access = time.time()
+
+        return entry.dataset.copy()
+
+    def _invalidate(self, entries: List[CachedDataset]):
+        """Remove the decoded chunks of datasets which changed."""
+        if self.chunk_cache is None or not entries:
+            return
+
+        stores = set()
+        for entry in entries:
+            stores |= dataset_stores(entry.dataset)
+
+        self.chunk_cache.evict(stores)
+
+    def get(self, key: Hashable, src_path: str, open: DatasetLoader) -> xarray.Dataset:
+        """Get a dataset, opening or revalidating it when needed."""
+        if self.maxsize <= 0:
+            ds, get_version = open()
+            ds.encoding[VERSION_ENCODING] = _safe_version(get_version)
+            return ds
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+
+        now = time.monotonic()
+        if entry is not None and now - entry.checked < self.ttl:
+            return self._hit(entry)
+
+        if entry is not None:
+            version = _safe_version(entry.get_version)
+            if version is not None and version == entry.version:
+                entry.checked = now
+                return self._hit(entry)
+
+            self._invalidate([entry])
+
+        ds, get_version = open()
+        version = _safe_version(get_version)
+        ds.encoding[VERSION_ENCODING] = version
+        entry = CachedDataset(
+            dataset=ds,
+            src_path=src_path,
+            key=key,
+            version=version,
+            get_version=get_version,
+            nbytes=dataset_nbytes(ds),
+            checked=now,
+        )
+        self.set(key, entry)
+        return ds.copy()
+
+    def set(self, key: Hashable, entry: CachedDataset):
+        """Add an entry, evicting the least recently used ones."""
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+
+            if entry.nbytes > self.maxbytes:
+                return
+
+            self._data[key] = entry
+            self.nbytes += entry.nbytes
+            while len(self._data) > self.maxsize or self.nbytes > self.maxbytes:
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def pop(self, key: Hashable):
+        """Remove an entry."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry.nbytes
+
+    def evict(self, src_path: Optional[str] = None) -> int:
+        """Remove the entries of a dataset (all entries by default).
+
+        Returns the number of evicted entries.
+
+        """
+        with self._lock:
+            entries = [
+                entry
+                for entry in self._data.values()
+                if src_path is None or entry.src_path == src_path
+            ]
+            for entry in entries:
+                self.nbytes -= self._data.pop(entry.key).nbytes
+
+        self._invalidate(entries)
+        return len(entries)
+
+    def clear(self):
+        """Empty the cache."""
+        self.evict()
+
+    def stats(self) -> DatasetCacheInfo:
+        """Cache and entries stats (least recently used first)."""
+        with self._lock:
+            entries = list(self._data.values())
+            nbytes = self.nbytes
+
+        return {
+            "maxsize": self.maxsize,
+            "maxbytes": self.maxbytes,
+            "ttl": self.ttl,
+            "nbytes": nbytes,
+            "datasets": [entry.stats() for entry in entries],
+        }
+
+
+def _safe_version(get_version: DatasetVersion) -> Optional[str]:
+    """Get the dataset version, `None` if it can't be retrieved."""
+    try:
+        return get_version()
+    except Exception:  # noqa
+        return None
+
+
+def info_version(info: Dict) -> Optional[str]:
+    """Create a version token from object metadata (obstore `head` or fsspec `info`)."""
+    etag = info.get("e_tag") or info.get("ETag") or info.get("etag")
+    if etag:
+        return str(etag)
+
+    modified = (
+        info.get("last_modified") or info.get("LastModified") or info.get("mtime")
+    )
+    if modified is None:
+        return None
+
+    return f"{modified}-{info.get('size')}"
+
+
+dataset_cache = DatasetCache(
+    maxsize=XARRAY_DATASET_CACHE_SIZE,
+    maxbytes=XARRAY_DATASET_CACHE_MAXBYTES,
+    ttl=XARRAY_DATASET_CACHE_TTL,
+    chunk_cache=chunk_cache,
+)
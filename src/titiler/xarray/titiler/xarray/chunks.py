@@ -0,0 +1,407 @@
+"""titiler.xarray chunk-aligned Zarr reads."""
+
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent import futures
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import numpy
+import xarray
+import zarr
+from typing_extensions import TypedDict
+from xarray.backends.zarr import ZarrArrayWrapper
+from xarray.coding.common import _ElementwiseFunctionArray
+from xarray.core.indexing import CopyOnWriteArray, LazilyIndexedArray, MemoryCachedArray
+from zarr.core.chunk_grids import RegularChunkGrid
+from zarr.core.indexing import OrthogonalIndexer
+
+XARRAY_CHUNK_THREADS = int(os.getenv("TITILER_XARRAY_CHUNK_THREADS", 8))
+XARRAY_CHUNK_CACHE_MAXBYTES = int(
+    os.getenv("TITILER_XARRAY_CHUNK_CACHE_MAXBYTES", 256 * 1024 * 1024)
+)
+XARRAY_CHUNK_CACHE_TTL = int(os.getenv("TITILER_XARRAY_CHUNK_CACHE_TTL", 300))
+
+
+class ZarrSource(NamedTuple):
+    """Zarr array and selection backing a lazy DataArray."""
+
+    array: zarr.Array
+    selection: Tuple[Any, ...]
+    # CF decoding functions (e.g scale/offset, masking) applied by xarray
+    decoders: List[Callable[[numpy.ndarray], numpy.ndarray]]
+    dtype: numpy.dtype
+
+
+class ChunkRead(NamedTuple):
+    """Chunk to read and where its values go in the output array."""
+
+    chunk_coords: Tuple[int, ...]
+    chunk_selection: Tuple[Any, ...]
+    out_selection: Tuple[Any, ...]
+
+
+class ChunkCacheInfo(TypedDict):
+    """Decoded chunks cache stats."""
+
+    maxbytes: int
+    ttl: Optional[float]
+    nbytes: int
+    chunks: int
+    hits: int
+    misses: int
+
+
+class ChunkCache:
+    """Process-wide cache of decoded Zarr chunks.
+
+    Chunks are keyed by store, array path and chunk index, and shared by all
+    readers (e.g neighbouring tiles or time steps within the same chunk). The
+    least recently used chunks are evicted to keep the decoded arrays under
+    `maxbytes`, and chunks expire after `ttl` seconds so updated stores are
+    eventually read again. The opened datasets cache also evicts the chunks of
+    a store when its metadata changed (see `titiler.xarray.cache.DatasetCache`).
+
+    Args:
+        maxbytes (int): Memory budget (size of the decoded chunks). A `maxbytes` of 0 disables the cache.
+        ttl (int, optional): Time (in seconds) after which a chunk expires.
+
+    """
+
+    def __init__(self, maxbytes: int = 256 * 1024 * 1024, ttl: Optional[float] = 300):
+        """Create the cache."""
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, numpy.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of chunks."""
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[numpy.ndarray]:
+        """Get a chunk and mark it as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, chunk = entry
+                if not expires or expires >= time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return chunk
+
+                del self._data[key]
+                self.nbytes -= chunk.nbytes
+
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, chunk: numpy.ndarray):
+        """Add a chunk, evicting the least recently used ones."""
+        if chunk.nbytes > self.maxbytes:
+            return
+
+        # chunks are shared between readers
+        chunk.setflags(write=False)
+
+        expires = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1].nbytes
+
+            self._data[key] = (expires, chunk)
+            self.nbytes += chunk.nbytes
+            while self.nbytes > self.maxbytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def evict(self, stores: Iterable[str]) -> int:
+        """Remove the chunks of Zarr stores (see `chunk_key`).
+
+        Returns the number of evicted chunks.
+
+        """
+        stores = set(stores)
+        with self._lock:
+            keys = [key for key in self._data if key[0] in stores]  # type: ignore
+            for key in keys:
+                self.nbytes -= self._data.pop(key)[1].nbytes
+
+        return len(keys)
+
+    def clear(self):
+        """Empty the cache."""
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def stats(self) -> ChunkCacheInfo:
+        """Cache stats."""
+        with self._lock:
+            return {
+                "maxbytes": self.maxbytes,
+                "ttl": self.ttl,
+                "nbytes": self.nbytes,
+                "chunks": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+chunk_cache = ChunkCache(
+    maxbytes=XARRAY_CHUNK_CACHE_MAXBYTES, ttl=XARRAY_CHUNK_CACHE_TTL
+)
+
+
+def zarr_source(da: xarray.DataArray) -> Optional[ZarrSource]:
+    """Find the Zarr array and selection of a (lazily indexed) DataArray.
+
+    Returns `None` for in-memory, dask, transposed or vectorized indexed
+    arrays and for non-Zarr backends (e.g NetCDF).
+
+    """
+    variable = da.variable
+    if variable._in_memory:
+        return None
+
+    data = variable._data
+    decoders: List[Callable] = []
+    while True:
+        if isinstance(data, (MemoryCachedArray, CopyOnWriteArray)):
+            data = data.array
+
+        elif isinstance(data, _ElementwiseFunctionArray):
+            decoders.append(data.func)
+            data = data.array
+
+        elif isinstance(data, LazilyIndexedArray) and isinstance(
+            data.array, ZarrArrayWrapper
+        ):
+            return ZarrSource(
+                array=data.array.get_array(),
+                selection=data.key.tuple,
+                decoders=decoders[::-1],
+                dtype=da.dtype,
+            )
+
+        else:
+            return None
+
+
+def dataset_stores(ds: xarray.Dataset) -> Set[str]:
+    """Zarr stores (as used in `chunk_key`) backing the variables of a dataset."""
+    return {
+        str(source.array.store)
+        for da in ds.data_vars.values()
+        if (source := zarr_source(da)) is not None
+    }
+
+
+def contiguous_slices(
+    indices: numpy.ndarray, max_runs: int = 2
+) -> Optional[List[slice]]:
+    """Split integer positions into runs of consecutive positions.
+
+    Returns `None` if the positions are not made of at most `max_runs` runs.
+
+    """
+    if indices.ndim != 1 or not indices.size or indices.dtype.kind not in "iu":
+        return None
+
+    breaks = numpy.flatnonzero(numpy.diff(indices) != 1) + 1
+    if len(breaks) >= max_runs:
+        return None
+
+    bounds = [0, *breaks.tolist(), indices.size]
+    return [
+        slice(int(indices[start]), int(indices[stop - 1]) + 1)
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def _split_selection(
+    selection: Tuple[Any, ...],
+) -> Optional[List[Tuple[Tuple[int, ...], Tuple[Any, ...]]]]:
+    """Split an orthogonal selection into basic (slice) selections.
+
+    Integer array selections made of a few runs of consecutive positions
+    (e.g longitudes wrapped around the antimeridian) are replaced by one slice
+    per run. Returns the output offsets (of the non-dropped dimensions) and the
+    selection of each part, or `None` if the selection can't be split.
+
+    """
+    if not any(isinstance(sel, numpy.ndarray) for sel in selection):
+        return None
+
+    parts: List[List[Tuple[Optional[int], Any]]] = []
+    for sel in selection:
+        if isinstance(sel, (int, numpy.integer)):
+            parts.append([(None, sel)])
+
+        elif isinstance(sel, numpy.ndarray):
+            slices = contiguous_slices(sel)
+            if slices is None:
+                return None
+
+            offsets = numpy.cumsum([0] + [s.stop - s.start for s in slices[:-1]])
+            parts.append(list(zip(offsets.tolist(), slices)))
+
+        else:
+            parts.append([(0, sel)])
+
+    return [
+        (
+            tuple(offset for offset, _ in part if offset is not None),
+            tuple(sel for _, sel in part),
+        )
+        for part in itertools.product(*parts)
+    ]
+
+
+def _shift(out_selection: Tuple[Any, ...], offsets: Tuple[int, ...]):
+    """Shift the output slices of a chunk read."""
+    return tuple(
+        slice(sel.start + offset, sel.stop + offset) if offset else sel
+        for sel, offset in zip(out_selection, offsets)
+    )
+
+
+def plan_chunks(
+    array: zarr.Array, selection: Tuple[Any, ...]
+) -> Tuple[Tuple[int, ...], List[ChunkRead]]:
+    """List the chunks of `array` needed to read an orthogonal selection.
+
+    Returns the output shape and, for each chunk, the part of the chunk to
+    read and where to put it in the output array.
+
+    """
+    grid = RegularChunkGrid(chunk_shape=array.chunks)
+    parts = _split_selection(selection)
+    if parts is None:
+        indexer = OrthogonalIndexer(selection, array.shape, grid)
+        reads = [
+            ChunkRead(
+                chunk_coords=chunk_coords,
+                chunk_selection=chunk_selection,
+                out_selection=out_selection,
+            )
+            for chunk_coords, chunk_selection, out_selection, _ in indexer
+        ]
+        return indexer.shape, reads
+
+    shape = OrthogonalIndexer(selection, array.shape, grid).shape
+    reads = []
+    for offsets, part in parts:
+        reads.extend(
+            ChunkRead(
+                chunk_coords=chunk_coords,
+                chunk_selection=chunk_selection,
+                out_selection=_shift(out_selection, offsets),
+            )
+            for chunk_coords, chunk_selection, out_selection, _ in OrthogonalIndexer(
+                part, array.shape, grid
+            )
+        )
+
+    return shape, reads
+
+
+def chunk_slices(array: zarr.Array, chunk_coords: Tuple[int, ...]) -> Tuple[slice, ...]:
+    """Array slices of a chunk."""
+    return tuple(
+        slice(c * size, min((c + 1) * size, length))
+        for c, size, length in zip(chunk_coords, array.chunks, array.shape)
+    )
+
+
+def chunk_key(array: zarr.Array, chunk_coords: Tuple[int, ...]) -> Hashable:
+    """Chunk cache key (store, array path and chunk index)."""
+    return (str(array.store), array.path, chunk_coords)
+
+
+def read_chunk(
+    array: zarr.Array,
+    chunk_coords: Tuple[int, ...],
+    cache: Optional[ChunkCache] = None,
+) -> numpy.ndarray:
+    """Read and decode a full chunk, using the decoded chunks cache."""
+    if cache is None or cache.maxbytes <= 0:
+        return array.get_basic_selection(chunk_slices(array, chunk_coords))
+
+    key = chunk_key(array, chunk_coords)
+    chunk = cache.get(key)
+    if chunk is None:
+        chunk = array.get_basic_selection(chunk_slices(array, chunk_coords))
+        cache.set(key, chunk)
+
+    return chunk
+
+
+def read_zarr_selection(
+    array: zarr.Array,
+    selection: Tuple[Any, ...],
+    threads: int = XARRAY_CHUNK_THREADS,
+    cache: Optional[ChunkCache] = chunk_cache,
+) -> numpy.ndarray:
+    """Read an orthogonal selection of a Zarr array, chunk by chunk in parallel.
+
+    Each chunk is fetched (through the array's store) and decoded once, by
+    up to `threads` concurrent workers, unless it is already in `cache`.
+
+    """
+    shape, reads = plan_chunks(array, selection)
+    out = numpy.empty(shape, dtype=array.dtype)
+
+    def _read(read: ChunkRead):
+        chunk = read_chunk(array, read.chunk_coords, cache=cache)
+        out[read.out_selection] = chunk[read.chunk_selection]
+
+    if threads > 1 and len(reads) > 1:
+        with futures.ThreadPoolExecutor(
+            max_workers=min(threads, len(reads))
+        ) as executor:
+            list(executor.map(_read, reads))
+    else:
+        for read in reads:
+            _read(read)
+
+    return out
+
+
+def load_dataarray(
+    da: xarray.DataArray,
+    threads: int = XARRAY_CHUNK_THREADS,
+    cache: Optional[ChunkCache] = chunk_cache,
+) -> xarray.DataArray:
+    """Load a Zarr backed DataArray with chunk-aligned parallel reads.
+
+    Falls back to xarray loading for arrays not directly backed by Zarr.
+
+    """
+    source = zarr_source(da)
+    if source is None or threads < 1:
+        return da.load()
+
+    data = read_zarr_selection(
+        source.array, source.selection, threads=threads, cache=cache
+    )
+    for decode in source.decoders:
+        data = decode(data)
+
+    return da.copy(data=numpy.asarray(data, dtype=source.dtype))
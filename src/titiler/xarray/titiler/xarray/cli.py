@@ -0,0 +1,90 @@
+"""titiler.xarray command line interface.
+
+$ titiler-xarray references s3://bucket/data.nc --storage-option anon=true
+
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+from titiler.xarray.references import (
+    XARRAY_REFERENCES_DIR,
+    generate_references,
+    references_path,
+)
+
+
+def _storage_options(options: List[str]) -> Dict:
+    """Parse `key=value` storage options (values are decoded as JSON when possible)."""
+    parsed = {}
+    for option in options:
+        key, value = option.split("=", 1)
+        try:
+            parsed[key] = json.loads(value)
+        except json.JSONDecodeError:
+            parsed[key] = value
+
+    return parsed
+
+
+def references(args: argparse.Namespace):
+    """Generate the virtual references of NetCDF/HDF5 files."""
+    if args.output and len(args.src_paths) > 1:
+        raise SystemExit("--output can't be used with multiple files")
+
+    storage_options = _storage_options(args.storage_option)
+    for src_path in args.src_paths:
+        path = generate_references(
+            src_path,
+            output=args.output
+            or references_path(src_path, args.format, directory=args.directory),
+            format=args.format,
+            inline_threshold=args.inline_threshold,
+            storage_options=storage_options,
+        )
+        print(path)
+
+
+def main(argv: Optional[List[str]] = None):
+    """titiler-xarray CLI."""
+    parser = argparse.ArgumentParser(prog="titiler-xarray")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser(
+        "references",
+        help="Generate virtual references (kerchunk) of NetCDF/HDF5 files.",
+        description="Generate virtual references (kerchunk) of NetCDF/HDF5 files, "
+        "written next to each file (`{file}.refs.{format}`) or in `--directory`.",
+    )
+    cmd.add_argument("src_paths", nargs="+", metavar="SRC_PATH", help="Dataset path.")
+    cmd.add_argument("-o", "--output", help="References path (single file).")
+    cmd.add_argument(
+        "-d",
+        "--directory",
+        default=XARRAY_REFERENCES_DIR,
+        help="References directory. Defaults to `TITILER_XARRAY_REFERENCES_DIR`.",
+    )
+    cmd.add_argument("-f", "--format", choices=["json", "parquet"], default="json")
+    cmd.add_argument(
+        "--inline-threshold",
+        type=int,
+        default=500,
+        help="Store chunks smaller than this size (in bytes) in the references.",
+    )
+    cmd.add_argument(
+        "--storage-option",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Filesystem option (e.g `anon=true`).",
+    )
+    cmd.set_defaults(func=references)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
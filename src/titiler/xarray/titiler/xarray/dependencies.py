@@ -1,7 +1,7 @@
 """titiler.xarray dependencies."""
 
 from dataclasses import dataclass
-from typing import Annotated, List, Optional, Union
+from typing import Annotated, List, Optional, Tuple, Union
 
 import numpy
 from fastapi import Query
@@ -40,6 +40,14 @@ SelDimStr = Annotated[
 ]
 
 
+PointStr = Annotated[
+    str,
+    StringConstraints(
+        pattern=r"^[-+]?\d+(\.\d*)?([eE][-+]?\d+)?,[-+]?\d+(\.\d*)?([eE][-+]?\d+)?$"
+    ),
+]
+
+
 @dataclass
 class XarrayDsParams(DefaultDependency):
     """Xarray Dataset Options."""
@@ -49,7 +57,7 @@ class XarrayDsParams(DefaultDependency):
     sel: Annotated[
         Optional[List[SelDimStr]],
         Query(
-            description="Xarray Indexing using dimension names `{dimension}={value}` or `{dimension}={method}::{value}`.",
+            description="Xarray Indexing using dimension names `{dimension}={value}`, `{dimension}={method}::{value}` or `{dimension}={start}/{end}` (datetime and numeric dimensions).",
         ),
     ] = None
 
@@ -77,11 +85,28 @@ class CompatXarrayParams(XarrayIOParams):
     sel: Annotated[
         Optional[List[SelDimStr]],
         Query(
-            description="Xarray Indexing using dimension names `{dimension}={value}` or `{dimension}={method}::{value}`.",
+            description="Xarray Indexing using dimension names `{dimension}={value}`, `{dimension}={method}::{value}` or `{dimension}={start}/{end}` (datetime and numeric dimensions).",
         ),
     ] = None
 
 
+def PointsParams(
+    points: Annotated[
+        List[PointStr],
+        Query(
+            alias="point",
+            description="Point coordinates `{lon},{lat}` (in `coord_crs`).",
+            openapi_examples={
+                "one-point": {"value": ["-10.5,45.2"]},
+                "multi-points": {"value": ["-10.5,45.2", "12,50.1"]},
+            },
+        ),
+    ],
+) -> List[Tuple[float, float]]:
+    """Points coordinates."""
+    return [(float(x), float(y)) for x, y in (p.split(",") for p in points)]
+
+
 @dataclass
 class DatasetParams(DefaultDependency):
     """Low level WarpedVRT Optional parameters."""
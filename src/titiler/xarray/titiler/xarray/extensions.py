@@ -13,6 +13,8 @@ from typing_extensions import TypedDict
 from titiler.core.dependencies import DefaultDependency
 from titiler.core.factory import FactoryExtension
 from titiler.core.resources.enums import MediaType
+from titiler.xarray.cache import DatasetCache, DatasetCacheInfo, dataset_cache
+from titiler.xarray.chunks import ChunkCache, ChunkCacheInfo, chunk_cache
 from titiler.xarray.dependencies import XarrayIOParams
 from titiler.xarray.factory import TilerFactory
 from titiler.xarray.io import X_DIM_NAMES, Y_DIM_NAMES, open_zarr
@@ -226,3 +228,62 @@ class ValidateExtension(FactoryExtension):
             with self.dataset_opener(src_path, **io_params.as_dict()) as dst:
                 variables = variables or list(dst.data_vars)
                 return {v: self._validate_variable(dst[v]) for v in variables}
+
+
+class EvictedDatasets(TypedDict):
+    """Evicted datasets model."""
+
+    evicted: int
+
+
+@define
+class DatasetCacheExtension(FactoryExtension):
+    """Add admin endpoints to inspect and evict the opened datasets and decoded chunks caches."""
+
+    cache: DatasetCache = dataset_cache
+    chunk_cache: ChunkCache = chunk_cache
+
+    def register(self, factory: TilerFactory):
+        """Register endpoints to the tiler factory."""
+
+        @factory.router.get(
+            "/cache/datasets",
+            response_model=DatasetCacheInfo,
+            responses={200: {"description": "Return the opened datasets cache stats."}},
+        )
+        def dataset_cache_stats():
+            """Return the opened datasets cache stats."""
+            return self.cache.stats()
+
+        @factory.router.delete(
+            "/cache/datasets",
+            response_model=EvictedDatasets,
+            responses={200: {"description": "Evict datasets from the cache."}},
+        )
+        def dataset_cache_evict(
+            url: Annotated[
+                Optional[str],
+                Query(description="Dataset URL. Evict all datasets if not set."),
+            ] = None,
+        ):
+            """Evict datasets from the cache."""
+            return {"evicted": self.cache.evict(url)}
+
+        @factory.router.get(
+            "/cache/chunks",
+            response_model=ChunkCacheInfo,
+            responses={200: {"description": "Return the decoded chunks cache stats."}},
+        )
+        def chunk_cache_stats():
+            """Return the decoded chunks cache stats."""
+            return self.chunk_cache.stats()
+
+        @factory.router.delete(
+            "/cache/chunks",
+            response_model=ChunkCacheInfo,
+            responses={200: {"description": "Empty the decoded chunks cache."}},
+        )
+        def chunk_cache_clear():
+            """Empty the decoded chunks cache."""
+            self.chunk_cache.clear()
+            return self.chunk_cache.stats()
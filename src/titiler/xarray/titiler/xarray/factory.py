@@ -2,15 +2,18 @@
 
 import logging
 import warnings
-from typing import Annotated, Any, Callable, Optional, Type, Union
+from typing import Annotated, Any, Callable, Dict, Literal, Optional, Type, Union
 
 import rasterio
 from attrs import define
-from fastapi import Body, Depends, Query
+from fastapi import Body, Depends, Path, Query
 from geojson_pydantic.features import Feature, FeatureCollection
+from pydantic import Field
 from rio_tiler.constants import WGS84_CRS
 from rio_tiler.io import XarrayReader
-from rio_tiler.models import Info
+from rio_tiler.models import ImageData, Info
+from rio_tiler.utils import CRS_to_uri
+from starlette.responses import Response, StreamingResponse
 
 from titiler.core.dependencies import (
     BidxParams,
@@ -22,17 +25,39 @@ from titiler.core.dependencies import (
     HistogramParams,
     StatisticsParams,
 )
+from titiler.core.errors import BadRequestError
 from titiler.core.factory import TilerFactory as BaseTilerFactory
 from titiler.core.models.responses import InfoGeoJSON, StatisticsGeoJSON
+from titiler.core.resources.enums import ImageType
 from titiler.core.resources.responses import GeoJSONResponse, JSONResponse
 from titiler.core.utils import bounds_to_geometry
+from titiler.xarray.animation import (
+    XARRAY_ANIMATION_MAX_BYTES,
+    XARRAY_ANIMATION_MAX_FRAMES,
+    XARRAY_ANIMATION_THREADS,
+    AnimationType,
+    encode_animation,
+    multipart_boundary,
+    multipart_stream,
+    render_frames,
+    split_frames,
+)
 from titiler.xarray.dependencies import (
     DatasetParams,
     PartFeatureParams,
+    PointsParams,
     PreviewParams,
     XarrayParams,
 )
 from titiler.xarray.io import Reader
+from titiler.xarray.timeseries import (
+    XARRAY_TIMESERIES_MAX_POINTS,
+    TimeseriesType,
+    point_timeseries,
+    steps,
+    timeseries_to_csv,
+    timeseries_to_json,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +97,16 @@ class TilerFactory(BaseTilerFactory):
     # /preview endpoints disabled by default
     add_preview: bool = False
 
+    # /animation endpoints
+    add_animation: bool = True
+    animation_max_frames: int = XARRAY_ANIMATION_MAX_FRAMES
+    animation_max_bytes: int = XARRAY_ANIMATION_MAX_BYTES
+    animation_threads: int = XARRAY_ANIMATION_THREADS
+
+    # /timeseries endpoints
+    add_timeseries: bool = True
+    timeseries_max_points: int = XARRAY_TIMESERIES_MAX_POINTS
+
     def __attrs_post_init__(self):
         """Raise warning if preview is enabled."""
         if self.add_preview:
@@ -83,6 +118,16 @@ class TilerFactory(BaseTilerFactory):
 
         super().__attrs_post_init__()
 
+    def register_routes(self):
+        """Register routes to the router."""
+        super().register_routes()
+
+        if self.add_animation:
+            self.animation()
+
+        if self.add_timeseries:
+            self.timeseries()
+
     # Custom /info endpoints (adds `show_times` options)
     def info(self):
         """Register /info endpoint."""
@@ -231,3 +276,269 @@ class TilerFactory(BaseTilerFactory):
                         feature.properties.update({"statistics": stats})
 
             return fc.features[0] if isinstance(geojson, Feature) else fc
+
+    ############################################################################
+    # /animation
+    ############################################################################
+    def animation(self):  # noqa: C901
+        """Register /animation endpoints."""
+
+        @self.router.get(
+            "/animation/{tileMatrixSetId}/{z}/{x}/{y}.{format}",
+            operation_id=f"{self.operation_prefix}getAnimation",
+            responses={
+                200: {
+                    "content": {
+                        "image/webp": {},
+                        "image/gif": {},
+                        "application/x-binary": {},
+                        "multipart/mixed": {},
+                    },
+                    "description": "Return an animation of a tile over the selected steps.",
+                }
+            },
+            response_class=Response,
+        )
+        @self.router.get(
+            "/animation/{tileMatrixSetId}/{z}/{x}/{y}@{scale}x.{format}",
+            operation_id=f"{self.operation_prefix}getAnimationWithScale",
+            responses={
+                200: {
+                    "content": {
+                        "image/webp": {},
+                        "image/gif": {},
+                        "application/x-binary": {},
+                        "multipart/mixed": {},
+                    },
+                    "description": "Return an animation of a tile over the selected steps.",
+                }
+            },
+            response_class=Response,
+        )
+        def animation(  # noqa: C901
+            z: Annotated[
+                int,
+                Path(
+                    description="Identifier (Z) selecting one of the scales defined in the TileMatrixSet and representing the scaleDenominator the tile.",
+                ),
+            ],
+            x: Annotated[
+                int,
+                Path(
+                    description="Column (X) index of the tile on the selected TileMatrix. It cannot exceed the MatrixHeight-1 for the selected TileMatrix.",
+                ),
+            ],
+            y: Annotated[
+                int,
+                Path(
+                    description="Row (Y) index of the tile on the selected TileMatrix. It cannot exceed the MatrixWidth-1 for the selected TileMatrix.",
+                ),
+            ],
+            tileMatrixSetId: Annotated[
+                Literal[tuple(self.supported_tms.list())],
+                Path(
+                    description="Identifier selecting one of the TileMatrixSetId supported."
+                ),
+            ],
+            format: Annotated[
+                AnimationType,
+                Field(
+                    description="Animated image (webp, gif), multi-band array (npy) or one part per frame (multipart)."
+                ),
+            ],
+            scale: Annotated[
+                int,
+                Field(
+                    gt=0, le=4, description="Tile size scale. 1=256x256, 2=512x512..."
+                ),
+            ] = 1,
+            duration: Annotated[
+                int,
+                Query(gt=0, description="Frame duration (in milliseconds)."),
+            ] = 100,
+            loop: Annotated[
+                int,
+                Query(ge=0, description="Number of loops (0 to loop forever)."),
+            ] = 0,
+            frame_format: Annotated[
+                Optional[ImageType],
+                Query(
+                    description="Frames format for `multipart` output. Defaults to `png`.",
+                ),
+            ] = None,
+            src_path=Depends(self.path_dependency),
+            reader_params=Depends(self.reader_dependency),
+            tile_params=Depends(self.tile_dependency),
+            layer_params=Depends(self.layer_dependency),
+            dataset_params=Depends(self.dataset_dependency),
+            post_process=Depends(self.process_dependency),
+            colormap=Depends(self.colormap_dependency),
+            render_params=Depends(self.render_params_dependency),
+            env=Depends(self.environment_dependency),
+        ):
+            """Create a tile animation over the steps selected with `sel` (e.g `sel=time=2023-01-01/2023-12-31`).
+
+            The tile is read once for all the steps (each chunk is fetched once
+            across the selected steps) and frames are rendered in parallel.
+
+            """
+            tms = self.supported_tms.get(tileMatrixSetId)
+            with rasterio.Env(**env):
+                logger.info(f"opening data with reader: {self.reader}")
+                with self.reader(
+                    src_path, tms=tms, **reader_params.as_dict()
+                ) as src_dst:
+                    count = src_dst.input.shape[0] if src_dst.input.ndim == 3 else 1
+                    if layer_params.indexes:
+                        count = len(layer_params.indexes)
+
+                    if count > self.animation_max_frames:
+                        raise BadRequestError(
+                            f"Maximum number of frames ({self.animation_max_frames}) exceeded: {count} steps selected."
+                        )
+
+                    tilesize = scale * 256
+                    nbytes = count * tilesize**2 * src_dst.input.dtype.itemsize
+                    if nbytes > self.animation_max_bytes:
+                        raise BadRequestError(
+                            f"Maximum animation size ({self.animation_max_bytes} bytes) exceeded: {count} frames of {tilesize}x{tilesize} {src_dst.input.dtype} pixels."
+                        )
+
+                    image = src_dst.tile(
+                        x,
+                        y,
+                        z,
+                        tilesize=tilesize,
+                        **tile_params.as_dict(),
+                        **layer_params.as_dict(),
+                        **dataset_params.as_dict(),
+                    )
+                    dst_colormap = getattr(src_dst, "colormap", None)
+
+            headers: Dict[str, str] = {}
+            if image.bounds is not None:
+                headers["Content-Bbox"] = ",".join(map(str, image.bounds))
+            if uri := CRS_to_uri(image.crs):
+                headers["Content-Crs"] = f"<{uri}>"
+
+            if format == AnimationType.npy:
+                if post_process:
+                    image = post_process(image)
+
+                content, media_type = self.render_func(
+                    image,
+                    output_format=ImageType.npy,
+                    **render_params.as_dict(),
+                )
+                return Response(content, media_type=media_type, headers=headers)
+
+            output_format = ImageType.png
+            if format == AnimationType.multipart and frame_format:
+                output_format = frame_format
+
+            def _render(frame: ImageData) -> bytes:
+                if post_process:
+                    frame = post_process(frame)
+
+                content, _ = self.render_func(
+                    frame,
+                    output_format=output_format,
+                    colormap=colormap or dst_colormap,
+                    **render_params.as_dict(),
+                )
+                return content
+
+            frames = split_frames(image)
+            contents = render_frames(frames, _render, threads=self.animation_threads)
+
+            if format == AnimationType.multipart:
+                boundary = multipart_boundary()
+                return StreamingResponse(
+                    multipart_stream(
+                        contents,
+                        image.band_names,
+                        output_format.mediatype,
+                        boundary,
+                    ),
+                    media_type=f"{format.mediatype}; boundary={boundary}",
+                    headers=headers,
+                )
+
+            content = encode_animation(
+                list(contents), format, duration=duration, loop=loop
+            )
+            return Response(content, media_type=format.mediatype, headers=headers)
+
+    ############################################################################
+    # /timeseries
+    ############################################################################
+    def timeseries(self):
+        """Register /timeseries endpoints."""
+
+        @self.router.get(
+            "/timeseries",
+            operation_id=f"{self.operation_prefix}getTimeseries",
+            responses={
+                200: {
+                    "content": {"application/json": {}, "text/csv": {}},
+                    "description": "Return the values of points over the time dimension.",
+                }
+            },
+            response_class=Response,
+        )
+        @self.router.get(
+            "/timeseries.{format}",
+            operation_id=f"{self.operation_prefix}getTimeseriesWithFormat",
+            responses={
+                200: {
+                    "content": {"application/json": {}, "text/csv": {}},
+                    "description": "Return the values of points over the time dimension.",
+                }
+            },
+            response_class=Response,
+        )
+        def timeseries(
+            format: Annotated[
+                TimeseriesType,
+                Field(description="Output format."),
+            ] = TimeseriesType.json,
+            points=Depends(PointsParams),
+            src_path=Depends(self.path_dependency),
+            reader_params=Depends(self.reader_dependency),
+            coord_crs=Depends(CoordCRSParams),
+            env=Depends(self.environment_dependency),
+        ):
+            """Get the values of points over the first (e.g time) dimension of a variable.
+
+            Points are grouped by chunk, each group being read once for all
+            the steps selected with `sel`. Points are streamed as they are read
+            (not in the input order), with their index in the `point` list.
+
+            """
+            if len(points) > self.timeseries_max_points:
+                raise BadRequestError(
+                    f"Maximum number of points ({self.timeseries_max_points}) exceeded: {len(points)} points."
+                )
+
+            with rasterio.Env(**env):
+                logger.info(f"opening data with reader: {self.reader}")
+                src_dst = self.reader(src_path, **reader_params.as_dict())
+
+            da = src_dst.input
+            dimension = str(da.dims[0]) if da.ndim == 3 else None
+            names = steps(da)
+
+            def _stream():
+                with rasterio.Env(**env), src_dst:
+                    values = point_timeseries(
+                        da,
+                        points,
+                        coord_crs=coord_crs or WGS84_CRS,
+                        threads=getattr(src_dst, "chunk_threads", 1),
+                    )
+                    if format == TimeseriesType.csv:
+                        yield from timeseries_to_csv(values, names)
+                    else:
+                        yield from timeseries_to_json(values, dimension, names)
+
+            return StreamingResponse(_stream(), media_type=format.mediatype)
@@ -2,36 +2,79 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import os
 import re
-from functools import cache
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Literal, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 from urllib.parse import urlparse
 
 import attr
-import httpx
+import numpy
 import obstore
 import xarray
 import zarr
 from morecantile import TileMatrixSet
-from rio_tiler.constants import WEB_MERCATOR_TMS
-from rio_tiler.io.xarray import XarrayReader
+from rasterio.crs import CRS
+from rasterio.warp import transform_bounds
+from rio_tiler.constants import WEB_MERCATOR_TMS, WGS84_CRS
+from rio_tiler.errors import MaxArraySizeError
+from rio_tiler.io.xarray import MAX_ARRAY_SIZE, XarrayReader
+from rio_tiler.models import ImageData
+from rio_tiler.types import BBox, Indexes
 from typing_extensions import TypedDict
 from zarr.storage import ObjectStore
 
+from titiler.core.cache import LRUCache
+from titiler.xarray.cache import cache_key, dataset_cache, dataset_version, info_version
+from titiler.xarray.chunks import XARRAY_CHUNK_THREADS, load_dataarray
+from titiler.xarray.pyramid import (
+    PyramidLevel,
+    find_pyramid,
+    get_multiscales,
+    is_current,
+    select_level,
+)
+from titiler.xarray.references import find_references, open_references
+from titiler.xarray.region import region_resolver
+
 X_DIM_NAMES = ["lon", "longitude", "LON", "LONGITUDE", "Lon", "Longitude"]
 Y_DIM_NAMES = ["lat", "latitude", "LAT", "LATITUDE", "Lat", "Latitude"]
 
+XARRAY_SELECTOR_CACHE_SIZE = int(os.getenv("TITILER_XARRAY_SELECTOR_CACHE_SIZE", 512))
+
 
 def _find_bucket_region(bucket: str, use_https: bool = True) -> str | None:
-    prefix = "https" if use_https else "http"
-    response = httpx.get(f"{prefix}://{bucket}.s3.amazonaws.com")
-    return response.headers.get("x-amz-bucket-region")
+    return region_resolver.resolve(bucket, use_https=use_https)
+
+
+# Zarr V3 and V2 consolidated metadata
+ZARR_METADATA_FILES = ["zarr.json", ".zmetadata"]
+
+
+def zarr_metadata_version(store: obstore.store.ObjectStore) -> Optional[str]:
+    """Get the version (ETag or last modified date) of a Zarr store metadata."""
+    for path in ZARR_METADATA_FILES:
+        try:
+            return info_version(store.head(path))  # type: ignore
+        except FileNotFoundError:
+            continue
+
+    return None
 
 
-@cache
-def open_zarr(  # noqa: C901
+def open_zarr(
     src_path: str,
     group: Optional[str] = None,
     decode_times: bool = True,
@@ -39,7 +82,10 @@ def open_zarr(  # noqa: C901
     infer_region: bool = True,
     **kwargs: Any,
 ) -> xarray.Dataset:
-    """Open Xarray dataset with fsspec.
+    """Open Xarray dataset with obstore.
+
+    Opened datasets are kept in the process-wide `titiler.xarray.cache.dataset_cache`
+    and revalidated against the Zarr consolidated metadata.
 
     Args:
         src_path (str): dataset path.
@@ -50,6 +96,38 @@ def open_zarr(  # noqa: C901
         xarray.Dataset
 
     """
+    key = cache_key(
+        "open_zarr",
+        src_path,
+        group=group,
+        decode_times=decode_times,
+        decode_coords=decode_coords,
+        infer_region=infer_region,
+        **kwargs,
+    )
+
+    def _open():
+        return _open_zarr(
+            src_path,
+            group=group,
+            decode_times=decode_times,
+            decode_coords=decode_coords,
+            infer_region=infer_region,
+            **kwargs,
+        )
+
+    return dataset_cache.get(key, src_path, _open)
+
+
+def _open_zarr(  # noqa: C901
+    src_path: str,
+    group: Optional[str] = None,
+    decode_times: bool = True,
+    decode_coords: str = "all",
+    infer_region: bool = True,
+    **kwargs: Any,
+):
+    """Open Xarray dataset with obstore, returning the dataset and its version function."""
     parsed = urlparse(src_path)
     if not parsed.scheme:
         src_path = str(Path(src_path).resolve())
@@ -103,7 +181,7 @@ def open_zarr(  # noqa: C901
     zarr_store = ObjectStore(store=store, read_only=True)
     ds = xarray.open_dataset(zarr_store, **xr_open_args)
 
-    return ds
+    return ds, lambda: zarr_metadata_version(store)
 
 
 def _arrange_dims(da: xarray.DataArray) -> xarray.DataArray:
@@ -140,6 +218,48 @@ def _arrange_dims(da: xarray.DataArray) -> xarray.DataArray:
     return da
 
 
+class LongitudeWrap(NamedTuple):
+    """-180/180 ordering of a 0-360 longitude axis."""
+
+    # positions of the longitudes, in -180/180 order
+    order: numpy.ndarray
+    # -180/180 longitudes
+    x: numpy.ndarray
+
+
+# -180/180 ordering of longitude axes, by axis values
+longitude_cache = LRUCache(maxsize=128)
+
+
+def longitude_wrap(x: numpy.ndarray) -> Optional[LongitudeWrap]:
+    """Get the -180/180 ordering of a 0-360 longitude axis.
+
+    The ordering is computed once per longitude axis and cached. For sorted
+    axes, the positions are made of two runs of consecutive positions (east
+    then west of the antimeridian), so reads stay chunk-aligned.
+
+    Returns `None` when longitudes are already within -180/180.
+
+    """
+    x = numpy.asarray(x)
+    key = (x.dtype.str, x.shape, hashlib.blake2b(x.tobytes()).hexdigest())
+
+    wrap = longitude_cache.get(key, False)
+    if wrap is not False:
+        return wrap
+
+    wrap = None
+    if (x > 180).any():
+        lon = (x + 180) % 360 - 180
+        order = numpy.argsort(lon, kind="stable")
+        wrap = LongitudeWrap(order=order, x=lon[order])
+        wrap.order.setflags(write=False)
+        wrap.x.setflags(write=False)
+
+    longitude_cache.set(key, wrap)
+    return wrap
+
+
 class selector(TypedDict):
     """STAC Item."""
 
@@ -158,8 +278,19 @@ def _parse_dsl(sel: list[str] | None) -> list[selector]:
         list: list of dimension/values/method.
 
     """
-    sel = sel or []
+    return [
+        {
+            "dimension": s["dimension"],
+            "values": list(s["values"]),
+            "method": s["method"],
+        }
+        for s in _parse_selectors(tuple(sel or []))
+    ]
+
 
+@functools.lru_cache(maxsize=XARRAY_SELECTOR_CACHE_SIZE)
+def _parse_selectors(sel: Tuple[str, ...]) -> Tuple[selector, ...]:
+    """Parse (and cache) sel DSL."""
     _idx: Dict[str, List] = {}
     for s in sel:
         val: Union[str, slice]
@@ -173,8 +304,6 @@ def _parse_dsl(sel: list[str] | None) -> list[selector]:
     # Loop through all dimension=values selectors
     # - parse method::value if provided
     # - check if multiple methods are provided for the same dimension
-    # - cast values to the dimension dtype
-    # - apply the selection
     selectors: list[selector] = []
     for dimension, values in _idx.items():
         methods, values = zip(  # type: ignore
@@ -195,7 +324,71 @@ def _parse_dsl(sel: list[str] | None) -> list[selector]:
             }
         )
 
-    return selectors
+    return tuple(selectors)
+
+
+# Resolved selector positions, by dimension index and selector
+selector_cache = LRUCache(maxsize=XARRAY_SELECTOR_CACHE_SIZE)
+
+
+def _resolve_selector(
+    da: xarray.DataArray,
+    selector: selector,
+) -> Union[int, numpy.ndarray]:
+    """Resolve (and cache) the integer positions of a selector.
+
+    Values are cast to the dimension dtype and looked up with one vectorized
+    `get_indexer` call. Values formatted as `{start}/{end}` (for datetime and
+    numeric dimensions) select all the positions within the closed interval.
+
+    """
+    dimension = selector["dimension"]
+    method = selector["method"]
+    index = da.indexes[dimension]
+
+    key = (id(index), dimension, tuple(selector["values"]), method)
+    if (entry := selector_cache.get(key)) is not None and entry[0] is index:
+        return entry[1]
+
+    dtype = da[dimension].dtype
+    values: List[Any] = []
+    intervals: Dict[int, numpy.ndarray] = {}
+    for i, value in enumerate(selector["values"]):
+        if dtype.kind in "Mmiuf" and "/" in value:
+            if method:
+                raise ValueError(
+                    f"Selection method can't be used with interval {dimension}={value}"
+                )
+
+            start, end = (dtype.type(v) if v else None for v in value.split("/", 1))
+            intervals[i] = numpy.arange(len(index))[index.slice_indexer(start, end)]
+
+        else:
+            # TODO: add more casting
+            # cast string to dtype of the dimension
+            values.append(dtype.type(value) if dtype != "O" else value)
+
+    indexer = index.get_indexer(values, method=method) if values else []
+    if (missing := numpy.asarray(indexer) < 0).any():
+        raise KeyError(
+            f"{[str(v) for v in numpy.asarray(values)[missing]]} not found in {dimension}"
+        )
+
+    resolved: Union[int, numpy.ndarray]
+    if not intervals and len(values) == 1:
+        resolved = int(indexer[0])
+    else:
+        positions = iter(indexer)
+        resolved = numpy.concatenate(
+            [
+                intervals[i] if i in intervals else [next(positions)]
+                for i in range(len(selector["values"]))
+            ]
+        ).astype("int64")
+        resolved.setflags(write=False)
+
+    selector_cache.set(key, (index, resolved))
+    return resolved
 
 
 def get_variable(
@@ -209,7 +402,6 @@ def get_variable(
         ds (xarray.Dataset): Xarray Dataset.
         variable (str): Variable to extract from the Dataset.
         sel (list of str, optional): List of Xarray Indexes.
-        method (str): Xarray indexing method.
 
     Returns:
         xarray.DataArray: 2D or 3D DataArray.
@@ -217,19 +409,12 @@ def get_variable(
     """
     da = ds[variable]
 
-    for selector in _parse_dsl(sel):
-        dimension = selector["dimension"]
-        values = selector["values"]
-        method = selector["method"]
-
-        # TODO: add more casting
-        # cast string to dtype of the dimension
-        if da[dimension].dtype != "O":
-            values = [da[dimension].dtype.type(v) for v in values]
-
-        da = da.sel(
-            {dimension: values[0] if len(values) < 2 else values},
-            method=method,
+    if selectors := _parse_selectors(tuple(sel or [])):
+        da = da.isel(
+            {
+                selector["dimension"]: _resolve_selector(da, selector)
+                for selector in selectors
+            }
         )
 
     da = _arrange_dims(da)
@@ -238,12 +423,9 @@ def get_variable(
     crs = da.rio.crs or "epsg:4326"
     da = da.rio.write_crs(crs)
 
-    if crs == "epsg:4326" and (da.x > 180).any():
-        # Adjust the longitude coordinates to the -180 to 180 range
-        da = da.assign_coords(x=(da.x + 180) % 360 - 180)
-
-        # Sort the dataset by the updated longitude coordinates
-        da = da.sortby(da.x)
+    # Adjust the longitude coordinates to the -180 to 180 range
+    if crs == "epsg:4326" and (wrap := longitude_wrap(da.x.values)):
+        da = da.isel(x=wrap.order).assign_coords(x=wrap.x)
 
     assert len(da.dims) in [2, 3], "titiler.xarray can only work with 2D or 3D dataset"
 
@@ -272,10 +454,18 @@ class Reader(XarrayReader):
 
     tms: TileMatrixSet = attr.ib(default=WEB_MERCATOR_TMS)
 
+    # Number of Zarr chunks read concurrently (0 to let xarray load the data)
+    chunk_threads: int = attr.ib(default=XARRAY_CHUNK_THREADS)
+
+    # Multiscale pyramid (see `titiler.xarray.pyramid.build_pyramid`).
+    # Defaults to the pyramid found next to the dataset or in `TITILER_XARRAY_PYRAMID_DIR`.
+    pyramid: Optional[str] = attr.ib(default=None)
+
     ds: xarray.Dataset = attr.ib(init=False)
     input: xarray.DataArray = attr.ib(init=False)
 
     _dims: List = attr.ib(init=False, factory=list)
+    _levels: List[PyramidLevel] = attr.ib(init=False, factory=list)
 
     def __attrs_post_init__(self):
         """Set bounds and CRS."""
@@ -293,6 +483,128 @@ class Reader(XarrayReader):
         )
         super().__attrs_post_init__()
 
+        if self.pyramid:
+            multiscales = get_multiscales(self.pyramid)
+        elif found := find_pyramid(self.src_path, self.group):
+            self.pyramid, multiscales = found
+        else:
+            multiscales = None
+
+        if (
+            multiscales
+            and self.variable
+            in multiscales["metadata"].get("variables", [self.variable])
+            and is_current(multiscales, dataset_version(self.ds))
+        ):
+            self._levels = multiscales["datasets"]
+
+    def _level_input(
+        self,
+        bbox: BBox,
+        bounds_crs: CRS,
+        max_size: Optional[int] = None,
+        height: Optional[int] = None,
+        width: Optional[int] = None,
+    ) -> xarray.DataArray:
+        """Get the DataArray from the pyramid level matching the output resolution."""
+        if not self._levels or not (max_size or height or width):
+            return self.input
+
+        left, bottom, right, top = transform_bounds(
+            bounds_crs, self.crs, *bbox, densify_pts=21
+        )
+        if height and width:
+            resolution = min((right - left) / width, (top - bottom) / height)
+        elif width:
+            resolution = (right - left) / width
+        elif height:
+            resolution = (top - bottom) / height
+        else:
+            resolution = max(right - left, top - bottom) / max_size  # type: ignore
+
+        level = select_level(self._levels, resolution)
+        if level is None:
+            return self.input
+
+        options = self.opener_options if self.opener is open_zarr else {}
+        ds = open_zarr(
+            self.pyramid,  # type: ignore
+            group=level["path"],
+            decode_times=self.decode_times,
+            **options,
+        )
+
+        # e.g a time step added to the dataset after the pyramid was built
+        try:
+            return get_variable(ds, self.variable, sel=self.sel)
+        except (KeyError, IndexError):
+            return self.input
+
+    def part(
+        self,
+        bbox: BBox,
+        bounds_crs: CRS = WGS84_CRS,
+        auto_expand: bool = True,
+        indexes: Optional[Indexes] = None,
+        **kwargs: Any,
+    ) -> ImageData:
+        """Read part of a dataset.
+
+        Data is read from the pyramid level matching the output resolution,
+        fetching the Zarr chunks it covers in parallel.
+
+        """
+        da = self._level_input(
+            bbox,
+            bounds_crs,
+            max_size=kwargs.get("max_size"),
+            height=kwargs.get("height"),
+            width=kwargs.get("width"),
+        )
+        src_dst = self if da is self.input else XarrayReader(da, tms=self.tms)
+
+        if not self.chunk_threads:
+            return XarrayReader.part(
+                src_dst,
+                bbox,
+                bounds_crs=bounds_crs,
+                auto_expand=auto_expand,
+                indexes=indexes,
+                **kwargs,
+            )
+
+        da, _ = src_dst._sel_indexes(indexes)
+        da = da.rio.clip_box(*bbox, crs=bounds_crs, auto_expand=auto_expand)
+        if da.nbytes > MAX_ARRAY_SIZE:
+            raise MaxArraySizeError(
+                f"Maximum array limit {MAX_ARRAY_SIZE} reached, trying to put DataArray of {da.shape} in memory."
+            )
+
+        da = load_dataarray(da, threads=self.chunk_threads)
+        with XarrayReader(da, tms=self.tms) as src_dst:
+            return src_dst.part(
+                bbox,
+                bounds_crs=bounds_crs,
+                auto_expand=auto_expand,
+                **kwargs,
+            )
+
+    def preview(
+        self,
+        max_size: int = 1024,
+        height: Optional[int] = None,
+        width: Optional[int] = None,
+        **kwargs: Any,
+    ) -> ImageData:
+        """Return a preview of a dataset, from the pyramid level matching the output size."""
+        da = self._level_input(
+            self.bounds, self.crs, max_size=max_size, height=height, width=width
+        )
+        src_dst = self if da is self.input else XarrayReader(da, tms=self.tms)
+        return XarrayReader.preview(
+            src_dst, max_size=max_size, height=height, width=width, **kwargs
+        )
+
     def close(self):
         """Close xarray dataset."""
         self.ds.close()
@@ -302,24 +614,82 @@ class Reader(XarrayReader):
         self.close()
 
 
-def fs_open_dataset(  # noqa: C901
+def fs_open_dataset(
     src_path: str,
     group: Optional[str] = None,
     decode_times: bool = True,
     decode_coords: str = "all",
+    references: Optional[str] = None,
     **kwargs,
 ) -> xarray.Dataset:
     """Open Xarray dataset with fsspec.
 
+    Opened datasets are kept in the process-wide `titiler.xarray.cache.dataset_cache`
+    and revalidated against the NetCDF file, virtual references or Zarr consolidated metadata.
+
+    NetCDF/HDF5 datasets with virtual references (see `titiler.xarray.references`),
+    found next to the dataset or in `TITILER_XARRAY_REFERENCES_DIR`, are read
+    like Zarr stores.
+
     Args:
         src_path (str): dataset path.
         group (Optional, str): path to the netCDF/Zarr group in the given file to open given as a str.
         decode_times (bool):  If True, decode times encoded in the standard NetCDF datetime format into datetime objects. Otherwise, leave them encoded as numbers.
+        references (Optional, str): path to the JSON/Parquet virtual references of the dataset.
 
     Returns:
         xarray.Dataset
 
     """
+    key = cache_key(
+        "fs_open_dataset",
+        src_path,
+        group=group,
+        decode_times=decode_times,
+        decode_coords=decode_coords,
+        references=references,
+        **kwargs,
+    )
+
+    def _open():
+        return _fs_open_dataset(
+            src_path,
+            group=group,
+            decode_times=decode_times,
+            decode_coords=decode_coords,
+            references=references,
+            **kwargs,
+        )
+
+    return dataset_cache.get(key, src_path, _open)
+
+
+def _fs_version(
+    src_path: str, files: Optional[List[str]] = None, **kwargs: Any
+) -> Optional[str]:
+    """Get the version (ETag or modification time) of a file or of the first existing `files` in a directory."""
+    import fsspec  # noqa
+
+    fs, path = fsspec.core.url_to_fs(src_path, **kwargs)
+    paths = [f"{path.rstrip('/')}/{name}" for name in files] if files else [path]
+    for path in paths:
+        try:
+            return info_version(fs.info(path))
+        except FileNotFoundError:
+            continue
+
+    return None
+
+
+def _fs_open_dataset(  # noqa: C901
+    src_path: str,
+    group: Optional[str] = None,
+    decode_times: bool = True,
+    decode_coords: str = "all",
+    references: Optional[str] = None,
+    **kwargs,
+):
+    """Open Xarray dataset with fsspec, returning the dataset and its version function."""
     import fsspec  # noqa
 
     try:
@@ -330,6 +700,28 @@ def fs_open_dataset(  # noqa: C901
     parsed = urlparse(src_path)
     protocol = parsed.scheme or "file"
 
+    # Set the bucket region so s3fs doesn't have to follow region redirects
+    if protocol == "s3" and not kwargs.get("endpoint_url"):
+        client_kwargs = kwargs.get("client_kwargs") or {}
+        if "region_name" not in client_kwargs:
+            if region := _find_bucket_region(parsed.netloc):
+                kwargs = {
+                    **kwargs,
+                    "client_kwargs": {**client_kwargs, "region_name": region},
+                }
+
+    # Virtual references: read the NetCDF/HDF5 chunks like a Zarr store
+    if references := references or find_references(src_path, **kwargs):
+        ds = open_references(
+            references,
+            remote_protocol=protocol,
+            group=group,
+            decode_times=decode_times,
+            decode_coords=decode_coords,
+            **kwargs,
+        )
+        return ds, lambda: _fs_version(references, **kwargs)
+
     # Arguments for xarray.open_dataset
     # Default args
     xr_open_args: Dict[str, Any] = {
@@ -343,9 +735,9 @@ def fs_open_dataset(  # noqa: C901
 
     # NetCDF arguments
     if any(src_path.lower().endswith(ext) for ext in [".nc", ".nc4"]):
-        assert (
-            h5netcdf is not None
-        ), "'h5netcdf' must be installed to read NetCDF dataset"
+        assert h5netcdf is not None, (
+            "'h5netcdf' must be installed to read NetCDF dataset"
+        )
 
         xr_open_args.update(
             {
@@ -355,6 +747,7 @@ def fs_open_dataset(  # noqa: C901
         )
         fs = fsspec.filesystem(protocol, **kwargs)
         ds = xarray.open_dataset(fs.open(src_path), **xr_open_args)
+        files = None
 
     # Fallback to Zarr
     else:
@@ -362,8 +755,9 @@ def fs_open_dataset(  # noqa: C901
             src_path, storage_options={"asynchronous": True, **kwargs}
         )
         ds = xarray.open_zarr(store, **xr_open_args)
+        files = ZARR_METADATA_FILES
 
-    return ds
+    return ds, lambda: _fs_version(src_path, files, **kwargs)
 
 
 # Compat
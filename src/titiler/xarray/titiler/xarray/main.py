@@ -30,7 +30,11 @@ from titiler.core.models.OGC import Conformance, Landing
 from titiler.core.resources.enums import MediaType
 from titiler.core.utils import accept_media_type, create_html_response, update_openapi
 from titiler.xarray import __version__ as titiler_version
-from titiler.xarray.extensions import DatasetMetadataExtension, ValidateExtension
+from titiler.xarray.extensions import (
+    DatasetCacheExtension,
+    DatasetMetadataExtension,
+    ValidateExtension,
+)
 from titiler.xarray.factory import TilerFactory
 
 logging.getLogger("rasterio.session").setLevel(logging.ERROR)
@@ -62,6 +66,9 @@ class ApiSettings(BaseSettings):
 
     telemetry_enabled: bool = False
 
+    # add `/cache/datasets` and `/cache/chunks` admin endpoints
+    cache_admin: bool = False
+
     # an API key required to access any endpoint, passed via the ?access_token= query parameter
     global_access_token: Optional[str] = None
 
@@ -146,11 +153,15 @@ TITILER_CONFORMS_TO = {
 }
 
 
+md_extensions = [
+    DatasetMetadataExtension(),
+    ValidateExtension(),
+]
+if api_settings.cache_admin:
+    md_extensions.append(DatasetCacheExtension())
+
 md = TilerFactory(
-    extensions=[
-        DatasetMetadataExtension(),
-        ValidateExtension(),
-    ],
+    extensions=md_extensions,
     enable_telemetry=api_settings.telemetry_enabled,
     templates=titiler_templates,
 )
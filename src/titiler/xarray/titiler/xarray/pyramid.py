@@ -0,0 +1,284 @@
+"""titiler.xarray multiscale pyramids."""
+
+import hashlib
+import os
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+from urllib.parse import urlparse
+
+import xarray
+import zarr
+from typing_extensions import TypedDict
+
+from titiler.core.cache import LRUCache
+from titiler.xarray.cache import dataset_version
+
+XARRAY_PYRAMID_DIR = os.getenv("TITILER_XARRAY_PYRAMID_DIR")
+XARRAY_PYRAMID_CACHE_TTL = int(os.getenv("TITILER_XARRAY_PYRAMID_CACHE_TTL", 300))
+
+_missing = object()
+
+# multiscales metadata by pyramid path (`None` when there is no pyramid)
+pyramid_cache = LRUCache(maxsize=1024, ttl=XARRAY_PYRAMID_CACHE_TTL)
+
+
+class PyramidLevel(TypedDict):
+    """Multiscale pyramid level."""
+
+    path: str
+    level: int
+    # pixel size (in the dataset CRS units)
+    resolution: float
+
+
+class Multiscales(TypedDict):
+    """Multiscales metadata."""
+
+    version: str
+    name: str
+    type: str
+    datasets: List[PyramidLevel]
+    metadata: Dict[str, Any]
+
+
+def pyramid_path(
+    src_path: str,
+    group: Optional[str] = None,
+    directory: Optional[str] = XARRAY_PYRAMID_DIR,
+) -> str:
+    """Default pyramid location for a dataset (and group).
+
+    Pyramids are stored in `directory` (named after the dataset URL and
+    group) or, when no directory is set, next to the dataset (e.g
+    `data.zarr` -> `data.pyramid.zarr`).
+
+    """
+    group = (group or "").strip("/")
+    if directory:
+        name = hashlib.sha256(f"{src_path}#{group}".encode()).hexdigest()[:32]
+        return os.path.join(directory, f"{name}.zarr")
+
+    root = src_path.rstrip("/")
+    base, ext = os.path.splitext(root)
+    if ext.lower() in [".zarr", ".nc", ".nc4", ".h5"]:
+        root = base
+
+    suffix = "_" + group.replace("/", "_") if group else ""
+    return f"{root}{suffix}.pyramid.zarr"
+
+
+def get_multiscales(
+    path: str,
+    storage_options: Optional[Dict] = None,
+) -> Optional[Multiscales]:
+    """Read (and cache) the multiscales metadata of a pyramid, `None` if it doesn't exist."""
+    multiscales = pyramid_cache.get(path, _missing)
+    if multiscales is not _missing:
+        return multiscales
+
+    try:
+        root = zarr.open_group(path, mode="r", storage_options=storage_options)
+        multiscales = root.attrs.get("multiscales")
+    except (FileNotFoundError, zarr.errors.GroupNotFoundError, ValueError):
+        multiscales = None
+
+    multiscales = multiscales[0] if multiscales else None
+    pyramid_cache.set(path, multiscales)
+    return multiscales
+
+
+def find_pyramid(
+    src_path: str,
+    group: Optional[str] = None,
+    directory: Optional[str] = XARRAY_PYRAMID_DIR,
+) -> Optional[Tuple[str, Multiscales]]:
+    """Find the pyramid of a dataset in `directory` or, for local datasets, next to it."""
+    if not directory and urlparse(src_path).scheme not in ["", "file"]:
+        return None
+
+    path = pyramid_path(src_path, group, directory=directory)
+    if multiscales := get_multiscales(path):
+        return path, multiscales
+
+    return None
+
+
+def is_current(multiscales: Multiscales, version: Optional[str]) -> bool:
+    """Check if a pyramid was built from the `version` of its source dataset.
+
+    Pyramids built from datasets without version are always considered current.
+
+    """
+    built = multiscales["metadata"].get("version")
+    return built is None or built == version
+
+
+def select_level(
+    levels: List[PyramidLevel],
+    resolution: float,
+) -> Optional[PyramidLevel]:
+    """Select the coarsest level with a resolution finer or equal to `resolution`."""
+    candidates = [
+        level for level in levels if level["resolution"] <= resolution * 1.0001
+    ]
+    if not candidates:
+        return None
+
+    return max(candidates, key=lambda level: level["resolution"])
+
+
+def _spatial_dims(da: xarray.DataArray) -> Optional[Tuple[str, str]]:
+    """Y and X dimension names of a DataArray."""
+    from titiler.xarray.io import X_DIM_NAMES, Y_DIM_NAMES
+
+    y_dim = next((d for d in ["y", *Y_DIM_NAMES] if d in da.dims), None)
+    x_dim = next((d for d in ["x", *X_DIM_NAMES] if d in da.dims), None)
+    if y_dim is None or x_dim is None:
+        return None
+
+    return y_dim, x_dim
+
+
+def _level_chunks(da: xarray.DataArray, y_dim: str, x_dim: str, rows: int):
+    """Chunks of a level variable: `rows` x 256 pixels, one step of other dimensions."""
+    sizes = {y_dim: rows, x_dim: min(256, da.sizes[x_dim])}
+    return tuple(sizes.get(d, 1) for d in da.dims)
+
+
+def build_pyramid(  # noqa: C901
+    src_path: str,
+    variables: Optional[List[str]] = None,
+    output: Optional[str] = None,
+    group: Optional[str] = None,
+    min_size: int = 256,
+    method: Literal["mean", "min", "max", "median", "sum"] = "mean",
+    strip_size: int = 512,
+    opener: Optional[Callable[..., xarray.Dataset]] = None,
+    decode_times: bool = True,
+    storage_options: Optional[Dict] = None,
+    **opener_options: Any,
+) -> Multiscales:
+    """Write multiscale levels of a Zarr/NetCDF dataset.
+
+    Each level halves the resolution of the previous one (the first level is
+    computed from the dataset) until the dataset fits in `min_size` pixels.
+    Levels are written to the `1`, `2`, ... groups of the `output` Zarr store,
+    whose root `multiscales` attribute lists them with their resolution. The
+    full resolution level (`0`) is the dataset itself.
+
+    Levels are computed by strips of `strip_size` rows, so the full resolution
+    variables are never loaded in memory at once.
+
+    The source dataset metadata version (see `titiler.xarray.cache.dataset_version`)
+    is stored in the multiscales `metadata`: readers don't use the pyramid once
+    the dataset changed.
+
+    Args:
+        src_path (str): Dataset path.
+        variables (list of str, optional): Variables to include. Defaults to all variables with X and Y dimensions.
+        output (str, optional): Pyramid Zarr store path. Defaults to `pyramid_path(src_path, group)`.
+        group (str, optional): Dataset group.
+        min_size (int): Size (in pixels) under which no more levels are added.
+        method (str): Reduction method.
+        strip_size (int): Number of source rows processed at once.
+        opener (callable, optional): Dataset opener. Defaults to `titiler.xarray.io.open_zarr`.
+        decode_times (bool): Decode times.
+        storage_options (dict, optional): Output store options.
+        opener_options (optional): Options forwarded to the opener.
+
+    Returns:
+        Multiscales: the multiscales metadata.
+
+    """
+    if opener is None:
+        from titiler.xarray.io import open_zarr as opener
+
+    output = output or pyramid_path(src_path, group)
+    ds = opener(src_path, group=group, decode_times=decode_times, **opener_options)
+
+    variables = variables or [
+        name for name in ds.data_vars if _spatial_dims(ds[name]) is not None
+    ]
+    dims = _spatial_dims(ds[variables[0]]) if variables else None
+    if dims is None:
+        raise ValueError(
+            f"Couldn't find variables with X and Y dimensions in {src_path}"
+        )
+
+    y_dim, x_dim = dims
+    level_ds = ds[variables]
+
+    strip_size += strip_size % 2
+    levels: List[PyramidLevel] = []
+    level = 0
+    while max(level_ds.sizes[y_dim], level_ds.sizes[x_dim]) > min_size and (
+        min(level_ds.sizes[y_dim], level_ds.sizes[x_dim]) >= 2
+    ):
+        level += 1
+        path = str(level)
+        height = level_ds.sizes[y_dim] // 2 * 2
+
+        for start in range(0, height, strip_size):
+            strip = level_ds.isel(
+                {y_dim: slice(start, min(start + strip_size, height))}
+            )
+            reduced = getattr(
+                strip.coarsen({y_dim: 2, x_dim: 2}, boundary="trim"), method
+            )(keep_attrs=True).load()
+
+            for var in reduced.variables.values():
+                var.encoding = {}
+
+            if start == 0:
+                encoding = {
+                    name: {
+                        "chunks": _level_chunks(
+                            reduced[name], y_dim, x_dim, strip_size // 2
+                        )
+                    }
+                    for name in reduced.data_vars
+                }
+                reduced.to_zarr(
+                    output,
+                    group=path,
+                    mode="w",
+                    encoding=encoding,
+                    storage_options=storage_options,
+                )
+            else:
+                reduced.to_zarr(
+                    output,
+                    group=path,
+                    append_dim=y_dim,
+                    storage_options=storage_options,
+                )
+
+        level_ds = xarray.open_zarr(
+            output, group=path, chunks=None, storage_options=storage_options
+        )
+        levels.append(
+            {
+                "path": path,
+                "level": level,
+                "resolution": float(abs(level_ds[x_dim][1] - level_ds[x_dim][0])),
+            }
+        )
+
+    multiscales: Multiscales = {
+        "version": "0.1",
+        "name": os.path.basename(src_path.rstrip("/")),
+        "type": method,
+        "datasets": levels,
+        "metadata": {
+            "source": src_path,
+            "group": group,
+            "variables": variables,
+            "version": dataset_version(ds),
+        },
+    }
+
+    root = zarr.open_group(output, mode="a", storage_options=storage_options)
+    root.attrs["multiscales"] = [multiscales]
+    zarr.consolidate_metadata(root.store)
+    pyramid_cache.pop(output)
+
+    return multiscales
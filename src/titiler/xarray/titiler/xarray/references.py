@@ -0,0 +1,177 @@
+"""titiler.xarray virtual references (kerchunk) for NetCDF/HDF5 datasets."""
+
+import hashlib
+import json
+import os
+from typing import Dict, Literal, Optional
+
+import xarray
+import zarr
+
+from titiler.core.cache import LRUCache
+
+try:
+    from kerchunk.hdf import SingleHdf5ToZarr
+except ImportError:  # pragma: nocover
+    SingleHdf5ToZarr = None  # type: ignore
+
+XARRAY_REFERENCES_DIR = os.getenv("TITILER_XARRAY_REFERENCES_DIR")
+XARRAY_REFERENCES_CACHE_TTL = int(os.getenv("TITILER_XARRAY_REFERENCES_CACHE_TTL", 300))
+
+# File extensions of datasets with virtual references
+REFERENCES_EXTENSIONS = [".nc", ".nc4", ".h5", ".hdf5", ".he5"]
+
+_missing = object()
+
+# references path by dataset path (`None` when there are no references)
+references_cache = LRUCache(maxsize=1024, ttl=XARRAY_REFERENCES_CACHE_TTL)
+
+
+def references_path(
+    src_path: str,
+    format: Literal["json", "parquet"] = "json",
+    directory: Optional[str] = XARRAY_REFERENCES_DIR,
+) -> str:
+    """Default references location for a dataset.
+
+    References are stored in `directory` (named after the dataset URL) or,
+    when no directory is set, next to the dataset (e.g `data.nc` ->
+    `data.nc.refs.json`).
+
+    """
+    if directory:
+        name = hashlib.sha256(src_path.encode()).hexdigest()[:32]
+        return os.path.join(directory, f"{name}.refs.{format}")
+
+    return f"{src_path}.refs.{format}"
+
+
+def find_references(
+    src_path: str,
+    directory: Optional[str] = XARRAY_REFERENCES_DIR,
+    **kwargs,
+) -> Optional[str]:
+    """Find (and cache) the JSON or Parquet references of a NetCDF/HDF5 dataset."""
+    if not any(src_path.lower().endswith(ext) for ext in REFERENCES_EXTENSIONS):
+        return None
+
+    path = references_cache.get(src_path, _missing)
+    if path is not _missing:
+        return path
+
+    import fsspec  # noqa
+
+    path = None
+    for candidate in [
+        references_path(src_path, "json", directory=directory),
+        references_path(src_path, "parquet", directory=directory),
+    ]:
+        try:
+            fs, fs_path = fsspec.core.url_to_fs(candidate, **kwargs)
+            if fs.exists(fs_path):
+                path = candidate
+                break
+
+        except (ImportError, OSError, ValueError):
+            continue
+
+    references_cache.set(src_path, path)
+    return path
+
+
+def open_references(
+    path: str,
+    remote_protocol: Optional[str] = None,
+    group: Optional[str] = None,
+    decode_times: bool = True,
+    decode_coords: str = "all",
+    **kwargs,
+) -> xarray.Dataset:
+    """Open a dataset from JSON or Parquet virtual references.
+
+    The dataset is read like a Zarr store: chunks are fetched (in parallel)
+    from the original files, without reading the HDF5 metadata.
+
+    Args:
+        path (str): References path.
+        remote_protocol (str, optional): Protocol of the referenced files.
+        group (str, optional): Group to open.
+        decode_times (bool): Decode times.
+        decode_coords (str): Decode coordinates.
+        kwargs (optional): Options of the references and referenced files filesystems.
+
+    Returns:
+        xarray.Dataset
+
+    """
+    import fsspec  # noqa
+
+    fs = fsspec.filesystem(
+        "reference",
+        fo=path,
+        remote_protocol=remote_protocol,
+        remote_options=kwargs,
+        target_options=kwargs,
+        asynchronous=True,
+    )
+    store = zarr.storage.FsspecStore(fs=fs, path="", read_only=True)
+
+    xr_open_args: Dict = {
+        "decode_times": decode_times,
+        "decode_coords": decode_coords,
+    }
+    if group is not None:
+        xr_open_args["group"] = group
+
+    return xarray.open_zarr(store, **xr_open_args)
+
+
+def generate_references(
+    src_path: str,
+    output: Optional[str] = None,
+    format: Literal["json", "parquet"] = "json",
+    inline_threshold: int = 500,
+    storage_options: Optional[Dict] = None,
+) -> str:
+    """Scan a NetCDF4/HDF5 file and write its virtual references.
+
+    Args:
+        src_path (str): Dataset path.
+        output (str, optional): References path. Defaults to `references_path(src_path, format)`.
+        format (str): References format (`json` or `parquet`).
+        inline_threshold (int): Chunks smaller than `inline_threshold` bytes are stored in the references.
+        storage_options (dict, optional): Dataset and references filesystem options.
+
+    Returns:
+        str: the references path.
+
+    """
+    assert SingleHdf5ToZarr is not None, (
+        "'kerchunk' must be installed to generate references"
+    )
+
+    import fsspec  # noqa
+
+    storage_options = storage_options or {}
+    output = output or references_path(src_path, format)
+
+    with fsspec.open(src_path, "rb", **storage_options) as f:
+        refs = SingleHdf5ToZarr(
+            f,
+            src_path,
+            inline_threshold=inline_threshold,
+            storage_options=storage_options,
+        ).translate()
+
+    if format == "parquet":
+        from kerchunk.df import refs_to_dataframe
+
+        refs_to_dataframe(refs, output, storage_options=storage_options)
+
+    else:
+        with fsspec.open(output, "w", **storage_options) as f:
+            json.dump(refs, f)
+
+    references_cache.pop(src_path)
+
+    return output
@@ -0,0 +1,162 @@
+"""titiler.xarray S3 bucket region discovery."""
+
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+
+try:
+    import fcntl
+except ImportError:  # pragma: nocover
+    fcntl = None  # type: ignore
+
+XARRAY_BUCKET_REGION_CACHE = os.getenv("TITILER_XARRAY_BUCKET_REGION_CACHE")
+XARRAY_BUCKET_REGION_TIMEOUT = float(
+    os.getenv("TITILER_XARRAY_BUCKET_REGION_TIMEOUT", 2)
+)
+XARRAY_BUCKET_REGION_NEGATIVE_TTL = int(
+    os.getenv("TITILER_XARRAY_BUCKET_REGION_NEGATIVE_TTL", 300)
+)
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    """Exclusive lock shared between processes (no-op where `fcntl` is not available)."""
+    if fcntl is None:  # pragma: nocover
+        yield
+        return
+
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class BucketRegionResolver:
+    """Process-wide S3 bucket region resolver.
+
+    Regions are read from the `x-amz-bucket-region` header of a `HEAD`
+    request to the bucket endpoint, and cached in memory and (optionally) in a
+    JSON file shared between processes and restarts. Failed lookups are cached
+    for `negative_ttl` seconds.
+
+    Args:
+        path (str, optional): JSON file to persist bucket regions.
+        timeout (float): Lookup request timeout (in seconds).
+        negative_ttl (int): Time (in seconds) after which a failed lookup is retried.
+
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        timeout: float = 2,
+        negative_ttl: float = 300,
+    ):
+        """Create the resolver."""
+        self.path = path
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+        self._regions: Dict[str, str] = {}
+        self._failures: Dict[str, float] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, str]:
+        """Read bucket regions from the cache file."""
+        if not self.path or not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read bucket regions from {self.path}: {e}")
+            return {}
+
+    def _load(self):
+        """Load bucket regions from the cache file."""
+        self._loaded = True
+        self._regions.update(self._read())
+
+    def _save(self):
+        """Write bucket regions to the cache file.
+
+        Regions written by other processes since the file was loaded are
+        merged (under a file lock) so they are not overwritten.
+
+        """
+        if not self.path:
+            return
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with _file_lock(self.path):
+                self._regions = {**self._read(), **self._regions}
+                with open(tmp_path, "w") as f:
+                    json.dump(self._regions, f)
+
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write bucket regions to {self.path}: {e}")
+
+    def _lookup(self, bucket: str, use_https: bool = True) -> Optional[str]:
+        prefix = "https" if use_https else "http"
+        try:
+            response = httpx.head(
+                f"{prefix}://{bucket}.s3.amazonaws.com", timeout=self.timeout
+            )
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not find region for bucket {bucket}: {e}")
+            return None
+
+        return response.headers.get("x-amz-bucket-region")
+
+    def resolve(self, bucket: str, use_https: bool = True) -> Optional[str]:
+        """Get the region of a bucket, `None` if it can't be found."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+            if region := self._regions.get(bucket):
+                return region
+
+            failed = self._failures.get(bucket)
+            if failed and time.monotonic() - failed < self.negative_ttl:
+                return None
+
+        region = self._lookup(bucket, use_https=use_https)
+
+        with self._lock:
+            if region is None:
+                self._failures[bucket] = time.monotonic()
+                return None
+
+            self._failures.pop(bucket, None)
+            self._regions[bucket] = region
+            self._save()
+
+        return region
+
+    def clear(self):
+        """Forget the in-memory regions and failed lookups."""
+        with self._lock:
+            self._regions.clear()
+            self._failures.clear()
+            self._loaded = False
+
+
+region_resolver = BucketRegionResolver(
+    path=XARRAY_BUCKET_REGION_CACHE,
+    timeout=XARRAY_BUCKET_REGION_TIMEOUT,
+    negative_ttl=XARRAY_BUCKET_REGION_NEGATIVE_TTL,
+)
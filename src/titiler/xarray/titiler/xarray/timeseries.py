@@ -0,0 +1,223 @@
+"""titiler.xarray point time series."""
+
+import csv
+import io
+import json
+import math
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from types import DynamicClassAttribute
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy
+import xarray
+from rasterio.crs import CRS
+from rasterio.transform import rowcol
+from rasterio.warp import transform as transform_coords
+from rio_tiler.constants import WGS84_CRS
+from typing_extensions import TypedDict
+
+from titiler.core.resources.enums import MediaType
+from titiler.xarray.chunks import (
+    XARRAY_CHUNK_THREADS,
+    ChunkCache,
+    chunk_cache,
+    load_dataarray,
+    zarr_source,
+)
+
+XARRAY_TIMESERIES_MAX_POINTS = int(
+    os.getenv("TITILER_XARRAY_TIMESERIES_MAX_POINTS", 1000)
+)
+
+# Points grouping (in pixels) for datasets not backed by Zarr
+XARRAY_TIMESERIES_BLOCK_SIZE = 256
+
+
+class TimeseriesType(str, Enum):
+    """Available time series output type."""
+
+    json = "json"
+    csv = "csv"
+
+    @DynamicClassAttribute
+    def mediatype(self):
+        """Return time series media type."""
+        return MediaType[self._name_].value
+
+
+class PointTimeseries(TypedDict):
+    """Values of a point over the time (first) dimension."""
+
+    index: int
+    coordinates: Tuple[float, float]
+    values: List[Optional[float]]
+
+
+def steps(da: xarray.DataArray) -> List[str]:
+    """Steps (e.g times) of the first dimension of a 3D DataArray."""
+    if da.ndim == 2:
+        return ["value"]
+
+    return [str(value) for value in da[da.dims[0]].values]
+
+
+def _source_positions(
+    da: xarray.DataArray, rows: numpy.ndarray, cols: numpy.ndarray
+) -> Tuple[Tuple[int, int], numpy.ndarray, numpy.ndarray]:
+    """Block size and positions (in the backing Zarr array) of DataArray pixels."""
+    source = zarr_source(da)
+    if source is None:
+        return (XARRAY_TIMESERIES_BLOCK_SIZE, XARRAY_TIMESERIES_BLOCK_SIZE), rows, cols
+
+    # Zarr array dimensions kept in the DataArray (integer selections are dropped)
+    axes = [
+        (axis, sel)
+        for axis, sel in enumerate(source.selection)
+        if not isinstance(sel, (int, numpy.integer))
+    ]
+    (y_axis, y_sel), (x_axis, x_sel) = axes[-2:]
+
+    def _positions(axis: int, sel, positions: numpy.ndarray) -> numpy.ndarray:
+        if isinstance(sel, slice):
+            start, _, step = sel.indices(source.array.shape[axis])
+            return start + positions * step
+
+        return numpy.asarray(sel)[positions]
+
+    return (
+        (source.array.chunks[y_axis], source.array.chunks[x_axis]),
+        _positions(y_axis, y_sel, rows),
+        _positions(x_axis, x_sel, cols),
+    )
+
+
+def group_points(
+    da: xarray.DataArray, rows: numpy.ndarray, cols: numpy.ndarray
+) -> Dict[Hashable, List[int]]:
+    """Group points by the (spatial) chunk they fall in."""
+    (y_size, x_size), y, x = _source_positions(da, rows, cols)
+
+    groups: Dict[Hashable, List[int]] = defaultdict(list)
+    for idx, key in enumerate(zip((y // y_size).tolist(), (x // x_size).tolist())):
+        groups[key].append(idx)
+
+    return groups
+
+
+def point_timeseries(
+    da: xarray.DataArray,
+    points: Sequence[Tuple[float, float]],
+    coord_crs: CRS = WGS84_CRS,
+    threads: int = XARRAY_CHUNK_THREADS,
+    cache: Optional[ChunkCache] = chunk_cache,
+) -> Iterator[PointTimeseries]:
+    """Read the values of points over the first dimension of a 2D/3D DataArray.
+
+    Points are grouped by chunk and each group is read with one chunk-aligned
+    read of the full time column, so each chunk is fetched once. Results are
+    yielded as groups are read (i.e not in the input order). Points outside the
+    dataset bounds or over nodata get `None` values.
+
+    """
+    if not points:
+        return
+
+    lons, lats = zip(*points)
+    xs, ys = transform_coords(coord_crs, da.rio.crs, lons, lats)
+    rows, cols = (
+        numpy.asarray(v) for v in rowcol(da.rio.transform(), xs, ys, op=math.floor)
+    )
+
+    height, width = da.shape[-2:]
+    inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    count = 1 if da.ndim == 2 else da.shape[0]
+    nodata = da.rio.nodata
+
+    for idx in numpy.flatnonzero(~inside).tolist():
+        yield {
+            "index": idx,
+            "coordinates": points[idx],
+            "values": [None] * count,
+        }
+
+    indices = numpy.flatnonzero(inside)
+    groups = group_points(da, rows[indices], cols[indices])
+
+    def _read(group: List[int]) -> List[PointTimeseries]:
+        members = indices[group]
+        y_sel, y_inv = numpy.unique(rows[members], return_inverse=True)
+        x_sel, x_inv = numpy.unique(cols[members], return_inverse=True)
+
+        block = load_dataarray(
+            da.isel({da.dims[-2]: y_sel, da.dims[-1]: x_sel}),
+            threads=threads,
+            cache=cache,
+        ).values
+        values = block[..., y_inv, x_inv].reshape(count, len(members))
+
+        mask = numpy.isnan(values) if values.dtype.kind == "f" else False
+        if nodata is not None:
+            mask = mask | (values == nodata)
+
+        values = numpy.where(mask, None, values.astype("float64"))
+        return [
+            {
+                "index": int(idx),
+                "coordinates": points[idx],
+                "values": values[:, i].tolist(),
+            }
+            for i, idx in enumerate(members.tolist())
+        ]
+
+    if threads <= 1 or len(groups) <= 1:
+        for group in groups.values():
+            yield from _read(group)
+
+        return
+
+    executor = ThreadPoolExecutor(max_workers=min(threads, len(groups)))
+    try:
+        for result in executor.map(_read, groups.values()):
+            yield from result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def timeseries_to_csv(
+    timeseries: Iterator[PointTimeseries], names: Sequence[str]
+) -> Iterator[str]:
+    """Stream time series as CSV (one row per point, one column per step)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def _row(row: Sequence) -> str:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerow(row)
+        return buf.getvalue()
+
+    yield _row(["index", "x", "y", *names])
+    for ts in timeseries:
+        yield _row(
+            [
+                ts["index"],
+                *ts["coordinates"],
+                *("" if v is None else v for v in ts["values"]),
+            ]
+        )
+
+
+def timeseries_to_json(
+    timeseries: Iterator[PointTimeseries], dimension: str, names: Sequence[str]
+) -> Iterator[str]:
+    """Stream time series as a JSON document."""
+    yield '{"dimension": ' + json.dumps(dimension)
+    yield ', "steps": ' + json.dumps(list(names))
+    yield ', "points": ['
+    for i, ts in enumerate(timeseries):
+        yield ("" if i == 0 else ", ") + json.dumps(ts)
+
+    yield "]}"